@@ -0,0 +1,105 @@
+# bench_agrupamento.py - DBSCAN par a par (caminho original) contra o grafo de k vizinhos aproximados, de 1 mil a 100 mil
+#
+#   python benchmarks/bench_agrupamento.py --comentarios 1000 5000 20000 50000 100000 --max-dbscan 50000
+#   python benchmarks/bench_agrupamento.py --embeddings vetores.npy --sem-umap
+#
+# Cada medição roda num processo novo: o pico de memória (ru_maxrss, Linux/macOS) é só daquela medição.
+# Antes de medir, uma rodada pequena compila as funções do numba (pynndescent e UMAP), como já estaria no servidor.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def gerar_embeddings(quantidade: int, dimensao: int = 384, grupos: int = 60, semente: int = 42) -> np.ndarray:
+    """Vetores normalizados no perfil dos comentários: grupos de tamanhos desiguais, respostas repetidas e ruído."""
+    rng = np.random.default_rng(semente)
+    centros = rng.normal(size=(grupos, dimensao))
+    tamanhos = rng.zipf(1.6, grupos).astype(float)
+    grupo = rng.choice(grupos, quantidade, p=tamanhos / tamanhos.sum())
+    dispersao = np.where(rng.random(quantidade) < 0.2, 2.5, 0.45)  # ~20% de comentários isolados
+    vetores = centros[grupo] + rng.normal(size=(quantidade, dimensao)) * dispersao[:, None]
+    # "nada", "ok": a mesma resposta muitas vezes
+    repetidos = rng.random(quantidade) < 0.1
+    vetores[repetidos] = vetores[0]
+    return (vetores / np.linalg.norm(vetores, axis=1, keepdims=True)).astype(np.float32)
+
+def _pico_memoria_mb() -> float:
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+def medir(tarefa):
+    """Roda no processo filho: (segundos do agrupamento, segundos do UMAP, pico MB, rótulos)."""
+    caminho, quantidade, algoritmo, com_umap = tarefa
+    from components.agrupamento import VIZINHOS_GRAFO
+    from components.analise_comentarios import agrupar_unicos
+
+    def projetar(unicos, grafo):
+        import umap.umap_ as umap
+        return umap.UMAP(n_neighbors=VIZINHOS_GRAFO, min_dist=0.1, metric="cosine", random_state=42,
+                         precomputed_knn=grafo or (None, None, None)).fit_transform(unicos)
+
+    embeddings = np.load(caminho, mmap_mode="r")[:quantidade].copy()
+    # aquecimento fora da medição
+    _, unicos, _, grafo = agrupar_unicos(embeddings[:500], algoritmo)
+    if com_umap:
+        projetar(unicos, grafo)
+
+    inicio = time.perf_counter()
+    rotulos, unicos, _, grafo = agrupar_unicos(embeddings, algoritmo)
+    segundos = time.perf_counter() - inicio
+
+    segundos_umap = None
+    if com_umap:
+        inicio = time.perf_counter()
+        projetar(unicos, grafo)
+        segundos_umap = time.perf_counter() - inicio
+    return segundos, segundos_umap, _pico_memoria_mb(), rotulos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--comentarios", type=int, nargs="+", default=[1000, 5000, 20000, 50000, 100000])
+    parser.add_argument("--embeddings", help="arquivo .npy com embeddings reais (n x d) em vez dos sintéticos")
+    parser.add_argument("--max-dbscan", type=int, default=50000, help="acima disso o DBSCAN par a par não é medido")
+    parser.add_argument("--sem-umap", action="store_true", help="mede só o agrupamento")
+    args = parser.parse_args()
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "embeddings.npy")
+        if args.embeddings:
+            embeddings = np.load(args.embeddings)
+            args.comentarios = [n for n in args.comentarios if n <= len(embeddings)] or [len(embeddings)]
+        else:
+            embeddings = gerar_embeddings(max(args.comentarios))
+        np.save(caminho, embeddings)
+        del embeddings
+
+        contexto = multiprocessing.get_context("spawn")
+        print(f"{'comentários':>11} {'algoritmo':<9} {'agrupar s':>10} {'UMAP s':>8} {'total s':>8} {'pico MB':>8} {'grupos':>7} {'ruído':>6} {'ARI':>6}")
+        for quantidade in sorted(args.comentarios):
+            referencia = None
+            for algoritmo in ("dbscan", "grafo"):
+                if algoritmo == "dbscan" and quantidade > args.max_dbscan:
+                    print(f"{quantidade:>11} {algoritmo:<9} {'— (acima de --max-dbscan)':>10}")
+                    continue
+                with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                    segundos, segundos_umap, pico_mb, rotulos = executor.submit(medir, (caminho, quantidade, algoritmo, not args.sem_umap)).result()
+                if algoritmo == "dbscan":
+                    referencia = rotulos
+                # concordância com o DBSCAN original nos mesmos pontos
+                ari = f"{adjusted_rand_score(referencia, rotulos):.3f}" if referencia is not None else "—"
+                umap_s = f"{segundos_umap:.1f}" if segundos_umap is not None else "—"
+                print(f"{quantidade:>11} {algoritmo:<9} {segundos:>10.1f} {umap_s:>8} {segundos + (segundos_umap or 0):>8.1f} {pico_mb:>8.0f} "
+                      f"{len(set(rotulos) - {-1}):>7} {np.mean(rotulos == -1):>6.1%} {ari:>6}")
+
+if __name__ == "__main__":
+    main()
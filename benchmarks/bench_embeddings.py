@@ -0,0 +1,93 @@
+# bench_embeddings.py - comentários/s do encode padrão contra a codificação em lotes por tamanho
+#
+#   python benchmarks/bench_embeddings.py --comentarios 5000 --lotes 32 64 128 --threads 0 4 --max-tokens 0 64
+#   python benchmarks/bench_embeddings.py --dataset clima --coluna "Comentários"
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.codificacao import codificar_em_lotes
+from components.configuracao import MODELO_EMBEDDINGS
+
+CURTOS = ["nada", "nada a declarar", "tudo certo", "ok", "sem comentários", "gosto de trabalhar aqui"]
+FRASES = [
+    "a comunicação entre as áreas precisa melhorar",
+    "o gestor não dá retorno sobre as entregas da equipe",
+    "falta reconhecimento pelo esforço de quem fica até mais tarde",
+    "os benefícios são bons mas o salário está abaixo do mercado",
+    "o ambiente é acolhedor e os colegas ajudam quando precisamos",
+    "as metas mudam toda semana e ninguém explica o motivo",
+    "seria bom ter mais treinamentos para quem acabou de entrar",
+    "a escala de trabalho não respeita o descanso entre os turnos"
+]
+
+def gerar_corpus(quantidade: int, semente: int = 42) -> list:
+    """Comentários no perfil da pesquisa: muitos curtos ("nada") e uma cauda de textos de vários parágrafos."""
+    rng = np.random.default_rng(semente)
+    comentarios = []
+    for i in range(quantidade):
+        if rng.random() < 0.35:
+            comentarios.append(str(rng.choice(CURTOS)))
+            continue
+        # número de frases com cauda longa (lognormal): mediana ~2, alguns passam de 15
+        frases = max(1, int(rng.lognormal(0.7, 0.9)))
+        comentarios.append(". ".join(str(rng.choice(FRASES)) for _ in range(frases)) + f" ({i})")
+    return comentarios
+
+def comentarios_do_dataset(nome: str, coluna=None) -> list:
+    from components.analise_comentarios import detectar_coluna_comentarios
+    from components.armazenamento import carregar_dataset, colunas_dataset
+    colunas = [coluna] if coluna else detectar_coluna_comentarios(colunas_dataset(nome))
+    df = carregar_dataset(nome, colunas=colunas)
+    return [str(t) for col in colunas for t in df[col].dropna() if str(t).strip()]
+
+def medir(codificar, textos) -> float:
+    inicio = time.perf_counter()
+    codificar(textos)
+    return len(textos) / (time.perf_counter() - inicio)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--comentarios", type=int, default=5000, help="tamanho do corpus sintético")
+    parser.add_argument("--dataset", help="usa os comentários de um dataset salvo em vez do corpus sintético")
+    parser.add_argument("--coluna", help="coluna de comentários do dataset (padrão: todas as detectadas)")
+    parser.add_argument("--modelo", default=MODELO_EMBEDDINGS)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="threads do torch (0 = padrão)")
+    parser.add_argument("--max-tokens", type=int, nargs="+", default=[0], help="tokens por comentário (0 = o do modelo)")
+    args = parser.parse_args()
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    textos = comentarios_do_dataset(args.dataset, args.coluna) if args.dataset else gerar_corpus(args.comentarios)
+    comprimentos = np.array([len(t) for t in textos])
+    print(f"{len(textos)} comentários; caracteres: mediana {np.median(comprimentos):.0f}, "
+          f"p95 {np.percentile(comprimentos, 95):.0f}, máx {comprimentos.max()}")
+
+    modelo = SentenceTransformer(args.modelo)
+    tokens_modelo = modelo.max_seq_length
+    threads_padrao = torch.get_num_threads()
+    # aquecimento: a primeira chamada inclui custos fixos do torch
+    modelo.encode(textos[:64], show_progress_bar=False)
+
+    print(f"{'modo':<22} {'lote':>5} {'threads':>8} {'tokens':>7} {'coment./s':>10}")
+    for threads in args.threads:
+        torch.set_num_threads(threads or threads_padrao)
+        for max_tokens in args.max_tokens:
+            modelo.max_seq_length = max_tokens or tokens_modelo
+            # referência: como estava em clusterizar_comentarios (lote padrão de 32, uma única chamada)
+            taxa = medir(lambda t: modelo.encode(t, show_progress_bar=False), textos)
+            print(f"{'encode padrão':<22} {32:>5} {threads or threads_padrao:>8} {modelo.max_seq_length:>7} {taxa:>10.1f}")
+            for lote in args.lotes:
+                taxa = medir(lambda t: codificar_em_lotes(modelo, t, tamanho_lote=lote), textos)
+                print(f"{'lotes por tamanho':<22} {lote:>5} {threads or threads_padrao:>8} {modelo.max_seq_length:>7} {taxa:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench_excel.py - compara exportar_excel_formatado (em memória) com exportar_excel_streaming (write-only)
+#
+#   python benchmarks/bench_excel.py --linhas 5000 20000 --colunas 60
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.excel_formatador import exportar_excel_formatado, exportar_excel_streaming
+from tests.pesquisa_sintetica import gerar_pesquisa
+
+def medir(exportar, df):
+    inicio = time.perf_counter()
+    saida = exportar(df)
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    exportar(df)
+    pico_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return saida, segundos, pico_mb
+
+def mesma_planilha(a, b) -> bool:
+    """Confere valores, preenchimento, negrito e quebra de linha de todas as células."""
+    wa, wb = load_workbook(a).active, load_workbook(b).active
+    if wa.max_row != wb.max_row or wa.max_column != wb.max_column:
+        return False
+    for linha_a, linha_b in zip(wa.iter_rows(), wb.iter_rows()):
+        for ca, cb in zip(linha_a, linha_b):
+            if ca.value != cb.value:
+                return False
+            if ca.value is None:
+                continue
+            if (ca.fill.fgColor.rgb, ca.font.b, ca.alignment.wrap_text) != (cb.fill.fgColor.rgb, cb.font.b, cb.alignment.wrap_text):
+                return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--colunas", type=int, default=60)
+    parser.add_argument("--sem-verificar", action="store_true", help="não compara o conteúdo das duas planilhas")
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'exportador':<12} {'segundos':>9} {'linhas/s':>10} {'pico MB':>9}")
+    for linhas in args.linhas:
+        df = gerar_pesquisa(linhas, args.colunas)
+        saidas = {}
+        for nome, exportar in (("formatado", exportar_excel_formatado), ("streaming", exportar_excel_streaming)):
+            saidas[nome], segundos, pico_mb = medir(exportar, df)
+            print(f"{linhas:>8} {nome:<12} {segundos:>9.2f} {linhas / segundos:>10.0f} {pico_mb:>9.1f}")
+        if not args.sem_verificar:
+            print(f"{'':>8} conteúdo idêntico: {'sim' if mesma_planilha(saidas['formatado'], saidas['streaming']) else 'NÃO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# qualidade_quantizacao.py - compara o modelo int8 (quantização dinâmica) com o fp32 numa amostra fixa
+#
+#   python benchmarks/qualidade_quantizacao.py --comentarios 3000
+#   python benchmarks/qualidade_quantizacao.py --dataset clima --amostra 3000
+#
+# Sai com código 1 se a similaridade ou a concordância dos grupos ficar abaixo dos mínimos.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_embeddings import comentarios_do_dataset, gerar_corpus
+from components.codificacao import codificar_em_lotes, quantizar_int8
+from components.configuracao import MODELO_EMBEDDINGS
+from components.modelos import _memoria_residente_mb, _tamanho_pesos_mb
+
+def amostra_fixa(textos: list, tamanho: int, semente: int = 0) -> list:
+    """Sempre os mesmos comentários para a mesma entrada: a comparação pode ser repetida a cada troca de versão."""
+    if len(textos) <= tamanho:
+        return textos
+    return [textos[i] for i in sorted(np.random.default_rng(semente).choice(len(textos), tamanho, replace=False))]
+
+def normalizar_linhas(matriz: np.ndarray) -> np.ndarray:
+    return matriz / np.maximum(np.linalg.norm(matriz, axis=1, keepdims=True), 1e-12)
+
+def vizinhos(matriz: np.ndarray, k: int) -> np.ndarray:
+    similaridade = matriz @ matriz.T
+    np.fill_diagonal(similaridade, -np.inf)
+    return np.argpartition(-similaridade, k, axis=1)[:, :k]
+
+def sobreposicao_vizinhos(a: np.ndarray, b: np.ndarray, k: int = 10) -> float:
+    """Fração dos k vizinhos mais próximos (cosseno) de cada comentário que os dois modelos concordam."""
+    va, vb = vizinhos(a, k), vizinhos(b, k)
+    return float(np.mean([len(set(x) & set(y)) / k for x, y in zip(va, vb)]))
+
+def carregar(nome: str, int8: bool):
+    from sentence_transformers import SentenceTransformer
+    memoria_antes = _memoria_residente_mb()
+    modelo = SentenceTransformer(nome, device="cpu")
+    if int8:
+        quantizar_int8(modelo)
+    return modelo, _memoria_residente_mb() - memoria_antes
+
+def codificar(modelo, textos):
+    codificar_em_lotes(modelo, textos[:64])  # aquecimento
+    inicio = time.perf_counter()
+    vetores = codificar_em_lotes(modelo, textos)
+    return vetores, len(textos) / (time.perf_counter() - inicio)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--comentarios", type=int, default=3000, help="tamanho do corpus sintético")
+    parser.add_argument("--dataset", help="usa os comentários de um dataset salvo em vez do corpus sintético")
+    parser.add_argument("--coluna", help="coluna de comentários do dataset (padrão: todas as detectadas)")
+    parser.add_argument("--amostra", type=int, default=3000, help="comentários comparados (amostra fixa)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--modelo", default=MODELO_EMBEDDINGS)
+    parser.add_argument("--min-cosseno", type=float, default=0.98, help="mínimo da similaridade média fp32 x int8")
+    parser.add_argument("--min-ari", type=float, default=0.8, help="mínimo do Adjusted Rand Index entre os grupos")
+    args = parser.parse_args()
+
+    from components.analise_comentarios import agrupar_unicos
+
+    textos = comentarios_do_dataset(args.dataset, args.coluna) if args.dataset else gerar_corpus(args.comentarios)
+    textos = amostra_fixa(list(dict.fromkeys(textos)), args.amostra, args.semente)
+    print(f"{len(textos)} comentários na amostra")
+
+    resultados = {}
+    for modo in ("fp32", "int8"):
+        modelo, memoria_mb = carregar(args.modelo, modo == "int8")
+        vetores, taxa = codificar(modelo, textos)
+        resultados[modo] = {"vetores": vetores, "taxa": taxa, "memoria_mb": memoria_mb, "pesos_mb": _tamanho_pesos_mb(modelo),
+                            "grupos": agrupar_unicos(vetores)[0]}
+        del modelo
+
+    print(f"{'modo':<6} {'coment./s':>10} {'pesos MB':>9} {'+RSS MB':>8} {'grupos':>7} {'sem grupo':>10}")
+    for modo, r in resultados.items():
+        grupos = r["grupos"]
+        print(f"{modo:<6} {r['taxa']:>10.1f} {r['pesos_mb']:>9.1f} {r['memoria_mb']:>8.0f} "
+              f"{len(set(grupos) - {-1}):>7} {np.mean(grupos == -1):>10.1%}")
+
+    fp32, int8 = resultados["fp32"], resultados["int8"]
+    a, b = normalizar_linhas(fp32["vetores"]), normalizar_linhas(int8["vetores"])
+    cosseno = np.sum(a * b, axis=1)
+    ari = adjusted_rand_score(fp32["grupos"], int8["grupos"])
+    print(f"\nganho de velocidade: {int8['taxa'] / fp32['taxa']:.2f}x")
+    print(f"cosseno fp32 x int8 por comentário: média {cosseno.mean():.4f}, p5 {np.percentile(cosseno, 5):.4f}, mínimo {cosseno.min():.4f}")
+    print(f"vizinhos (k=10) em comum: {sobreposicao_vizinhos(a, b):.1%}")
+    print(f"grupos: ARI {ari:.3f}, NMI {normalized_mutual_info_score(fp32['grupos'], int8['grupos']):.3f}")
+
+    aprovado = cosseno.mean() >= args.min_cosseno and ari >= args.min_ari
+    print(f"\n{'APROVADO' if aprovado else 'REPROVADO'} (mínimos: cosseno {args.min_cosseno}, ARI {args.min_ari})")
+    sys.exit(0 if aprovado else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# agregacoes.py - agregações da pesquisa, usadas pelos gráficos e pelo processamento em lote (sem Streamlit)
+
+import pandas as pd
+
+from components.catalogo import PERGUNTAS, ROTULOS, coluna_por_id, resolver_colunas
+
+def sem_categorias(dados, colunas):
+    """Devolve colunas categóricas como valores simples (o Plotly agrupa categorias não observadas)"""
+    for col in colunas:
+        if isinstance(dados[col].dtype, pd.CategoricalDtype):
+            dados[col] = dados[col].astype(object)
+    return dados
+
+def selecionar(df, colunas, linhas=None):
+    """Só as colunas pedidas, restritas às posições `linhas` (as demais colunas não são copiadas)."""
+    parte = df[colunas]
+    return parte if linhas is None else parte.take(linhas)
+
+def formatar_porcentagem(df, group_cols, value_col=None):
+    """Função auxiliar para calcular porcentagens"""
+    if value_col:
+        total = df.groupby(group_cols, observed=True)[value_col].sum().reset_index()
+        contagem = df.groupby(group_cols + [value_col], observed=True).size().reset_index(name='Contagem')
+        merged = pd.merge(contagem, total, on=group_cols, suffixes=('', '_total'))
+        merged['Porcentagem'] = (merged['Contagem'] / merged['Contagem_total']) * 100
+        return sem_categorias(merged, group_cols + [value_col])
+    else:
+        contagem = df.groupby(group_cols, observed=True).size().reset_index(name='Contagem')
+        total = contagem['Contagem'].sum()
+        contagem['Porcentagem'] = (contagem['Contagem'] / total) * 100
+        return sem_categorias(contagem, group_cols)
+
+def notas(df, coluna_nota, linhas=None):
+    """Notas como float (sem alterar o DataFrame recebido) junto com a BASE"""
+    df = selecionar(df, ["BASE", coluna_nota], linhas)
+    return pd.DataFrame({
+        "BASE": df["BASE"].astype(object),
+        coluna_nota: pd.to_numeric(df[coluna_nota], errors='coerce').astype(float)
+    })
+
+def quartis_por_base(dados: pd.DataFrame, coluna_nota: str) -> pd.DataFrame:
+    """Estatísticas do boxplot por BASE (quartis lineares e cercas de Tukey), calculadas no servidor.
+
+    `dados` no formato de `notas`. As cercas são o menor/maior valor dentro de 1,5 x IQR, como no Plotly.
+    """
+    dados = dados.dropna(subset=[coluna_nota])
+    grupos = dados.groupby("BASE", sort=False)[coluna_nota]
+    resumo = grupos.quantile([0.25, 0.5, 0.75]).unstack()
+    resumo.columns = ["q1", "mediana", "q3"]
+    iqr = resumo["q3"] - resumo["q1"]
+    dentro = dados[coluna_nota].between(dados["BASE"].map(resumo["q1"] - 1.5 * iqr), dados["BASE"].map(resumo["q3"] + 1.5 * iqr))
+    cercas = dados[dentro].groupby("BASE", sort=False)[coluna_nota].agg(["min", "max"])
+    resumo["cerca_inferior"] = cercas["min"]
+    resumo["cerca_superior"] = cercas["max"]
+    resumo["n"] = grupos.size()
+    return resumo.reset_index()
+
+def amostra_outliers(dados: pd.DataFrame, coluna_nota: str, quartis: pd.DataFrame, max_por_base: int = 200, semente: int = 0) -> pd.DataFrame:
+    """Até `max_por_base` pontos fora das cercas de cada BASE (amostra reprodutível)."""
+    dados = dados.dropna(subset=[coluna_nota]).join(quartis.set_index("BASE")[["cerca_inferior", "cerca_superior"]], on="BASE")
+    fora = dados[(dados[coluna_nota] < dados["cerca_inferior"]) | (dados[coluna_nota] > dados["cerca_superior"])]
+    ordem = fora.sample(frac=1, random_state=semente)
+    return ordem[ordem.groupby("BASE", sort=False).cumcount() < max_por_base][["BASE", coluna_nota]]
+
+def agregados_por_base(df: pd.DataFrame) -> pd.DataFrame:
+    """Respostas, participação e estatísticas da nota geral (0 a 10) por BASE."""
+    resumo = formatar_porcentagem(df, ['BASE']).rename(columns={'Contagem': 'Respostas'})
+    coluna_nota = coluna_por_id(df.columns, "NOTA_GERAL")
+    if coluna_nota:
+        estatisticas = notas(df, coluna_nota).groupby("BASE")[coluna_nota].agg(['count', 'mean', 'median', 'std'])
+        estatisticas.columns = ['Respostas com Nota', 'Nota Média', 'Nota Mediana', 'Desvio Padrão']
+        resumo = resumo.merge(estatisticas.reset_index(), on='BASE', how='left')
+    return resumo
+
+def distribuicao_por_questao(df: pd.DataFrame) -> pd.DataFrame:
+    """Tabela longa com a distribuição de respostas de cada pergunta fechada, por BASE."""
+    mapa = resolver_colunas(df.columns)
+    partes = []
+    for pergunta in PERGUNTAS:
+        coluna = mapa.get(pergunta["id"])
+        if not coluna or pergunta["tipo"] not in ("likert", "nota"):
+            continue
+        contagem = df.groupby(['BASE', coluna], observed=True).size().reset_index(name='Contagem')
+        contagem['Porcentagem'] = contagem['Contagem'] / contagem.groupby('BASE', observed=True)['Contagem'].transform('sum') * 100
+        contagem = sem_categorias(contagem.rename(columns={coluna: 'Resposta'}), ['BASE', 'Resposta'])
+        contagem.insert(1, 'ID', pergunta["id"])
+        contagem.insert(2, 'Dimensão', pergunta["dimensao"])
+        contagem.insert(3, 'Pergunta', ROTULOS[pergunta["id"]])
+        partes.append(contagem)
+    if not partes:
+        return pd.DataFrame(columns=['BASE', 'ID', 'Dimensão', 'Pergunta', 'Resposta', 'Contagem', 'Porcentagem'])
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,80 @@
+# agrupamento.py - grupos de comentários por densidade sobre um grafo de k vizinhos aproximados (sem matriz n x n)
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from components.configuracao import AGRUPAMENTO_COMENTARIOS, LIMITE_DBSCAN_COMENTARIOS
+
+# mesmos parâmetros do DBSCAN original e do UMAP do mapa semântico
+EPS_AGRUPAMENTO = 0.35
+MIN_AMOSTRAS_AGRUPAMENTO = 3
+VIZINHOS_GRAFO = 15
+ALGORITMOS_AGRUPAMENTO = ("auto", "dbscan", "grafo")
+# muda quando o mesmo conjunto de vetores passa a dar outros grupos ou outro mapa (invalida os guardados)
+REVISAO_AGRUPAMENTO = 2
+
+def usar_grafo(quantidade: int, algoritmo: str = AGRUPAMENTO_COMENTARIOS) -> bool:
+    if algoritmo not in ALGORITMOS_AGRUPAMENTO:
+        raise ValueError(f"CLIMA_AGRUPAMENTO_COMENTARIOS deve ser um de {ALGORITMOS_AGRUPAMENTO}, não '{algoritmo}'")
+    # o grafo precisa de mais pontos que vizinhos; abaixo disso só o DBSCAN faz sentido
+    if quantidade <= VIZINHOS_GRAFO:
+        return False
+    return algoritmo == "grafo" or (algoritmo == "auto" and quantidade >= LIMITE_DBSCAN_COMENTARIOS)
+
+def vetores_unicos(embeddings: np.ndarray):
+    """(vetores distintos, posição de cada linha entre eles, repetições de cada um).
+
+    Respostas idênticas ("nada", "ok") têm o mesmo vetor: viram um ponto só, com as repetições como peso.
+    """
+    unicos, inverso, contagens = np.unique(embeddings, axis=0, return_inverse=True, return_counts=True)
+    return unicos, inverso.ravel(), contagens
+
+def grafo_vizinhos(embeddings: np.ndarray, k: int = VIZINHOS_GRAFO, semente: int = 42):
+    """(índices, distâncias cosseno, índice de busca) dos k vizinhos aproximados de cada ponto, incluindo ele mesmo.
+
+    É o formato de `precomputed_knn` do UMAP: o mesmo grafo serve ao agrupamento e à projeção.
+    Memória e tempo crescem com n·k, não com n².
+    """
+    from pynndescent import NNDescent
+    indice = NNDescent(embeddings, n_neighbors=k, metric="cosine", random_state=semente, low_memory=True)
+    indices, distancias = indice.neighbor_graph
+    return indices, distancias, indice
+
+def dbscan_no_grafo(indices: np.ndarray, distancias: np.ndarray, eps: float = EPS_AGRUPAMENTO,
+                    min_amostras: int = MIN_AMOSTRAS_AGRUPAMENTO, contagens: np.ndarray = None) -> np.ndarray:
+    """Critério do DBSCAN restrito às arestas do grafo: rótulo por ponto, -1 para ruído.
+
+    Núcleo: pelo menos `min_amostras` pontos (ele incluso) a até `eps`, cada um valendo o que diz `contagens`
+    (o `sample_weight` do DBSCAN). Núcleos vizinhos formam um grupo; os demais pontos a até `eps` de um núcleo
+    entram no grupo do núcleo mais próximo. O grafo deve ser montado sobre vetores distintos (`vetores_unicos`):
+    com repetições, k cópias de uma mesma resposta ocupariam todos os vizinhos e partiriam o bloco.
+    Igual ao DBSCAN quando nenhuma vizinhança de raio `eps` passa de k pontos distintos; acima disso
+    faltam arestas e um grupo pode sair dividido ou um ponto de borda virar ruído.
+    """
+    n, k = indices.shape
+    linhas = np.repeat(np.arange(n), k)
+    colunas = indices.ravel()
+    dist = distancias.ravel()
+    # pynndescent marca vizinhos não encontrados com -1; o próprio ponto não conta como aresta
+    validas = (colunas >= 0) & (colunas != linhas) & (dist <= eps)
+    # peso = 2 - distância (> 0 para cosseno): zeros sumiriam da matriz esparsa e o maior peso é o mais próximo
+    pesos = csr_matrix((2.0 - dist[validas], (linhas[validas], colunas[validas])), shape=(n, n))
+    pesos = pesos.maximum(pesos.T).tocsr()
+
+    if contagens is None:
+        contagens = np.ones(n, dtype=np.int64)
+    vizinhos = csr_matrix((np.ones(pesos.nnz), pesos.indices, pesos.indptr), shape=(n, n))
+    nucleo = vizinhos @ contagens + contagens >= min_amostras
+    rotulos = np.full(n, -1, dtype=np.int64)
+    if not nucleo.any():
+        return rotulos
+    _, componentes = connected_components(pesos[nucleo][:, nucleo], directed=False)
+    rotulos[nucleo] = componentes
+
+    bordas = np.flatnonzero(~nucleo)
+    ate_nucleo = pesos[bordas][:, nucleo]
+    alcancadas = ate_nucleo.getnnz(axis=1) > 0
+    mais_proximo = np.asarray(ate_nucleo.argmax(axis=1)).ravel()
+    rotulos[bordas[alcancadas]] = componentes[mais_proximo[alcancadas]]
+    return rotulos
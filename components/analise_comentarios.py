@@ -0,0 +1,203 @@
+# analise_comentarios.py - sentimento, agrupamento semântico e relatório dos comentários (sem Streamlit)
+
+import unicodedata
+import re
+from collections import Counter
+from io import BytesIO
+from typing import List, Tuple, Dict
+
+import pandas as pd
+from sklearn.cluster import DBSCAN
+import umap.umap_ as umap
+from textblob import TextBlob
+from wordcloud import WordCloud, STOPWORDS
+import matplotlib.pyplot as plt
+
+from components.agrupamento import (EPS_AGRUPAMENTO, MIN_AMOSTRAS_AGRUPAMENTO, REVISAO_AGRUPAMENTO, VIZINHOS_GRAFO,
+                                     dbscan_no_grafo, grafo_vizinhos, usar_grafo, vetores_unicos)
+from components.cache_embeddings import codificar_com_cache
+from components.codificacao import codificar_em_lotes, progresso_no_log, versao_embeddings
+from components.configuracao import AGRUPAMENTO_COMENTARIOS, LIMITE_DBSCAN_COMENTARIOS, MODELO_EMBEDDINGS
+from components.modelos import obter_modelo
+
+# Stopwords em português ampliadas
+STOPWORDS_PT = set(STOPWORDS).union({
+    'que', 'com', 'para', 'não', 'mais', 'muito', 'mesmo', 'assim',
+    'também', 'como', 'ainda', 'cada', 'ser', 'foi', 'isso', 'essa',
+    'está', 'estao', 'estavam', 'já', 'a', 'e', 'i', 'o', 'u',
+    'da', 'de', 'di', 'do', 'du', 'é', 'tem', 'pois', 'em', 'seu', 'sua', 'seus', 'suas',
+    'empresa', 'setor', 'trabalho', 'colaborador', 'colaboradores',
+    'gestor', 'gestora', 'área', 'pessoas', 'atividade', 'atividades',
+    'bom', 'boa', 'sim', 'não', 'pode', 'poderia', 'há', 'tudo', 'nada',
+    'todo', 'toda', 'todos', 'todas', 'mesma', 'mesmo', 'além', 'quando',
+    'onde', 'qual', 'quais', 'porque', 'pra', 'fazer', 'feito', 'faz', 'fez'
+})
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8')
+    return texto.lower().strip()
+
+def detectar_coluna_comentarios(df):
+    keywords = ["coment"]
+    comentarios_colunas = []
+    # aceita um DataFrame ou diretamente a lista de colunas (datasets salvos)
+    for col in getattr(df, "columns", df):
+        nome_normalizado = normalizar(col)
+        if any(keyword in nome_normalizado for keyword in keywords):
+            comentarios_colunas.append(col)
+    return comentarios_colunas
+
+def analisar_sentimento(texto):
+    blob = TextBlob(texto)
+    polaridade = blob.sentiment.polarity
+    if polaridade > 0.2:
+        return ("Positivo", polaridade)
+    elif polaridade < -0.2:
+        return ("Negativo", polaridade)
+    else:
+        return ("Neutro", polaridade)
+
+def extrair_palavras_chave(textos: List[str], n_words=10) -> Dict[str, List[Tuple[str, int]]]:
+    palavras_chave = {}
+    for texto in textos:
+        palavras = re.findall(r'\b\w{4,}\b', texto.lower())
+        palavras_filtradas = [p for p in palavras if p not in STOPWORDS_PT]
+        contador = Counter(palavras_filtradas)
+        palavras_chave[texto] = contador.most_common(n_words)
+    return palavras_chave
+
+def agrupar_embeddings(embeddings, grafo=None, contagens=None):
+    """Rótulo de grupo de cada vetor (-1 = sem grupo); `contagens` dá o peso de cada um (repetições).
+
+    Com `grafo` (de `grafo_vizinhos`), o mesmo critério do DBSCAN sem calcular todas as distâncias par a par.
+    """
+    if grafo is not None:
+        return dbscan_no_grafo(grafo[0], grafo[1], contagens=contagens)
+    clusterizador = DBSCAN(eps=EPS_AGRUPAMENTO, min_samples=MIN_AMOSTRAS_AGRUPAMENTO, metric='cosine', n_jobs=-1)
+    return clusterizador.fit_predict(embeddings, sample_weight=contagens)
+
+def agrupar_unicos(embeddings, algoritmo=AGRUPAMENTO_COMENTARIOS):
+    """Agrupa cada comentário repetido uma vez só, com as repetições como peso (mesmos grupos do DBSCAN com todos).
+
+    Devolve (rótulo por comentário, vetores distintos, posição de cada comentário entre eles, grafo ou None).
+    """
+    unicos, inverso, contagens = vetores_unicos(embeddings)
+    grafo = grafo_vizinhos(unicos) if usar_grafo(len(unicos), algoritmo) else None
+    return agrupar_embeddings(unicos, grafo, contagens)[inverso], unicos, inverso, grafo
+
+def clusterizar_comentarios(lista_textos, mostrar_progresso=True, progresso=None):
+    """`progresso(feitos, total)` acompanha a codificação; sem ele, `mostrar_progresso` registra o avanço no log."""
+    # o mesmo modelo para todas as sessões do processo (carregado na primeira vez ou no aquecimento)
+    modelo = obter_modelo()
+    if progresso is None and mostrar_progresso:
+        progresso = progresso_no_log()
+    # só os comentários que a loja em disco ainda não tem passam pelo modelo
+    embeddings, _ = codificar_com_cache(lista_textos, lambda textos: codificar_em_lotes(modelo, textos, progresso=progresso),
+                                        versao=versao_embeddings())
+    # muitos comentários: um grafo de vizinhos aproximados serve ao agrupamento e ao UMAP (que não monta outro)
+    labels, unicos, inverso, grafo = agrupar_unicos(embeddings)
+    reducer = umap.UMAP(n_neighbors=VIZINHOS_GRAFO, min_dist=0.1, metric='cosine', random_state=42,
+                        precomputed_knn=grafo or (None, None, None))
+    if len(unicos) > VIZINHOS_GRAFO:
+        # repetições caem no mesmo ponto do mapa
+        reduzido = reducer.fit_transform(unicos)[inverso]
+    else:
+        # com 2 ou 3 vetores distintos a inicialização espectral do UMAP falha: projeta todos, como antes
+        reduzido = reducer.fit_transform(embeddings)
+    return labels, reduzido, embeddings
+
+def gerar_wordcloud(textos):
+    texto_completo = ' '.join(textos)
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        stopwords=STOPWORDS_PT,
+        max_words=50,
+        collocations=False
+    ).generate(texto_completo)
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis('off')
+    return fig
+
+def analisar_topicos_por_cluster(df):
+    topicos = {}
+    for cluster in df['Cluster'].unique():
+        textos_cluster = df[df['Cluster'] == cluster]['comentario']
+        palavras = ' '.join(textos_cluster).split()
+        palavras_filtradas = [p for p in palavras if len(p) > 3 and p not in STOPWORDS_PT]
+        contador = Counter(palavras_filtradas)
+        topicos[cluster] = contador.most_common(5)
+    return topicos
+
+def analisar_sentimentos(comentarios) -> pd.DataFrame:
+    """Um comentário por linha, com o sentimento e a polaridade."""
+    df_sent = pd.DataFrame({"comentario": comentarios})
+    df_sent[["Sentimento", "Pontuacao"]] = df_sent["comentario"].apply(lambda x: pd.Series(analisar_sentimento(x)))
+    return df_sent
+
+def agrupar_comentarios(df_sent: pd.DataFrame, mostrar_progresso=True, progresso=None):
+    """Acrescenta Cluster e as coordenadas do mapa semântico; devolve também os tópicos de cada grupo."""
+    labels, coords, embeddings = clusterizar_comentarios(df_sent["comentario"].tolist(), mostrar_progresso, progresso)
+    df_sent["Cluster"] = labels
+    df_sent["x"] = coords[:, 0]
+    df_sent["y"] = coords[:, 1]
+    return df_sent, analisar_topicos_por_cluster(df_sent)
+
+def identidade_agrupamento() -> dict:
+    """Configurações que mudam os grupos e o mapa; entram na chave dos resultados guardados em disco."""
+    return {
+        "modelo": MODELO_EMBEDDINGS,
+        "versao": versao_embeddings(),
+        "agrupamento": AGRUPAMENTO_COMENTARIOS,
+        "revisao": REVISAO_AGRUPAMENTO,
+        "limite_dbscan": LIMITE_DBSCAN_COMENTARIOS
+    }
+
+def grupos_em_bytes(df_sent: pd.DataFrame) -> bytes:
+    """Cluster e coordenadas do mapa em Parquet, para guardar o agrupamento como artefato."""
+    destino = BytesIO()
+    df_sent[["Cluster", "x", "y"]].reset_index(drop=True).to_parquet(destino, index=False)
+    return destino.getvalue()
+
+def restaurar_grupos(df_sent: pd.DataFrame, dados: bytes):
+    """Inverso de `grupos_em_bytes` (mesmos comentários, na mesma ordem): (df_sent, topicos_por_cluster)."""
+    grupos = pd.read_parquet(BytesIO(dados))
+    for coluna in ("Cluster", "x", "y"):
+        df_sent[coluna] = grupos[coluna].to_numpy()
+    return df_sent, analisar_topicos_por_cluster(df_sent)
+
+def analisar_comentarios(comentarios, mostrar_progresso=True):
+    """Sentimento + agrupamento de uma série de comentários: (df_sent, topicos_por_cluster)."""
+    return agrupar_comentarios(analisar_sentimentos(comentarios), mostrar_progresso)
+
+def gerar_relatorio_markdown(df_sent: pd.DataFrame, topicos_por_cluster: dict, base: str, coluna: str) -> str:
+    report = f"""
+        # Relatório de Análise de Comentários - {base}
+        ## Dados Gerais
+        - Total de comentários analisados: {len(df_sent)}
+        - Período de referência: 2025
+        - Tema analisado: {coluna}
+
+        ## Distribuição de Sentimentos
+        - Positivos: {len(df_sent[df_sent['Sentimento'] == 'Positivo'])} ({len(df_sent[df_sent['Sentimento'] == 'Positivo'])/len(df_sent):.1%})
+        - Neutros: {len(df_sent[df_sent['Sentimento'] == 'Neutro'])} ({len(df_sent[df_sent['Sentimento'] == 'Neutro'])/len(df_sent):.1%})
+        - Negativos: {len(df_sent[df_sent['Sentimento'] == 'Negativo'])} ({len(df_sent[df_sent['Sentimento'] == 'Negativo'])/len(df_sent):.1%})
+
+        ## Principais Insights
+        """
+    for cluster_id in sorted(df_sent["Cluster"].unique()):
+        cluster_data = df_sent[df_sent["Cluster"] == cluster_id]
+        nome_cluster = "Comentários Únicos" if cluster_id == -1 else f"Grupo {cluster_id}"
+        report += f"""
+            ### {nome_cluster} ({len(cluster_data)} comentários)
+            **Tópicos principais:** {', '.join([t[0] for t in topicos_por_cluster.get(cluster_id, [])])}
+            **Sentimento predominante:** {cluster_data["Sentimento"].mode()[0]}
+
+            **Exemplos representativos:**
+            """
+        for linha in cluster_data["comentario"].head(3):
+            report += f"- {linha}\n"
+        report += "\n"
+    return report
@@ -0,0 +1,194 @@
+# armazenamento.py - datasets unificados gravados em disco (Parquet particionado por BASE)
+
+import json
+import re
+import shutil
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from components.configuracao import DIRETORIO_DATASETS
+from components.ingestao import hashes_linhas
+from components.esquema import tipar_dataset
+
+ARQUIVO_META = "_meta.json"
+# hashes (uint64, ordenados e únicos) de todas as linhas gravadas, usados na deduplicação incremental
+ARQUIVO_HASHES = "_hashes.npy"
+
+def _particionamento():
+    # tipo fixo: evita que uma base chamada "2025" seja lida como inteiro
+    return ds.partitioning(pa.schema([("BASE", pa.string())]), flavor="hive")
+
+def nome_seguro(nome: str) -> str:
+    return re.sub(r"[^\w\-]+", "_", nome.strip()).strip("_") or "dataset"
+
+def _diretorio(nome: str, diretorio=None):
+    return (diretorio or DIRETORIO_DATASETS) / nome_seguro(nome)
+
+def ler_meta(nome: str, diretorio=None) -> dict:
+    caminho = _diretorio(nome, diretorio) / ARQUIVO_META
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def _gravar_meta(destino, meta: dict):
+    temporario = destino / (ARQUIVO_META + ".tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+    temporario.replace(destino / ARQUIVO_META)
+
+def _ler_hashes(origem) -> np.ndarray:
+    caminho = origem / ARQUIVO_HASHES
+    return np.load(caminho) if caminho.exists() else np.empty(0, dtype=np.uint64)
+
+def _gravar_hashes(destino, hashes: np.ndarray):
+    temporario = destino / (ARQUIVO_HASHES + ".tmp.npy")
+    np.save(temporario, np.unique(hashes))
+    temporario.replace(destino / ARQUIVO_HASHES)
+
+def _contar_bases(df: pd.DataFrame) -> dict:
+    return {str(k): int(v) for k, v in df["BASE"].value_counts(sort=False).items()}
+
+def listar_datasets(diretorio=None) -> list:
+    diretorio = diretorio or DIRETORIO_DATASETS
+    if not diretorio.exists():
+        return []
+    return sorted(p.name for p in diretorio.iterdir() if (p / ARQUIVO_META).exists())
+
+def colunas_dataset(nome: str, diretorio=None) -> list:
+    return ler_meta(nome, diretorio)["colunas"]
+
+def bases_dataset(nome: str, diretorio=None) -> dict:
+    """Bases do dataset com o número de linhas de cada uma (lido só dos metadados)."""
+    return ler_meta(nome, diretorio)["bases"]
+
+def salvar_dataset(df: pd.DataFrame, nome: str, diretorio=None) -> str:
+    """Grava (ou substitui) o dataset `nome`, uma partição por BASE. Retorna o nome usado em disco."""
+    destino = _diretorio(nome, diretorio)
+    temporario = destino.with_name(destino.name + ".tmp")
+    shutil.rmtree(temporario, ignore_errors=True)
+
+    df = df.copy()
+    df["BASE"] = df["BASE"].astype(str)
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        tabela,
+        temporario,
+        format="parquet",
+        partitioning=_particionamento(),
+        basename_template="part-{i}.parquet"
+    )
+    _gravar_hashes(temporario, hashes_linhas(df))
+    _gravar_meta(temporario, {
+        "nome": destino.name,
+        "colunas": list(df.columns),
+        "bases": _contar_bases(df),
+        "linhas": len(df),
+        "atualizado_em": datetime.now().isoformat(timespec="seconds")
+    })
+
+    # troca o diretório antigo pelo novo só depois da gravação completa
+    if destino.exists():
+        antigo = destino.with_name(destino.name + ".old")
+        shutil.rmtree(antigo, ignore_errors=True)
+        destino.rename(antigo)
+        temporario.rename(destino)
+        shutil.rmtree(antigo, ignore_errors=True)
+    else:
+        temporario.rename(destino)
+    return destino.name
+
+def carregar_dataset(nome: str, bases=None, colunas=None, diretorio=None) -> pd.DataFrame:
+    """Lê só as partições (`bases`) e as colunas pedidas. BASE sempre vem como primeira coluna."""
+    origem = _diretorio(nome, diretorio)
+    meta = ler_meta(nome, diretorio)
+    conjunto = ds.dataset(origem, format="parquet", partitioning=_particionamento(), exclude_invalid_files=True)
+
+    if colunas is None:
+        colunas = meta["colunas"]
+    colunas = ["BASE"] + [c for c in colunas if c != "BASE"]
+    filtro = ds.field("BASE").isin(list(bases)) if bases is not None else None
+
+    # a partição BASE volta como texto; a tipagem é refeita (as demais colunas já vêm tipadas do Parquet)
+    return tipar_dataset(conjunto.to_table(columns=colunas, filter=filtro).to_pandas())
+
+def anexar_ao_dataset(df_novo: pd.DataFrame, nome: str, diretorio=None) -> dict:
+    """Acrescenta ao dataset só as linhas ainda não gravadas, comparando hashes de linha com o índice salvo.
+
+    O histórico não é relido: apenas as linhas novas são hasheadas e gravadas como novos arquivos nas
+    partições das suas bases. Se o lote trouxer colunas novas (ou tipos incompatíveis), o dataset é
+    reescrito por inteiro.
+    """
+    origem = _diretorio(nome, diretorio)
+    if not (origem / ARQUIVO_META).exists():
+        salvar_dataset(df_novo, nome, diretorio)
+        return {"novas": len(df_novo), "duplicadas": 0, "reescrito": True}
+
+    meta = ler_meta(nome, diretorio)
+    colunas = meta["colunas"]
+    if set(df_novo.columns) - set(colunas):
+        return _reescrever_com(df_novo, nome, diretorio)
+
+    # colunas do dataset ausentes no lote (planilha de um layout anterior): gravadas como nulas no tipo salvo
+    ausentes = [c for c in colunas if c not in df_novo.columns]
+    df_novo = df_novo.reindex(columns=colunas).copy()
+    df_novo["BASE"] = df_novo["BASE"].astype(str)
+    hashes = hashes_linhas(df_novo)
+    existentes = _ler_hashes(origem)
+
+    # repetidas dentro do lote ou já presentes no índice (busca binária no índice ordenado)
+    posicoes = np.searchsorted(existentes, hashes).clip(max=max(len(existentes) - 1, 0))
+    ja_gravadas = existentes[posicoes] == hashes if len(existentes) else np.zeros(len(hashes), dtype=bool)
+    manter = ~ja_gravadas & ~pd.Series(hashes).duplicated().to_numpy()
+    df_novo = df_novo[manter]
+    resumo = {"novas": int(manter.sum()), "duplicadas": int((~manter).sum()), "reescrito": False}
+    if df_novo.empty:
+        return resumo
+
+    esquema = ds.dataset(origem, format="parquet", partitioning=_particionamento(), exclude_invalid_files=True).schema
+    try:
+        presentes = df_novo.drop(columns=ausentes)
+        tabela = pa.Table.from_pandas(presentes, schema=pa.schema([esquema.field(c) for c in presentes.columns]),
+                                      preserve_index=False)
+        tabela = pa.Table.from_arrays(
+            [tabela.column(c) if c in presentes.columns else pa.nulls(len(tabela), type=esquema.field(c).type) for c in esquema.names],
+            schema=esquema
+        )
+    except pa.ArrowException:
+        # tipo do lote incompatível com o salvo (ou conversão não suportada): reescreve com o tipo unificado
+        return _reescrever_com(df_novo, nome, diretorio)
+
+    ds.write_dataset(
+        tabela,
+        origem,
+        format="parquet",
+        partitioning=_particionamento(),
+        basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore"
+    )
+    _gravar_hashes(origem, np.concatenate([existentes, hashes[manter]]))
+
+    bases = meta["bases"]
+    for base, linhas in _contar_bases(df_novo).items():
+        bases[base] = bases.get(base, 0) + linhas
+    meta.update({
+        "bases": bases,
+        "linhas": meta["linhas"] + len(df_novo),
+        "atualizado_em": datetime.now().isoformat(timespec="seconds")
+    })
+    _gravar_meta(origem, meta)
+    return resumo
+
+def _reescrever_com(df_novo: pd.DataFrame, nome: str, diretorio=None) -> dict:
+    atual = carregar_dataset(nome, diretorio=diretorio)
+    unificado = pd.concat([atual, df_novo], ignore_index=True)
+    manter = ~pd.Series(hashes_linhas(unificado)).duplicated().to_numpy()
+    salvar_dataset(unificado[manter], nome, diretorio)
+    novas = int(manter[len(atual):].sum())
+    return {"novas": novas, "duplicadas": len(df_novo) - novas, "reescrito": True}
+
+def remover_dataset(nome: str, diretorio=None):
+    shutil.rmtree(_diretorio(nome, diretorio), ignore_errors=True)
@@ -0,0 +1,147 @@
+# artefatos.py - arquivos de download (Excel, relatórios) gerados uma vez por conteúdo e servidos do cache
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+
+from components.cache_memoria import CacheLRU
+from components.configuracao import DIRETORIO_ARTEFATOS, LIMITE_ARTEFATOS_MB, LIMITE_ARTEFATOS_MEMORIA_MB
+from components.ingestao import hashes_linhas
+
+_memoria = CacheLRU(int(LIMITE_ARTEFATOS_MEMORIA_MB * 1024 ** 2))
+# uma thread basta: evita que vários downloads disputem a CPU com a interface
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artefatos")
+_em_andamento = {}
+_trava = threading.Lock()
+
+def impressao_digital(dados) -> str:
+    """Identifica o conteúdo de um DataFrame ou Series (colunas, tipos e valores de todas as linhas)."""
+    h = hashlib.sha256()
+    if isinstance(dados, pd.Series):
+        h.update(str(dados.name).encode())
+        h.update(pd.util.hash_pandas_object(dados, index=False).to_numpy().tobytes())
+    else:
+        h.update(json.dumps([str(col) for col in dados.columns], ensure_ascii=False).encode())
+        h.update(json.dumps([str(tipo) for tipo in dados.dtypes]).encode())
+        h.update(hashes_linhas(dados).tobytes())
+    return h.hexdigest()
+
+def chave_artefato(tipo: str, impressao: str, **opcoes) -> str:
+    """Chave do artefato: tipo + conteúdo dos dados + opções de exportação."""
+    texto = json.dumps({"tipo": tipo, "dados": impressao, "opcoes": opcoes}, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+def _caminho(chave: str, diretorio=None):
+    return (diretorio or DIRETORIO_ARTEFATOS) / f"{chave}.bin"
+
+def _em_bytes(dados) -> bytes:
+    if isinstance(dados, BytesIO):
+        return dados.getvalue()
+    if isinstance(dados, str):
+        return dados.encode("utf-8")
+    return bytes(dados)
+
+def obter_artefato(chave: str):
+    """Bytes do artefato, da memória ou do disco; None se ainda não foi gerado."""
+    dados = _memoria.obter(chave)
+    if dados is not None:
+        return dados
+    caminho = _caminho(chave)
+    try:
+        dados = caminho.read_bytes()
+    except OSError:
+        return None
+    os.utime(caminho, None)
+    _memoria.guardar(chave, dados)
+    return dados
+
+def _guardar(chave: str, dados: bytes):
+    _memoria.guardar(chave, dados)
+    caminho = _caminho(chave)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        temporario.write_bytes(dados)
+        os.replace(temporario, caminho)
+    except OSError:
+        # sem disco o artefato continua servido da memória
+        temporario.unlink(missing_ok=True)
+        return
+    aplicar_limite()
+
+def _produzir(chave: str, gerar) -> bytes:
+    try:
+        dados = obter_artefato(chave)
+        if dados is None:
+            dados = _em_bytes(gerar())
+            _guardar(chave, dados)
+        return dados
+    finally:
+        with _trava:
+            _em_andamento.pop(chave, None)
+
+def gerar_em_segundo_plano(chave: str, gerar):
+    """Agenda a geração (se o artefato ainda não existe nem está sendo gerado). Devolve o Future, ou None se já está pronto."""
+    if chave in _memoria or _caminho(chave).exists():
+        return None
+    with _trava:
+        futuro = _em_andamento.get(chave)
+        if futuro is None:
+            futuro = _executor.submit(_produzir, chave, gerar)
+            _em_andamento[chave] = futuro
+    return futuro
+
+def gerar_artefato(chave: str, gerar) -> bytes:
+    """Bytes do artefato, gerando agora se necessário (aguarda uma geração em andamento em vez de repetir)."""
+    dados = obter_artefato(chave)
+    if dados is not None:
+        return dados
+    futuro = gerar_em_segundo_plano(chave, gerar)
+    if futuro is not None:
+        return futuro.result()
+    return obter_artefato(chave) or _produzir(chave, gerar)
+
+def artefato_pronto(chave: str) -> bool:
+    return chave in _memoria or _caminho(chave).exists()
+
+def aplicar_limite(limite_mb=None, diretorio=None) -> int:
+    """Remove do disco os artefatos menos usados recentemente até caber no limite."""
+    diretorio = diretorio or DIRETORIO_ARTEFATOS
+    limite = (LIMITE_ARTEFATOS_MB if limite_mb is None else limite_mb) * 1024 ** 2
+    if not diretorio.exists():
+        return 0
+
+    entradas = []
+    for caminho in diretorio.glob("*.bin"):
+        try:
+            info = caminho.stat()
+        except FileNotFoundError:
+            continue
+        entradas.append((info.st_mtime, info.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = 0
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= limite:
+            break
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+        removidas += 1
+    return removidas
+
+def limpar_artefatos(diretorio=None) -> int:
+    _memoria.limpar()
+    diretorio = diretorio or DIRETORIO_ARTEFATOS
+    removidos = 0
+    for caminho in list(diretorio.glob("*.bin")) if diretorio.exists() else []:
+        caminho.unlink(missing_ok=True)
+        removidos += 1
+    return removidos
+
+def estatisticas() -> dict:
+    return _memoria.estatisticas()
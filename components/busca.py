@@ -0,0 +1,122 @@
+# busca.py - índice de trigramas para a busca de texto livre do dashboard (sem acentos e sem diferenciar maiúsculas)
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from components.cache_memoria import CacheLRU
+from components.esquema import normalizar_rotulo
+
+# poucos índices por servidor: cada um corresponde a um dataset aberto
+_indices = CacheLRU(limite_bytes=512 * 1024 ** 2, max_itens=4, tamanho=lambda indice: indice["bytes"])
+
+def dobrar(texto) -> str:
+    """Texto em minúsculas, sem acentos e com espaços simples (mesma forma para índice e consulta)."""
+    return normalizar_rotulo(texto)
+
+def trigramas(texto: str) -> set:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def construir_indice(df: pd.DataFrame) -> dict:
+    """Indexa os valores distintos de cada coluna, não as células: textos repetidos são dobrados uma vez só.
+
+    - `codigos[col]`: para cada linha, a posição do seu valor em `textos[col]` (-1 = vazio)
+    - `textos`: lista global de valores dobrados; `coluna_do_texto`/`local_do_texto` dizem de onde vêm
+    - `postagens`: trigrama -> posições (ordenadas) em `textos`
+    """
+    codigos, textos, coluna_do_texto, local_do_texto = {}, [], [], []
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            cods, unicos = serie.cat.codes.to_numpy(), serie.cat.categories
+        else:
+            cods, unicos = pd.factorize(serie, use_na_sentinel=True)
+        codigos[col] = np.asarray(cods, dtype=np.int32)
+        for local, valor in enumerate(unicos):
+            textos.append(dobrar(valor))
+            coluna_do_texto.append(col)
+            local_do_texto.append(local)
+
+    postagens = defaultdict(list)
+    for posicao, texto in enumerate(textos):
+        for trigrama in trigramas(texto):
+            postagens[trigrama].append(posicao)
+    postagens = {t: np.asarray(p, dtype=np.int32) for t, p in postagens.items()}
+
+    colunas = list(df.columns)
+    nbytes = sum(c.nbytes for c in codigos.values()) + sum(p.nbytes for p in postagens.values()) + sum(len(t) for t in textos)
+    return {
+        "colunas": colunas,
+        "linhas": len(df),
+        "codigos": codigos,
+        "textos": textos,
+        "coluna_do_texto": np.asarray([colunas.index(c) for c in coluna_do_texto], dtype=np.int32),
+        "local_do_texto": np.asarray(local_do_texto, dtype=np.int32),
+        "postagens": postagens,
+        "bytes": nbytes
+    }
+
+def indice_busca(df: pd.DataFrame, impressao: str) -> dict:
+    """Índice do dataset, construído na primeira busca e reaproveitado enquanto o conteúdo não muda."""
+    indice = _indices.obter(impressao)
+    if indice is None:
+        indice = construir_indice(df)
+        _indices.guardar(impressao, indice)
+    return indice
+
+def _candidatos(indice: dict, termo: str) -> np.ndarray:
+    """Posições em `textos` que podem conter o termo (interseção das listas de trigramas)."""
+    grams = trigramas(termo)
+    if not grams:
+        # termos com menos de 3 letras: varre os valores distintos, não as células
+        return np.arange(len(indice["textos"]), dtype=np.int32)
+    listas = []
+    for trigrama in grams:
+        lista = indice["postagens"].get(trigrama)
+        if lista is None:
+            return np.empty(0, dtype=np.int32)
+        listas.append(lista)
+    listas.sort(key=len)
+    candidatos = listas[0]
+    for lista in listas[1:]:
+        candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+        if not len(candidatos):
+            break
+    return candidatos
+
+def buscar(indice: dict, termo: str, colunas=None) -> dict:
+    """Linhas (posições) que contêm o termo em alguma das `colunas` (todas, se None).
+
+    Retorna {"mascara": bool por linha, "por_coluna": {coluna: bool por linha}} — o segundo
+    permite destacar em qual coluna cada linha foi encontrada.
+    """
+    termo = dobrar(termo)
+    mascara = np.zeros(indice["linhas"], dtype=bool)
+    por_coluna = {}
+    if not termo:
+        return {"mascara": mascara, "por_coluna": por_coluna}
+
+    candidatos = _candidatos(indice, termo)
+    if colunas is not None:
+        permitidas = [indice["colunas"].index(c) for c in colunas if c in indice["colunas"]]
+        candidatos = candidatos[np.isin(indice["coluna_do_texto"][candidatos], permitidas)]
+
+    # confirmação exata do trecho (os trigramas só garantem que as partes existem)
+    textos = indice["textos"]
+    encontrados = np.asarray([p for p in candidatos if termo in textos[p]], dtype=np.int32)
+    for col_idx in np.unique(indice["coluna_do_texto"][encontrados]):
+        locais = indice["local_do_texto"][encontrados[indice["coluna_do_texto"][encontrados] == col_idx]]
+        coluna = indice["colunas"][col_idx]
+        achou = np.isin(indice["codigos"][coluna], locais)
+        por_coluna[coluna] = achou
+        mascara |= achou
+    return {"mascara": mascara, "por_coluna": por_coluna}
+
+def destacar(df: pd.DataFrame, resultado: dict, posicoes: np.ndarray, cor: str = "#FFF3B0"):
+    """Styler que pinta as células onde o termo foi encontrado. `posicoes` são as linhas de `df` no frame indexado."""
+    estilos = pd.DataFrame("", index=df.index, columns=df.columns)
+    for coluna, achou in resultado["por_coluna"].items():
+        if coluna in estilos.columns:
+            estilos.loc[achou[posicoes], coluna] = f"background-color: {cor}"
+    return df.style.apply(lambda _: estilos, axis=None)
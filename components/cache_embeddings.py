@@ -0,0 +1,251 @@
+# cache_embeddings.py - embeddings dos comentários gravados em disco (float16 mapeado em memória), por modelo e versão
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from components.configuracao import DIRETORIO_EMBEDDINGS, MODELO_EMBEDDINGS, VERSAO_EMBEDDINGS
+
+ARQUIVO_META = "_meta.json"
+BYTES_CHAVE = 16
+# acima de tantos segmentos a loja é compactada em um só na próxima gravação
+MAX_SEGMENTOS = 32
+
+_lojas = {}
+_trava_lojas = threading.Lock()
+
+def normalizar_texto(texto) -> str:
+    """Forma usada como chave e como entrada do modelo: Unicode NFC e espaços simples (maiúsculas e acentos ficam)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", str(texto))).strip()
+
+def chave_texto(texto_normalizado: str) -> bytes:
+    return hashlib.blake2b(texto_normalizado.encode("utf-8"), digest_size=BYTES_CHAVE).digest()
+
+def _nome_diretorio(modelo: str, versao: str) -> str:
+    return re.sub(r"[^\w\-.]+", "_", f"{modelo}__v{versao}")
+
+class LojaEmbeddings:
+    """Vetores de um modelo/versão em segmentos somente-acréscimo: `<id>.f16` (matriz float16) e `<id>.chaves.npy`.
+
+    Cada gravação cria um segmento novo (escrito em temporário e renomeado), então processos diferentes
+    podem gravar ao mesmo tempo sem corromper a loja. O índice chave -> (segmento, linha) fica em memória.
+    """
+
+    def __init__(self, modelo: str = MODELO_EMBEDDINGS, versao: str = VERSAO_EMBEDDINGS, diretorio=None):
+        self.modelo = modelo
+        self.versao = versao
+        self.diretorio = (diretorio or DIRETORIO_EMBEDDINGS) / _nome_diretorio(modelo, versao)
+        self.dimensao = None
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()
+        self._segmentos = {}  # id -> matriz float16 (memmap)
+        self._indice = {}  # chave -> (id do segmento, linha)
+        self.recarregar()
+
+    def _ler_meta(self):
+        meta = self.diretorio / ARQUIVO_META
+        if self.dimensao is None and meta.exists():
+            with open(meta, encoding="utf-8") as f:
+                self.dimensao = json.load(f)["dimensao"]
+
+    def __len__(self):
+        return len(self._indice)
+
+    def _ids_em_disco(self) -> list:
+        # o arquivo de chaves é gravado por último: um segmento só existe depois dele
+        if not self.diretorio.exists():
+            return []
+        return sorted(p.name[:-len(".chaves.npy")] for p in self.diretorio.glob("*.chaves.npy"))
+
+    def recarregar(self):
+        """Inclui segmentos gravados por outros processos desde a última leitura."""
+        with self._trava:
+            self._ler_meta()
+            for id_segmento in self._ids_em_disco():
+                if id_segmento in self._segmentos:
+                    continue
+                try:
+                    chaves = np.load(self.diretorio / f"{id_segmento}.chaves.npy")
+                    vetores = np.memmap(self.diretorio / f"{id_segmento}.f16", dtype=np.float16, mode="r",
+                                        shape=(len(chaves), self.dimensao))
+                except FileNotFoundError:
+                    # compactado por outro processo entre a listagem e a leitura: o conteúdo está no segmento novo
+                    continue
+                self._segmentos[id_segmento] = vetores
+                for linha, chave in enumerate(chaves):
+                    self._indice.setdefault(chave.tobytes(), (id_segmento, linha))
+
+    def buscar(self, chaves: list):
+        """(encontradas: bool por chave, vetores float32 das encontradas, na ordem das chaves)."""
+        with self._trava:
+            locais = [self._indice.get(chave) for chave in chaves]
+            encontradas = np.asarray([local is not None for local in locais], dtype=bool)
+            self.acertos += int(encontradas.sum())
+            self.faltas += int((~encontradas).sum())
+            if not encontradas.any():
+                return encontradas, np.empty((0, self.dimensao or 0), dtype=np.float32)
+            # lido sob a trava: uma compactação concorrente troca os segmentos e o índice juntos
+            vetores = np.stack([self._segmentos[s][linha] for s, linha in (l for l in locais if l is not None)])
+        return encontradas, vetores.astype(np.float32)
+
+    def adicionar(self, chaves: list, vetores: np.ndarray):
+        """Grava um segmento novo com os vetores que ainda não estão na loja."""
+        vetores = np.asarray(vetores, dtype=np.float16)
+        with self._trava:
+            novas = [i for i, chave in enumerate(chaves) if chave not in self._indice]
+        if not novas:
+            return
+        if self.dimensao is None:
+            self._gravar_meta(vetores.shape[1])
+        self._gravar_segmento([chaves[i] for i in novas], vetores[novas])
+        if len(self._ids_em_disco()) > MAX_SEGMENTOS:
+            self.compactar()
+        else:
+            self.recarregar()
+
+    def _gravar_meta(self, dimensao: int):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.diretorio / f"{ARQUIVO_META}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"modelo": self.modelo, "versao": self.versao, "dimensao": int(dimensao)}, f)
+        os.replace(temporario, self.diretorio / ARQUIVO_META)
+        self.dimensao = int(dimensao)
+
+    def _gravar_segmento(self, chaves: list, vetores: np.ndarray) -> str:
+        id_segmento = uuid.uuid4().hex
+        base = self.diretorio / id_segmento
+        temporario = self.diretorio / f"{id_segmento}.{os.getpid()}.tmp"
+        np.ascontiguousarray(vetores, dtype=np.float16).tofile(temporario)
+        os.replace(temporario, base.with_suffix(".f16"))
+        with open(temporario, "wb") as f:
+            np.save(f, np.frombuffer(b"".join(chaves), dtype=f"V{BYTES_CHAVE}"))
+        os.replace(temporario, self.diretorio / f"{id_segmento}.chaves.npy")
+        return id_segmento
+
+    def compactar(self) -> int:
+        """Junta todos os segmentos em um só (sem chaves repetidas). Devolve o número de vetores.
+
+        Os segmentos antigos são apagados; processos que já os mapearam continuam lendo a cópia aberta.
+        """
+        self.recarregar()
+        with self._trava:
+            antigos = list(self._segmentos)
+            if len(antigos) <= 1:
+                return len(self._indice)
+            chaves = list(self._indice)
+            vetores = np.stack([self._segmentos[s][linha] for s, linha in self._indice.values()])
+            novo = self._gravar_segmento(chaves, vetores)
+            self._segmentos = {novo: np.memmap(self.diretorio / f"{novo}.f16", dtype=np.float16, mode="r",
+                                               shape=(len(chaves), self.dimensao))}
+            self._indice = {chave: (novo, linha) for linha, chave in enumerate(chaves)}
+        for id_segmento in antigos:
+            for caminho in (self.diretorio / f"{id_segmento}.chaves.npy", self.diretorio / f"{id_segmento}.f16"):
+                try:
+                    caminho.unlink(missing_ok=True)
+                except OSError:
+                    # Windows: ainda mapeado por outro processo; sai na próxima compactação
+                    pass
+        return len(chaves)
+
+    def estatisticas(self) -> dict:
+        tamanho = sum(p.stat().st_size for p in self.diretorio.glob("*")) if self.diretorio.exists() else 0
+        return {
+            "modelo": self.modelo,
+            "versao": self.versao,
+            "vetores": len(self._indice),
+            "segmentos": len(self._segmentos),
+            "tamanho_mb": tamanho / 1024 ** 2,
+            "acertos": self.acertos,
+            "faltas": self.faltas
+        }
+
+def loja(modelo: str = MODELO_EMBEDDINGS, versao: str = VERSAO_EMBEDDINGS, diretorio=None) -> LojaEmbeddings:
+    """Loja do modelo/versão, aberta uma vez por processo."""
+    chave = (modelo, versao, str(diretorio or DIRETORIO_EMBEDDINGS))
+    with _trava_lojas:
+        if chave not in _lojas:
+            _lojas[chave] = LojaEmbeddings(modelo, versao, diretorio)
+        return _lojas[chave]
+
+def codificar_com_cache(textos: list, codificar, modelo: str = MODELO_EMBEDDINGS, versao: str = VERSAO_EMBEDDINGS,
+                        diretorio=None):
+    """Embeddings (float32, na ordem de `textos`) lendo da loja o que já foi calculado.
+
+    `codificar(lista)` recebe só os textos normalizados que faltam (sem repetição). Os vetores novos
+    passam pelo float16 como os gravados, para o resultado não depender de ter havido acerto.
+    Devolve (matriz, {"acertos", "faltas"}) desta chamada.
+    """
+    armazem = loja(modelo, versao, diretorio)
+    armazem.recarregar()
+    normalizados = [normalizar_texto(t) for t in textos]
+    unicos = list(dict.fromkeys(normalizados))
+    chaves = [chave_texto(t) for t in unicos]
+
+    encontradas, vetores_encontrados = armazem.buscar(chaves)
+    faltantes = [t for t, achou in zip(unicos, encontradas) if not achou]
+    if faltantes:
+        novos = np.asarray(codificar(faltantes), dtype=np.float32)
+        armazem.adicionar([c for c, achou in zip(chaves, encontradas) if not achou], novos)
+        novos = novos.astype(np.float16).astype(np.float32)
+        dimensao = novos.shape[1]
+    else:
+        dimensao = vetores_encontrados.shape[1]
+
+    por_texto = np.empty((len(unicos), dimensao), dtype=np.float32)
+    if encontradas.any():
+        por_texto[encontradas] = vetores_encontrados
+    if faltantes:
+        por_texto[~encontradas] = novos
+    posicao = {t: i for i, t in enumerate(unicos)}
+    matriz = por_texto[[posicao[t] for t in normalizados]] if textos else np.empty((0, dimensao), dtype=np.float32)
+    return matriz, {"acertos": int(encontradas.sum()), "faltas": len(faltantes)}
+
+def listar_lojas(diretorio=None) -> pd.DataFrame:
+    diretorio = diretorio or DIRETORIO_EMBEDDINGS
+    registros = []
+    for pasta in sorted(diretorio.iterdir()) if diretorio.exists() else []:
+        meta = pasta / ARQUIVO_META
+        if not meta.exists():
+            continue
+        with open(meta, encoding="utf-8") as f:
+            info = json.load(f)
+        chaves = 0
+        for caminho in pasta.glob("*.chaves.npy"):
+            try:
+                chaves += len(np.load(caminho, mmap_mode="r"))
+            except FileNotFoundError:
+                # segmento apagado por uma compactação entre a listagem e a leitura: já contado no novo
+                continue
+        registros.append({
+            "modelo": info["modelo"],
+            "versao": info["versao"],
+            "dimensao": info["dimensao"],
+            "vetores": chaves,
+            "tamanho_mb": sum(p.stat().st_size for p in pasta.glob("*")) / 1024 ** 2
+        })
+    return pd.DataFrame(registros, columns=["modelo", "versao", "dimensao", "vetores", "tamanho_mb"])
+
+def remover_loja(modelo: str, versao: str = None, diretorio=None) -> int:
+    """Apaga os vetores do modelo: de uma versão ou, sem `versao`, de todas. Devolve quantas lojas foram removidas."""
+    diretorio = diretorio or DIRETORIO_EMBEDDINGS
+    lojas = listar_lojas(diretorio)
+    alvo = lojas[(lojas["modelo"] == modelo) & ((lojas["versao"] == versao) if versao is not None else True)]
+    for info in alvo.itertuples(index=False):
+        shutil.rmtree(diretorio / _nome_diretorio(info.modelo, info.versao), ignore_errors=True)
+        with _trava_lojas:
+            _lojas.pop((info.modelo, info.versao, str(diretorio)), None)
+    return len(alvo)
+
+def remover_versoes_antigas(modelo: str = MODELO_EMBEDDINGS, manter: str = VERSAO_EMBEDDINGS, diretorio=None) -> int:
+    """Apaga todas as versões do modelo menos `manter`."""
+    lojas = listar_lojas(diretorio)
+    return sum(remover_loja(modelo, v, diretorio) for v in lojas.loc[(lojas["modelo"] == modelo) & (lojas["versao"] != manter), "versao"])
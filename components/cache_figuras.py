@@ -0,0 +1,34 @@
+# cache_figuras.py - figuras Plotly memoizadas por dataset, estado do filtro, gráfico e opções
+
+import plotly.io as pio
+
+from components.cache_memoria import CacheLRU
+from components.configuracao import LIMITE_FIGURAS_MEMORIA_MB
+
+# cada item é (figura, tamanho do JSON): o limite é pelo que a figura pesa serializada
+_figuras = CacheLRU(limite_bytes=int(LIMITE_FIGURAS_MEMORIA_MB * 1024 ** 2), tamanho=lambda item: item[1])
+
+def chave_figura(contexto: tuple, grafico: str, porcentagem=None, coluna=None) -> tuple:
+    """`contexto` é (impressão do dataset, chave do estado do filtro)."""
+    return (*contexto, grafico, porcentagem, coluna)
+
+def figura(chave, construir):
+    """Figura guardada para a chave, ou `construir()` na primeira vez.
+
+    Guarda o objeto já validado, não o JSON: reabrir o JSON custa quase tanto quanto montar
+    a figura de novo. As figuras guardadas não devem ser alteradas por quem as recebe.
+    """
+    if chave is None:
+        return construir()
+    item = _figuras.obter(chave)
+    if item is None:
+        fig = construir()
+        item = (fig, len(pio.to_json(fig, validate=False)))
+        _figuras.guardar(chave, item)
+    return item[0]
+
+def limpar_figuras():
+    _figuras.limpar()
+
+def estatisticas() -> dict:
+    return _figuras.estatisticas()
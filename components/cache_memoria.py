@@ -0,0 +1,84 @@
+# cache_memoria.py - cache LRU em memória, compartilhado pelas sessões do mesmo servidor
+
+import sys
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+def tamanho_aproximado(valor) -> int:
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, BytesIO):
+        return valor.getbuffer().nbytes
+    if hasattr(valor, "memory_usage"):
+        # DataFrame / Series
+        uso = valor.memory_usage(deep=True)
+        return int(getattr(uso, "sum", lambda: uso)())
+    if hasattr(valor, "nbytes"):
+        return int(valor.nbytes)
+    return sys.getsizeof(valor)
+
+class CacheLRU:
+    """Dicionário LRU limitado em bytes (e opcionalmente em número de itens), seguro entre threads.
+
+    Itens maiores que o limite inteiro não são guardados.
+    """
+
+    def __init__(self, limite_bytes: int, max_itens=None, tamanho=tamanho_aproximado):
+        self.limite_bytes = limite_bytes
+        self.max_itens = max_itens
+        self._tamanho = tamanho
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, padrao=None):
+        with self._trava:
+            if chave not in self._itens:
+                self.faltas += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return self._itens[chave][0]
+
+    def guardar(self, chave, valor):
+        tamanho = self._tamanho(valor)
+        with self._trava:
+            self._descartar(chave)
+            if tamanho > self.limite_bytes:
+                return
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.limite_bytes or (self.max_itens and len(self._itens) > self.max_itens):
+                self._descartar(next(iter(self._itens)))
+
+    def remover(self, chave):
+        with self._trava:
+            self._descartar(chave)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self._bytes = 0
+
+    def _descartar(self, chave):
+        item = self._itens.pop(chave, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def __contains__(self, chave):
+        with self._trava:
+            return chave in self._itens
+
+    def __len__(self):
+        return len(self._itens)
+
+    def estatisticas(self) -> dict:
+        return {
+            "itens": len(self._itens),
+            "mb": self._bytes / 1024 ** 2,
+            "acertos": self.acertos,
+            "faltas": self.faltas
+        }
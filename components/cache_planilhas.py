@@ -0,0 +1,99 @@
+# cache_planilhas.py - cache em disco (Parquet) das planilhas já lidas, endereçado pelo SHA-256 do arquivo
+
+import hashlib
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from components.configuracao import DIRETORIO_CACHE_PLANILHAS, LIMITE_CACHE_PLANILHAS_MB
+
+def hash_conteudo(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+def _caminho(chave: str, diretorio=None):
+    return (diretorio or DIRETORIO_CACHE_PLANILHAS) / f"{chave}.parquet"
+
+def obter(chave: str, diretorio=None):
+    caminho = _caminho(chave, diretorio)
+    if not caminho.exists():
+        return None
+    try:
+        df = pd.read_parquet(caminho)
+    except Exception:
+        # arquivo corrompido ou removido durante a leitura: trata como ausência
+        return None
+    # o mtime marca o último acesso, usado na política LRU
+    os.utime(caminho, None)
+    return df
+
+def salvar(chave: str, df: pd.DataFrame, diretorio=None) -> bool:
+    caminho = _caminho(chave, diretorio)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+        return True
+    except Exception:
+        if temporario.exists():
+            temporario.unlink()
+        return False
+
+def listar_cache(diretorio=None) -> pd.DataFrame:
+    diretorio = diretorio or DIRETORIO_CACHE_PLANILHAS
+    registros = []
+    for caminho in diretorio.glob("*.parquet") if diretorio.exists() else []:
+        try:
+            info = caminho.stat()
+            metadados = pq.read_metadata(caminho)
+        except Exception:
+            continue
+        registros.append({
+            "sha256": caminho.stem,
+            "linhas": metadados.num_rows,
+            "colunas": metadados.num_columns,
+            "tamanho_mb": info.st_size / 1024 ** 2,
+            "ultimo_acesso": datetime.fromtimestamp(info.st_mtime)
+        })
+    colunas = ["sha256", "linhas", "colunas", "tamanho_mb", "ultimo_acesso"]
+    return pd.DataFrame(registros, columns=colunas).sort_values("ultimo_acesso", ascending=False, ignore_index=True)
+
+def aplicar_limite(limite_mb=None, diretorio=None) -> int:
+    """Remove as entradas menos usadas recentemente até o cache caber no limite. Retorna quantas foram removidas."""
+    diretorio = diretorio or DIRETORIO_CACHE_PLANILHAS
+    limite = (LIMITE_CACHE_PLANILHAS_MB if limite_mb is None else limite_mb) * 1024 ** 2
+    if not diretorio.exists():
+        return 0
+
+    entradas = []
+    for caminho in diretorio.glob("*.parquet"):
+        try:
+            info = caminho.stat()
+        except FileNotFoundError:
+            continue
+        entradas.append((info.st_mtime, info.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = 0
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= limite:
+            break
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+        removidas += 1
+    return removidas
+
+def limpar_cache(diretorio=None) -> int:
+    diretorio = diretorio or DIRETORIO_CACHE_PLANILHAS
+    removidas = 0
+    for caminho in list(diretorio.glob("*.parquet")) if diretorio.exists() else []:
+        caminho.unlink(missing_ok=True)
+        removidas += 1
+    # temporários órfãos de escritas interrompidas há mais de uma hora
+    for caminho in list(diretorio.glob("*.tmp")) if diretorio.exists() else []:
+        if time.time() - caminho.stat().st_mtime > 3600:
+            caminho.unlink(missing_ok=True)
+    return removidas
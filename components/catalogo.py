@@ -0,0 +1,197 @@
+# catalogo.py - catálogo versionado das perguntas do questionário, com IDs estáveis por pergunta
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+# Edições do questionário, da mais antiga para a atual. O texto da edição atual é o
+# cabeçalho canônico usado depois da ingestão.
+VERSOES = ["v1", "2025"]
+VERSAO_ATUAL = VERSOES[-1]
+
+# id, dimensão, tipo de resposta e texto por edição (edições omitidas usam o texto da anterior)
+PERGUNTAS = [
+    {"id": "SUPERIOR", "dimensao": None, "tipo": "segmento", "textos": {"v1": "Qual  o seu superior imediato?"}},
+
+    {"id": "COL_A", "dimensao": "Colaboração", "tipo": "likert", "textos": {"v1": "a) Existe o estímulo a colaboração em nossa empresa?"}},
+    {"id": "COL_B", "dimensao": "Colaboração", "tipo": "likert", "textos": {"v1": "b) Há cooperação entre as pessoas do meu setor?"}},
+    {"id": "COL_C", "dimensao": "Colaboração", "tipo": "likert", "textos": {"v1": "c)  A colaboração resulta no alcance das nossas metas/objetivos?"}},
+    {"id": "COL_D", "dimensao": "Colaboração", "tipo": "likert", "textos": {"v1": "d)  A colaboração tem favorecido um clima de trabalho positivo no meu setor?"}},
+    {"id": "COL_E", "dimensao": "Colaboração", "tipo": "likert", "textos": {"v1": "e) Sinto-me à vontade para pedir ajuda nas minhas atividades, sempre que preciso?"}},
+
+    {"id": "COM_A", "dimensao": "Comunicação", "tipo": "likert", "textos": {
+        "v1": "a) Os canais de comunicação interna contribuem para manter todos informados?",
+        "2025": "a) Os canais de comunicação interna contribuem para nos manter informados. (workplace, aplicativo do Colaborador, murais, email etc)?"}},
+    {"id": "COM_B", "dimensao": "Comunicação", "tipo": "likert", "textos": {
+        "v1": "b) As informações fluem bem entre as áreas da empresa?",
+        "2025": "b) As informações fluem bem entre as áreas da organização?"}},
+    {"id": "COM_C", "dimensao": "Comunicação", "tipo": "likert", "textos": {"v1": "c) A comunicação na empresa, reflete confiança e respeito?"}},
+    {"id": "COM_D", "dimensao": "Comunicação", "tipo": "likert", "textos": {
+        "v1": "d) Costumo receber respostas (feedback) sempre que necessário?",
+        "2025": "d) Costumo receber respostas (feedback) sempre que preciso?"}},
+    {"id": "COM_E", "dimensao": "Comunicação", "tipo": "likert", "textos": {
+        "v1": "e) Sou bem informado sobre as metas e resultados da empresa?",
+        "2025": "e) Sou bem informado sobre as metas e resultados da minha área. (reuniões/divulgações do Mapa Estratégico - BSC)?"}},
+
+    {"id": "INF_A", "dimensao": "Informações Essenciais", "tipo": "likert", "textos": {
+        "v1": "a)  Recebo informações suficientes sobre os Valores e Políticas da empresa?",
+        "2025": "a)  Recebo informações suficientes sobre os Valores e Princípios Organizacionais (integridade, respeito, econonia, energia  e melhoria contínua)?"}},
+    {"id": "INF_B", "dimensao": "Informações Essenciais", "tipo": "likert", "textos": {
+        "v1": "b) Percebo ações, na prática, voltadas ao atendimento ao cliente?",
+        "2025": "b) Percebo ações, na prática, voltadas ao atendimento normativo e de segurança na empresa?"}},
+    {"id": "INF_C", "dimensao": "Informações Essenciais", "tipo": "likert", "textos": {
+        "v1": "c) Recebo informações e direcionamentos suficientes sobre as minhas atividades?",
+        "2025": "c) Recebo informações e direcionamentos suficientes  para a realização das minhas atividades?"}},
+    {"id": "INF_D", "dimensao": "Informações Essenciais", "tipo": "likert", "textos": {
+        "v1": "d) A empresa incentiva a aprendizagem e inovação?",
+        "2025": "d) A empresa incentiva a aprendizagem e inovação ?"}},
+    {"id": "INF_E", "dimensao": "Informações Essenciais", "tipo": "likert", "textos": {
+        "v1": "e. A empresa possui um Código de Ética claro e divulgado?",
+        "2025": "e. A empresa possui um Código de Ética claro e amplamente divulgado?"}},
+
+    {"id": "LID_A", "dimensao": "Liderança", "tipo": "likert", "textos": {"v1": "a) Tenho abertura para comunicar-me com meu gestor(a)?"}},
+    {"id": "LID_B", "dimensao": "Liderança", "tipo": "likert", "textos": {
+        "v1": "b) Meu gestor(a) me possibilita assumir desafios e crescer profissionalmente?",
+        "2025": "b) Meu gestor(a) me possibilita assumir desafios e responsabilidades?"}},
+    {"id": "LID_C", "dimensao": "Liderança", "tipo": "likert", "textos": {"v1": "c) Meu gestor (a) estimula a colaboração e o trabalho em equipe?"}},
+    {"id": "LID_D", "dimensao": "Liderança", "tipo": "likert", "textos": {
+        "v1": "d) Meu gestor(a) promove um ambiente de trabalho respeitoso e inclusivo?",
+        "2025": "d) Meu gestor(a) promove um ambiente de trabalho agradável e respeitoso?"}},
+    {"id": "LID_E", "dimensao": "Liderança", "tipo": "likert", "textos": {
+        "v1": "e) Considero adequado o estilo de liderança do meu gestor(a)?",
+        "2025": "e) Considero adequado o estilo de liderança do meu gestor (a)"}},
+
+    {"id": "MOT_A", "dimensao": "Motivação", "tipo": "likert", "textos": {
+        "v1": "a) As ferramentas disponíveis contribuem para o bom desempenho do meu trabalho?",
+        "2025": "a) As ferramentas disponíveis contribuem para o meu desenvolvimento profissional (Internet / Ensino a distância,GUPY,  por exemplo)?"}},
+    {"id": "MOT_B", "dimensao": "Motivação", "tipo": "likert", "textos": {"v1": "b)  Meu trabalho permite equilibrar vida pessoal e profissional?"}},
+    {"id": "MOT_C", "dimensao": "Motivação", "tipo": "likert", "textos": {
+        "v1": "c)  A minha remuneração e benefícios são justos?",
+        "2025": "c)  A minha remuneração e benefícios são justos em relação às minhas atividades/mercado de trabalho?"}},
+    {"id": "MOT_D", "dimensao": "Motivação", "tipo": "likert", "textos": {"v1": "d) Sinto-me estimulado a dar o meu melhor no ambiente de trabalho?"}},
+    {"id": "MOT_E", "dimensao": "Motivação", "tipo": "likert", "textos": {"v1": "e.  As refeições oferecidas na empresa são satisfatórias?"}},
+
+    {"id": "ORG_A", "dimensao": "Organização", "tipo": "likert", "textos": {"v1": "a) A empresa possui uma boa direção e gestão estratégica?"}},
+    {"id": "ORG_B", "dimensao": "Organização", "tipo": "likert", "textos": {"v1": "b)  A empresa tem uma cultura forte e positiva?"}},
+    {"id": "ORG_C", "dimensao": "Organização", "tipo": "likert", "textos": {"v1": "c)  A imagem e a marca da empresa são bem conceituadas?"}},
+    {"id": "ORG_D", "dimensao": "Organização", "tipo": "likert", "textos": {
+        "v1": "d)  Percebo que a organização se preocupa com o bem-estar dos colaboradores?",
+        "2025": "d)  Percebo que a organização se preocupa com o bem estar dos colaboradores?"}},
+    {"id": "ORG_E", "dimensao": "Organização", "tipo": "likert", "textos": {
+        "v1": "e) Compreendo como o meu trabalho contribui para os resultados da empresa?",
+        "2025": "e) Compreendo como o meu trabalho contribui para a realização da estratégia da empresa?"}},
+
+    {"id": "TRA_A", "dimensao": "Trabalho", "tipo": "likert", "textos": {
+        "v1": "a)  As condições físicas de trabalho no meu setor são adequadas?",
+        "2025": "a)  As condições físicas de trabalho no meu setor  são adequadas?"}},
+    {"id": "TRA_B", "dimensao": "Trabalho", "tipo": "likert", "textos": {"v1": "b)   Recebo treinamentos e instruções suficientes, para a realização do meu trabalho?"}},
+    {"id": "TRA_C", "dimensao": "Trabalho", "tipo": "likert", "textos": {"v1": "c)  Eu tenho acesso aos materiais, Epis e/ou equipamentos necessários para fazer bem o meu trabalho?"}},
+    {"id": "TRA_D", "dimensao": "Trabalho", "tipo": "likert", "textos": {"v1": "d) Sinto que posso contribuir com ideias e soluções no meu trabalho?"}},
+    {"id": "TRA_E", "dimensao": "Trabalho", "tipo": "likert", "textos": {"v1": "e) Sei o que é esperado do meu trabalho?"}},
+
+    {"id": "FEL_A", "dimensao": "Felicidade", "tipo": "likert", "textos": {"v1": "a) Sinto que sou valorizado e reconhecido no meu ambiente de trabalho?"}},
+    {"id": "FEL_B", "dimensao": "Felicidade", "tipo": "likert", "textos": {"v1": "b) Sinto orgulho de trabalhar nesta empresa?"}},
+    {"id": "FEL_C", "dimensao": "Felicidade", "tipo": "likert", "textos": {"v1": "c) Sinto que o meu trabalho é estimulante e gratificante?"}},
+    {"id": "FEL_D", "dimensao": "Felicidade", "tipo": "texto", "textos": {"v1": "d) Que sugestões você daria para tornar nossa empresa um lugar ainda melhor para se trabalhar?"}},
+    {"id": "NOTA_GERAL", "dimensao": "Felicidade", "tipo": "nota", "textos": {"v1": "e)   De um modo geral qual a nota (0 a 10) atribuiria a sua experiência na empresa?"}}
+]
+
+# similaridade mínima (0 a 1) para aceitar um cabeçalho reescrito como a mesma pergunta
+LIMIAR_SEMELHANCA = 0.85
+
+def texto_da_pergunta(pergunta: dict, versao: str = VERSAO_ATUAL) -> str:
+    texto = None
+    for v in VERSOES[:VERSOES.index(versao) + 1]:
+        texto = pergunta["textos"].get(v, texto)
+    return texto
+
+PERGUNTAS_POR_ID = {p["id"]: p for p in PERGUNTAS}
+ROTULOS = {p["id"]: texto_da_pergunta(p) for p in PERGUNTAS}
+
+COLUNA_SUPERIOR = ROTULOS["SUPERIOR"]
+COLUNA_NOTA = ROTULOS["NOTA_GERAL"]
+
+# visão por dimensão com os textos da edição atual (formato usado pelas páginas)
+dimensoes = {}
+for _p in PERGUNTAS:
+    if _p["dimensao"]:
+        dimensoes.setdefault(_p["dimensao"], []).append(ROTULOS[_p["id"]])
+del _p
+
+def ids_da_dimensao(dimensao: str) -> list:
+    return [p["id"] for p in PERGUNTAS if p["dimensao"] == dimensao]
+
+def ids_por_tipo(*tipos) -> list:
+    return [p["id"] for p in PERGUNTAS if p["tipo"] in tipos]
+
+def normalizar_pergunta(texto) -> str:
+    """Forma comparável de um cabeçalho: sem acentos, espaços extras, pontuação solta e com 'e.' lido como 'e)'."""
+    texto = str(texto)
+    # perguntas em grade do Google Forms chegam como "Dimensão [pergunta]"
+    grade = re.search(r"\[(.+)\]\s*$", texto)
+    if grade:
+        texto = grade.group(1)
+    texto = unicodedata.normalize("NFKD", texto).encode("ASCII", "ignore").decode("utf-8").lower()
+    texto = re.sub(r"^\s*([a-e])\s*[\.\)]", r"\1)", texto)
+    texto = re.sub(r"\s*([?.,;:()/\-])\s*", r"\1", texto)
+    texto = re.sub(r"\s+", " ", texto)
+    return texto.strip(" ?.")
+
+_INDICE_TEXTOS = {
+    normalizar_pergunta(texto): p["id"]
+    for p in PERGUNTAS
+    for texto in p["textos"].values()
+}
+
+def _identificar(coluna):
+    """(id, qualidade) de um cabeçalho; qualidade 2 = exata, 1 = contém o texto, entre 0 e 1 = semelhança."""
+    normalizada = normalizar_pergunta(coluna)
+    if normalizada in _INDICE_TEXTOS:
+        return _INDICE_TEXTOS[normalizada], 2.0
+    for texto, id_pergunta in _INDICE_TEXTOS.items():
+        if texto in normalizada:
+            return id_pergunta, 1.0
+
+    melhor, qualidade = None, LIMIAR_SEMELHANCA
+    for texto, id_pergunta in _INDICE_TEXTOS.items():
+        # alternativas de letras diferentes nunca são a mesma pergunta
+        if texto[:2] != normalizada[:2]:
+            continue
+        comparador = SequenceMatcher(None, normalizada, texto)
+        if comparador.real_quick_ratio() < qualidade or comparador.quick_ratio() < qualidade:
+            continue
+        razao = comparador.ratio()
+        if razao >= qualidade:
+            melhor, qualidade = id_pergunta, razao
+    return melhor, (qualidade if melhor else 0.0)
+
+@lru_cache(maxsize=256)
+def _resolver(colunas: tuple) -> dict:
+    escolhidas = {}
+    for coluna in colunas:
+        id_pergunta, qualidade = _identificar(coluna)
+        if id_pergunta and qualidade > escolhidas.get(id_pergunta, (None, -1.0))[1]:
+            escolhidas[id_pergunta] = (coluna, qualidade)
+    return {id_pergunta: coluna for id_pergunta, (coluna, _) in escolhidas.items()}
+
+def resolver_colunas(colunas) -> dict:
+    """Mapa {id da pergunta: coluna} de um conjunto de cabeçalhos. O resultado é memorizado por conjunto de colunas."""
+    return dict(_resolver(tuple(str(c) for c in colunas)))
+
+def coluna_por_id(colunas, id_pergunta: str):
+    return _resolver(tuple(str(c) for c in colunas)).get(id_pergunta)
+
+def colunas_por_ids(colunas, ids) -> list:
+    mapa = _resolver(tuple(str(c) for c in colunas))
+    return [mapa[i] for i in ids if i in mapa]
+
+def padronizar_colunas(df):
+    """Renomeia as colunas reconhecidas para o texto canônico (edição atual), alinhando arquivos de edições diferentes."""
+    renomear = {coluna: ROTULOS[id_pergunta] for id_pergunta, coluna in resolver_colunas(df.columns).items()}
+    return df.rename(columns=renomear)
+
+def perguntas_encontradas(colunas) -> list:
+    """IDs das perguntas do questionário (exceto segmentação) presentes em uma lista de colunas."""
+    mapa = resolver_colunas(colunas)
+    return [p["id"] for p in PERGUNTAS if p["dimensao"] and p["id"] in mapa]
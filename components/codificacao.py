@@ -0,0 +1,80 @@
+# codificacao.py - embeddings dos comentários em lotes, com progresso para quem chamou
+
+import logging
+import time
+
+import numpy as np
+
+from components.configuracao import (INFERENCIA_EMBEDDINGS, LOTE_EMBEDDINGS, MAX_TOKENS_EMBEDDINGS, THREADS_EMBEDDINGS,
+                                     VERSAO_EMBEDDINGS)
+
+log = logging.getLogger(__name__)
+
+MODOS_INFERENCIA = ("fp32", "int8")
+
+def versao_embeddings() -> str:
+    """Versão da loja de embeddings: outro corte de tokens ou o modelo quantizado geram vetores diferentes."""
+    versao = f"{VERSAO_EMBEDDINGS}-t{MAX_TOKENS_EMBEDDINGS}" if MAX_TOKENS_EMBEDDINGS > 0 else VERSAO_EMBEDDINGS
+    return versao if INFERENCIA_EMBEDDINGS == "fp32" else f"{versao}-{INFERENCIA_EMBEDDINGS}"
+
+def quantizar_int8(modelo):
+    """Quantização dinâmica int8 das camadas lineares (pesos em int8, ativações quantizadas na hora; só CPU)."""
+    import torch
+    modelo.to("cpu")
+    torch.quantization.quantize_dynamic(modelo, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return modelo
+
+def configurar_modelo(modelo, inferencia: str = INFERENCIA_EMBEDDINGS):
+    """Aplica tokens por comentário, threads do torch e o modo de inferência (valem para o processo; chamado ao carregar)."""
+    if inferencia not in MODOS_INFERENCIA:
+        raise ValueError(f"CLIMA_INFERENCIA_EMBEDDINGS deve ser um de {MODOS_INFERENCIA}, não '{inferencia}'")
+    if MAX_TOKENS_EMBEDDINGS > 0:
+        modelo.max_seq_length = MAX_TOKENS_EMBEDDINGS
+    if THREADS_EMBEDDINGS > 0:
+        import torch
+        torch.set_num_threads(THREADS_EMBEDDINGS)
+    if inferencia == "int8":
+        quantizar_int8(modelo)
+    return modelo
+
+def lotes_por_tamanho(textos: list, tamanho_lote: int = LOTE_EMBEDDINGS) -> list:
+    """Posições dos textos em lotes, dos mais longos aos mais curtos.
+
+    É a mesma ordem que o `encode` do sentence-transformers já usa internamente: quebrar a chamada em
+    lotes nossos não muda o preenchimento (padding) de cada lote, só permite informar o progresso entre eles.
+    """
+    ordem = np.argsort([-len(t) for t in textos], kind="stable")
+    return [ordem[i:i + tamanho_lote] for i in range(0, len(ordem), tamanho_lote)]
+
+def progresso_no_log(passos: int = 10):
+    """Callback de progresso que registra no log a cada décimo (processamento em lote, sem interface)."""
+    ultimo = [0]
+    def registrar(feitos, total):
+        passo = feitos * passos // total
+        if passo > ultimo[0]:
+            ultimo[0] = passo
+            log.info("Codificando comentários: %d/%d", feitos, total)
+    return registrar
+
+def codificar_em_lotes(modelo, textos: list, tamanho_lote: int = LOTE_EMBEDDINGS, progresso=None) -> np.ndarray:
+    """Embeddings float32 na ordem de `textos`.
+
+    `progresso(feitos, total)` é chamado depois de cada lote (no app, atualiza a barra do Streamlit;
+    o tqdm do sentence-transformers iria para o log do servidor).
+    """
+    if not textos:
+        return np.empty((0, modelo.get_sentence_embedding_dimension()), dtype=np.float32)
+    matriz = None
+    feitos = 0
+    inicio = time.perf_counter()
+    for lote in lotes_por_tamanho(textos, tamanho_lote):
+        vetores = modelo.encode([textos[i] for i in lote], batch_size=len(lote), show_progress_bar=False, convert_to_numpy=True)
+        if matriz is None:
+            matriz = np.empty((len(textos), vetores.shape[1]), dtype=np.float32)
+        matriz[lote] = vetores
+        feitos += len(lote)
+        if progresso is not None:
+            progresso(feitos, len(textos))
+    segundos = time.perf_counter() - inicio
+    log.info("%d comentários codificados em %.1fs (%.0f/s)", len(textos), segundos, len(textos) / max(segundos, 1e-9))
+    return matriz
@@ -0,0 +1,46 @@
+# configuracao.py - caminhos e limites compartilhados (podem ser sobrescritos por variáveis de ambiente)
+
+import os
+from pathlib import Path
+
+DIRETORIO_DADOS = Path(os.environ.get("CLIMA_DIRETORIO_DADOS", Path(__file__).resolve().parent.parent / "data"))
+
+DIRETORIO_CACHE_PLANILHAS = DIRETORIO_DADOS / "cache_planilhas"
+LIMITE_CACHE_PLANILHAS_MB = float(os.environ.get("CLIMA_LIMITE_CACHE_MB", 512))
+
+DIRETORIO_DATASETS = DIRETORIO_DADOS / "datasets"
+
+# arquivos gerados para download (Excel, relatórios), reaproveitados enquanto os dados não mudam
+DIRETORIO_ARTEFATOS = DIRETORIO_DADOS / "artefatos"
+LIMITE_ARTEFATOS_MB = float(os.environ.get("CLIMA_LIMITE_ARTEFATOS_MB", 256))
+LIMITE_ARTEFATOS_MEMORIA_MB = float(os.environ.get("CLIMA_LIMITE_ARTEFATOS_MEMORIA_MB", 64))
+
+# gráficos: acima destes tamanhos entram no modo de grandes volumes (limites de payload no README)
+LIMITE_PONTOS_GRAFICO = int(os.environ.get("CLIMA_LIMITE_PONTOS_GRAFICO", 2000))
+MAX_OUTLIERS_POR_BASE = int(os.environ.get("CLIMA_MAX_OUTLIERS_POR_BASE", 200))
+LIMITE_TEXTO_HOVER = int(os.environ.get("CLIMA_LIMITE_TEXTO_HOVER", 120))
+# figuras Plotly já montadas, reaproveitadas entre reruns enquanto dados e opções não mudam
+LIMITE_FIGURAS_MEMORIA_MB = float(os.environ.get("CLIMA_LIMITE_FIGURAS_MEMORIA_MB", 64))
+
+# modelos de embedding dos comentários: carregados uma vez por processo (components/modelos.py)
+MODELO_EMBEDDINGS = os.environ.get("CLIMA_MODELO_EMBEDDINGS", "paraphrase-multilingual-MiniLM-L12-v2")
+# "1" carrega o modelo em segundo plano ao iniciar o servidor, antes da primeira análise
+AQUECER_MODELOS = os.environ.get("CLIMA_AQUECER_MODELOS", "0") == "1"
+# minutos sem uso até o modelo ser descarregado da memória (0 = nunca)
+OCIOSIDADE_MODELOS_MIN = float(os.environ.get("CLIMA_OCIOSIDADE_MODELOS_MIN", 30))
+# embeddings já calculados (float16 em disco), por modelo e versão: só comentários novos são codificados
+DIRETORIO_EMBEDDINGS = DIRETORIO_DADOS / "embeddings"
+# trocar a versão (por exemplo, ao mudar o modo de inferência) separa os vetores antigos dos novos
+VERSAO_EMBEDDINGS = os.environ.get("CLIMA_VERSAO_EMBEDDINGS", "1")
+# codificação em lotes (components/codificacao.py): comentários por lote, tokens por comentário (0 = o do modelo)
+# e threads do torch por processo (0 = padrão do torch; com --workers-comentarios, divida os núcleos entre os workers)
+LOTE_EMBEDDINGS = int(os.environ.get("CLIMA_LOTE_EMBEDDINGS", 64))
+MAX_TOKENS_EMBEDDINGS = int(os.environ.get("CLIMA_MAX_TOKENS_EMBEDDINGS", 0))
+THREADS_EMBEDDINGS = int(os.environ.get("CLIMA_THREADS_EMBEDDINGS", 0))
+# "int8": quantização dinâmica das camadas lineares do modelo (CPU; mais rápido e menor, vetores um pouco diferentes).
+# Confira com benchmarks/qualidade_quantizacao.py antes de trocar; os vetores ficam numa versão separada da loja
+INFERENCIA_EMBEDDINGS = os.environ.get("CLIMA_INFERENCIA_EMBEDDINGS", "fp32").lower()
+# agrupamento dos comentários: "dbscan" (distâncias par a par, memória quadrática), "grafo" (k vizinhos aproximados,
+# reaproveitados pelo UMAP) ou "auto" (grafo a partir de LIMITE_DBSCAN_COMENTARIOS comentários)
+AGRUPAMENTO_COMENTARIOS = os.environ.get("CLIMA_AGRUPAMENTO_COMENTARIOS", "auto").lower()
+LIMITE_DBSCAN_COMENTARIOS = int(os.environ.get("CLIMA_LIMITE_DBSCAN_COMENTARIOS", 5000))
@@ -0,0 +1,142 @@
+# cubo.py - cubo de contagens (BASE x superior x pergunta x resposta) montado em uma única passada vetorizada
+
+import numpy as np
+import pandas as pd
+
+from components.cache_memoria import CacheLRU
+from components.catalogo import coluna_por_id, ids_por_tipo, resolver_colunas
+
+_cubos = CacheLRU(limite_bytes=256 * 1024 ** 2, max_itens=4, tamanho=lambda cubo: cubo["contagens"].nbytes)
+
+def _codificar(serie: pd.Series, nota: bool = False):
+    """Códigos inteiros (-1 = vazio) e rótulos das respostas, na ordem em que os gráficos as mostram."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy().astype(np.int64), list(serie.cat.categories)
+    if not nota and not pd.api.types.is_numeric_dtype(serie):
+        # texto que `tipar_dataset` não virou categoria (muitas grafias): rótulos em ordem alfabética, como no groupby
+        codigos, rotulos = pd.factorize(serie, sort=True, use_na_sentinel=True)
+        return np.asarray(codigos, dtype=np.int64), list(rotulos)
+    numerica = pd.to_numeric(serie, errors="coerce").astype(float).to_numpy()
+    vazias = np.isnan(numerica)
+    valores = np.unique(numerica[~vazias])
+    codigos = np.searchsorted(valores, numerica)
+    codigos[vazias] = -1
+    rotulos = [int(v) if float(v).is_integer() else float(v) for v in valores]
+    return codigos.astype(np.int64), rotulos
+
+def construir_cubo(df: pd.DataFrame) -> dict:
+    """Contagens de todas as perguntas fechadas por BASE e superior.
+
+    `contagens[b, s, q, r]` é o número de respostas `r` à pergunta `q` no segmento (b, s).
+    A última posição de superior guarda as linhas sem superior informado, para que
+    os totais por BASE batam com o dataset.
+    """
+    coluna_superior = coluna_por_id(df.columns, "SUPERIOR")
+    mapa = resolver_colunas(df.columns)
+    ids = [i for i in ids_por_tipo("likert", "nota") if i in mapa]
+    perguntas = [mapa[i] for i in ids]
+
+    codigos_base, bases = _codificar(df["BASE"].astype("category"))
+    if coluna_superior:
+        codigos_sup, superiores = _codificar(df[coluna_superior].astype("category"))
+    else:
+        codigos_sup, superiores = np.full(len(df), -1, dtype=np.int64), []
+    n_sup = len(superiores) + 1
+    codigos_sup = np.where(codigos_sup < 0, n_sup - 1, codigos_sup)
+
+    notas = set(ids_por_tipo("nota"))
+    codificadas = [_codificar(df[col], nota=i in notas) for i, col in zip(ids, perguntas)]
+    respostas = [rotulos for _, rotulos in codificadas]
+    n_resp = max((len(r) for r in respostas), default=1)
+    n_perg = len(perguntas)
+
+    # índice linear de cada célula (linha x pergunta) no cubo; uma bincount conta tudo de uma vez
+    matriz = np.column_stack([codigos for codigos, _ in codificadas]) if codificadas else np.empty((len(df), 0), dtype=np.int64)
+    segmento = codigos_base * n_sup + codigos_sup
+    plano = (segmento[:, None] * n_perg + np.arange(n_perg)[None, :]) * n_resp + matriz
+    validos = (matriz >= 0) & (codigos_base >= 0)[:, None]
+    contagens = np.bincount(plano[validos], minlength=len(bases) * n_sup * n_perg * n_resp)
+    linhas = np.bincount(segmento[codigos_base >= 0], minlength=len(bases) * n_sup)
+
+    return {
+        "bases": bases,
+        "superiores": superiores,
+        "coluna_superior": coluna_superior,
+        "perguntas": {col: q for q, col in enumerate(perguntas)},
+        "ids": ids,
+        "respostas": respostas,
+        # escalas reconhecidas (Likert ordenada): só estas entram nos indicadores de favorabilidade
+        "ordenadas": [bool(getattr(df[col].dtype, "ordered", False)) for col in perguntas],
+        "contagens": contagens.reshape(len(bases), n_sup, n_perg, n_resp).astype(np.int32),
+        "linhas": linhas.reshape(len(bases), n_sup).astype(np.int32)
+    }
+
+def cubo_dataset(df: pd.DataFrame, impressao: str) -> dict:
+    """Cubo do dataset, montado uma vez (na ingestão) e reaproveitado enquanto o conteúdo não muda."""
+    cubo = _cubos.obter(impressao)
+    if cubo is None:
+        cubo = construir_cubo(df)
+        _cubos.guardar(impressao, cubo)
+    return cubo
+
+def indices_selecao(cubo: dict, selecoes: dict):
+    """Posições de BASE e de superior escolhidas, com a mesma semântica do motor de filtros."""
+    bases = selecoes.get("BASE")
+    escolhidas = set(cubo["bases"] if bases is None else bases)
+    ib = [i for i, base in enumerate(cubo["bases"]) if base in escolhidas]
+
+    superiores = selecoes.get(cubo["coluna_superior"]) if cubo["coluna_superior"] else None
+    if superiores is None:
+        i_sup = list(range(len(cubo["superiores"]) + 1))
+    else:
+        escolhidos = set(superiores)
+        i_sup = [i for i, sup in enumerate(cubo["superiores"]) if sup in escolhidos]
+    return ib, i_sup
+
+def _fatia(cubo: dict, q: int, n_respostas: int, ib, i_sup) -> np.ndarray:
+    """Matriz (bases escolhidas x respostas) da pergunta `q`, somada sobre os superiores escolhidos."""
+    return cubo["contagens"][:, :, q, :n_respostas][np.ix_(ib, i_sup)].sum(axis=1)
+
+def _porcentagem(contagens: np.ndarray) -> np.ndarray:
+    total = contagens.sum()
+    return contagens / total * 100 if total else np.zeros(len(contagens))
+
+def contagens_por_base(cubo: dict, selecoes: dict) -> pd.DataFrame:
+    """Mesmo formato de `formatar_porcentagem(df, ['BASE'])`."""
+    ib, i_sup = indices_selecao(cubo, selecoes)
+    contagens = cubo["linhas"][np.ix_(ib, i_sup)].sum(axis=1).astype(np.int64)
+    presentes = np.flatnonzero(contagens)
+    contagens = contagens[presentes]
+    return pd.DataFrame({
+        "BASE": [cubo["bases"][ib[i]] for i in presentes],
+        "Contagem": contagens,
+        "Porcentagem": _porcentagem(contagens)
+    })
+
+def contagens_pergunta(cubo: dict, coluna: str, selecoes: dict) -> pd.DataFrame:
+    """Mesmo formato de `formatar_porcentagem(df, ['BASE', coluna])`, lido do cubo."""
+    q = cubo["perguntas"][coluna]
+    rotulos = cubo["respostas"][q]
+    ib, i_sup = indices_selecao(cubo, selecoes)
+    matriz = _fatia(cubo, q, len(rotulos), ib, i_sup)
+    b, r = np.nonzero(matriz)
+    contagens = matriz[b, r].astype(np.int64)
+    return pd.DataFrame({
+        "BASE": [cubo["bases"][ib[i]] for i in b],
+        coluna: [rotulos[i] for i in r],
+        "Contagem": contagens,
+        "Porcentagem": _porcentagem(contagens)
+    })
+
+def media_por_base(cubo: dict, coluna: str, selecoes: dict) -> pd.DataFrame:
+    """Média de uma pergunta numérica (a nota geral) por BASE: soma(valor x contagem) / contagem."""
+    q = cubo["perguntas"][coluna]
+    valores = np.asarray(cubo["respostas"][q], dtype=float)
+    ib, i_sup = indices_selecao(cubo, selecoes)
+    matriz = _fatia(cubo, q, len(valores), ib, i_sup)
+    respostas = matriz.sum(axis=1)
+    com_nota = respostas > 0
+    return pd.DataFrame({
+        "BASE": [cubo["bases"][i] for i, ok in zip(ib, com_nota) if ok],
+        "Nota Média": (matriz @ valores)[com_nota] / respostas[com_nota]
+    })
@@ -0,0 +1,128 @@
+# esquema.py - tipagem compacta do dataset unificado (categorias, respostas Likert codificadas e texto em Arrow)
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from components.catalogo import coluna_por_id, colunas_por_ids, ids_por_tipo
+
+# Escalas conhecidas, da pior para a melhor resposta. O primeiro rótulo de cada
+# posição é o canônico; os demais são variações aceitas no arquivo.
+ESCALAS_LIKERT = [
+    [
+        ["Discordo totalmente", "Discordo completamente"],
+        ["Discordo parcialmente", "Discordo"],
+        ["Não concordo nem discordo", "Nem concordo nem discordo", "Neutro", "Indiferente"],
+        ["Concordo parcialmente", "Concordo"],
+        ["Concordo totalmente", "Concordo completamente"]
+    ],
+    [
+        ["Nunca"],
+        ["Raramente"],
+        ["Às vezes", "Algumas vezes"],
+        ["Frequentemente", "Quase sempre"],
+        ["Sempre"]
+    ],
+    [
+        ["Muito insatisfeito"],
+        ["Insatisfeito"],
+        ["Neutro", "Indiferente"],
+        ["Satisfeito"],
+        ["Muito satisfeito"]
+    ],
+    [
+        ["Péssimo", "Muito ruim"],
+        ["Ruim"],
+        ["Regular"],
+        ["Bom"],
+        ["Ótimo", "Excelente", "Muito bom"]
+    ],
+    [
+        ["Não"],
+        ["Parcialmente", "Em parte"],
+        ["Sim"]
+    ],
+    [
+        ["Não"],
+        ["Sim"]
+    ]
+]
+
+# acima disso a coluna é tratada como texto livre, não como alternativa
+LIMITE_CATEGORIAS = 12
+
+def normalizar_rotulo(texto) -> str:
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ASCII", "ignore").decode("utf-8")
+    return re.sub(r"\s+", " ", texto).strip().lower()
+
+def identificar_escala(valores):
+    """Devolve {valor original: rótulo canônico} e a lista de rótulos da escala, ou (None, None)."""
+    normalizados = {valor: normalizar_rotulo(valor) for valor in valores}
+    for escala in ESCALAS_LIKERT:
+        posicoes = {normalizar_rotulo(alias): posicao[0] for posicao in escala for alias in posicao}
+        if normalizados and all(n in posicoes for n in normalizados.values()):
+            return {valor: posicoes[n] for valor, n in normalizados.items()}, [posicao[0] for posicao in escala]
+    return None, None
+
+def colunas_likert(colunas) -> list:
+    return colunas_por_ids(colunas, ids_por_tipo("likert"))
+
+def _tipar_alternativas(serie: pd.Series) -> pd.Series:
+    valores = serie.dropna().unique()
+    mapa, escala = identificar_escala(valores)
+    if mapa is not None:
+        return pd.Series(pd.Categorical(serie.map(mapa), categories=escala, ordered=True), index=serie.index, name=serie.name)
+    return serie.astype(pd.CategoricalDtype(sorted(valores)))
+
+def _tipar_nota(serie: pd.Series) -> pd.Series:
+    numerica = pd.to_numeric(serie, errors="coerce")
+    inteira = numerica.dropna()
+    if (inteira == inteira.round()).all() and inteira.between(-128, 127).all():
+        return numerica.astype("Int8")
+    return numerica.astype("Float32")
+
+def _eh_texto(serie: pd.Series) -> bool:
+    return serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) in ("string", "empty")
+
+def tipar_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte o frame para tipos compactos. É idempotente: colunas já tipadas são mantidas."""
+    df = df.copy(deep=False)
+    likert = set(colunas_likert(df.columns))
+    coluna_superior = coluna_por_id(df.columns, "SUPERIOR")
+    coluna_nota = coluna_por_id(df.columns, "NOTA_GERAL")
+
+    for col in df.columns:
+        serie = df[col]
+        if col in ("BASE", coluna_superior):
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                df[col] = serie.astype("category")
+        elif col == coluna_nota:
+            if not isinstance(serie.dtype, (pd.Int8Dtype, pd.Float32Dtype)):
+                df[col] = _tipar_nota(serie)
+        elif col in likert and _eh_texto(serie) and serie.nunique() <= LIMITE_CATEGORIAS:
+            df[col] = _tipar_alternativas(serie)
+        elif _eh_texto(serie):
+            # colunas repetitivas (ex.: dados demográficos) viram categoria; o texto livre fica em Arrow
+            unicos = serie.nunique()
+            if unicos <= LIMITE_CATEGORIAS or unicos <= 0.05 * len(serie):
+                df[col] = serie.astype("category")
+            else:
+                df[col] = serie.astype("string[pyarrow]")
+    return df
+
+def mapa_respostas(df: pd.DataFrame) -> dict:
+    """Rótulos de cada coluna categórica, na ordem dos códigos inteiros."""
+    return {
+        col: list(df[col].cat.categories)
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+
+def codigos_respostas(df: pd.DataFrame, coluna: str) -> np.ndarray:
+    """Códigos inteiros (int8 na prática) das respostas; -1 indica resposta em branco."""
+    return df[coluna].cat.codes.to_numpy()
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
@@ -1,8 +1,13 @@
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Alignment, Font
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Alignment, Font, NamedStyle
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from io import BytesIO
 
+import numpy as np
+import pandas as pd
+
 def exportar_excel_formatado(df):
     wb = Workbook()
     ws = wb.active
@@ -12,6 +17,9 @@ def exportar_excel_formatado(df):
     fill_cabecalho = PatternFill(start_color="D6EAF8", end_color="D6EAF8", fill_type="solid")  # azul claro
     fonte_cabecalho = Font(bold=True)
 
+    # tipos anuláveis (Int8, string[pyarrow], categorias) usam pd.NA, que o openpyxl não aceita
+    df = df.astype(object).where(df.notna(), None)
+
     for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
         for c_idx, value in enumerate(row, 1):
             cell = ws.cell(row=r_idx, column=c_idx, value=value)
@@ -29,4 +37,91 @@ def exportar_excel_formatado(df):
     output = BytesIO()
     wb.save(output)
     output.seek(0)
-    return output
\ No newline at end of file
+    return output
+
+# prefixos das alternativas/perguntas destacadas na planilha
+PREFIXOS_PERGUNTA = ("a)", "b)", "c)", "d)", "e)")
+LINHAS_POR_BLOCO = 5000
+
+def _estilos_nomeados(wb):
+    alinhamento = Alignment(wrap_text=True, vertical="top")
+    estilos = [
+        NamedStyle(name="clima_cabecalho", font=Font(bold=True), alignment=alinhamento,
+                   fill=PatternFill(start_color="D6EAF8", end_color="D6EAF8", fill_type="solid")),
+        NamedStyle(name="clima_celula", alignment=alinhamento),
+        NamedStyle(name="clima_pergunta", alignment=alinhamento,
+                   fill=PatternFill(start_color="E8F6F3", end_color="E8F6F3", fill_type="solid"))
+    ]
+    for estilo in estilos:
+        wb.add_named_style(estilo)
+
+def _mascara_pergunta(serie: pd.Series):
+    """Células que recebem o destaque de pergunta, calculado de forma vetorizada (None = nenhuma)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # decide uma vez por categoria e espalha pelos códigos
+        categorias = serie.cat.categories
+        if categorias.inferred_type != "string":
+            return None
+        destaque = np.asarray(categorias.str.strip().str.lower().str.startswith(PREFIXOS_PERGUNTA), dtype=bool)
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, destaque[codigos], False) if destaque.any() else None
+    if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+        return None
+    mascara = serie.str.strip().str.lower().str.startswith(PREFIXOS_PERGUNTA)
+    mascara = mascara.fillna(False).to_numpy(dtype=bool)
+    return mascara if mascara.any() else None
+
+def exportar_excel_streaming(df, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Mesma planilha do `exportar_excel_formatado`, gravada em modo write-only.
+
+    As linhas vão direto para o arquivo em blocos, com estilos nomeados compartilhados e
+    a formatação de cada coluna decidida por bloco (e não célula a célula).
+    """
+    wb = Workbook(write_only=True)
+    _estilos_nomeados(wb)
+    ws = wb.create_sheet("Unificado")
+
+    for c_idx in range(1, len(df.columns) + 1):
+        ws.column_dimensions[get_column_letter(c_idx)].width = 50 if c_idx < 30 else 20
+
+    cabecalho = []
+    for col in df.columns:
+        cell = WriteOnlyCell(ws, value=col)
+        cell.style = "clima_cabecalho"
+        cabecalho.append(cell)
+    ws.append(cabecalho)
+
+    # uma célula estilizada por coluna e estilo, reaproveitada em todas as linhas
+    # (o write-only grava cada linha no arquivo assim que ela é recebida)
+    celulas = []
+    for _ in df.columns:
+        normal, pergunta = WriteOnlyCell(ws), WriteOnlyCell(ws)
+        normal.style = "clima_celula"
+        pergunta.style = "clima_pergunta"
+        celulas.append((normal, pergunta))
+
+    for inicio in range(0, len(df), linhas_por_bloco):
+        bloco = df.iloc[inicio:inicio + linhas_por_bloco]
+        valores, mascaras = [], []
+        for col in range(len(df.columns)):
+            serie = bloco.iloc[:, col]
+            valores.append(serie.astype(object).where(serie.notna(), None).tolist())
+            mascaras.append(_mascara_pergunta(serie))
+
+        for i in range(len(bloco)):
+            linha = []
+            for col, (normal, pergunta) in enumerate(celulas):
+                valor = valores[col][i]
+                if valor is None:
+                    linha.append(None)
+                    continue
+                mascara = mascaras[col]
+                cell = pergunta if mascara is not None and mascara[i] else normal
+                cell.value = valor
+                linha.append(cell)
+            ws.append(linha)
+
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
@@ -2,28 +2,77 @@
 
 import pandas as pd
 import streamlit as st
+from components.catalogo import coluna_por_id
+from components.artefatos import impressao_digital
+from components.busca import indice_busca, buscar, destacar, dobrar
+from components.motor_filtros import chave_estado, motor_filtros, linhas_filtradas, opcoes_base, opcoes_cascata
 
-def aplicar_filtros_topbar(df: pd.DataFrame):
+LIMITE_PREVIA_BUSCA = 200
+
+def aplicar_filtros_topbar(df: pd.DataFrame, impressao: str = None):
+    return df.iloc[filtrar_linhas_topbar(df, impressao)]
+
+def filtrar_linhas_topbar(df: pd.DataFrame, impressao: str = None):
+    """Mostra a barra de filtros e devolve as posições das linhas selecionadas, sem copiar o DataFrame."""
+    return filtros_topbar(df, impressao)["linhas"]
+
+def filtros_topbar(df: pd.DataFrame, impressao: str = None) -> dict:
+    """Barra de filtros. Devolve as posições filtradas, as seleções de segmento, se há busca de texto ativa
+    e `estado`, a chave canônica de tudo o que foi filtrado (segmentos e busca)."""
+    impressao = impressao or impressao_digital(df)
     col1, col2, col3 = st.columns([2, 2, 2])
 
+    # opções e contagens vêm do índice de segmentos do motor, não das colunas inteiras
+    motor = motor_filtros(df, impressao)
     with col1:
-        bases = df["BASE"].dropna().unique().tolist()
-        selected_bases = st.multiselect("Bases", bases, default=bases)
+        bases = opcoes_base(motor)
+        selected_bases = st.multiselect("Bases", list(bases), default=list(bases), format_func=lambda b: f"{b} ({bases[b]})")
     with col2:
-        superior_col = "Qual  o seu superior imediato?"
-        if superior_col in df.columns:
-            superiores = df[superior_col].dropna().unique().tolist()
-            selected_superior = st.multiselect("Superior Imediato", superiores, default=superiores)
+        superior_col = coluna_por_id(df.columns, "SUPERIOR")
+        if superior_col:
+            # em cascata: só os superiores das bases escolhidas, com o número de respostas em cada uma
+            superiores = opcoes_cascata(motor, superior_col, selected_bases)
+            selected_superior = st.multiselect(
+                "Superior Imediato",
+                list(superiores),
+                default=list(superiores),
+                format_func=lambda s: f"{s} ({superiores[s]})"
+            )
         else:
             selected_superior = []
     with col3:
         termo_busca = st.text_input("Pesquisar texto (exato ou parcial)", "")
+        colunas_busca = None
+        if termo_busca.strip():
+            colunas_busca = st.multiselect("Buscar somente nas colunas", list(df.columns), placeholder="Todas as colunas") or None
 
-    df_filtrado = df[df["BASE"].isin(selected_bases)]
-    if selected_superior:
-        df_filtrado = df_filtrado[df_filtrado[superior_col].isin(selected_superior)]
+    selecoes = {"BASE": selected_bases}
+    if superior_col:
+        selecoes[superior_col] = selected_superior or None
+    linhas = linhas_filtradas(motor, selecoes)
+    estado = chave_estado(selecoes)
 
     if termo_busca.strip():
-        df_filtrado = df_filtrado[df_filtrado.apply(lambda row: row.astype(str).str.contains(termo_busca, case=False).any(), axis=1)]
+        # índice montado uma vez por dataset; a busca ignora acentos e maiúsculas
+        resultado = buscar(indice_busca(df, impressao), termo_busca, colunas_busca)
+        linhas = linhas[resultado["mascara"][linhas]]
+        _mostrar_busca(df, resultado, linhas)
+        estado += (("busca", dobrar(termo_busca), tuple(sorted(colunas_busca or []))),)
+
+    return {"linhas": linhas, "selecoes": selecoes, "busca": bool(termo_busca.strip()), "estado": estado}
 
-    return df_filtrado
+def _mostrar_busca(df: pd.DataFrame, resultado: dict, linhas):
+    encontradas = {col: int(achou[linhas].sum()) for col, achou in resultado["por_coluna"].items()}
+    encontradas = {col: n for col, n in encontradas.items() if n}
+    if not encontradas:
+        st.caption("🔎 Nenhuma resposta encontrada.")
+        return
+    ordenadas = sorted(encontradas.items(), key=lambda item: -item[1])
+    resumo = ", ".join(f"{col} ({n})" for col, n in ordenadas[:5])
+    if len(ordenadas) > 5:
+        resumo += f" e mais {len(ordenadas) - 5} colunas"
+    st.caption(f"🔎 {len(linhas)} respostas encontradas em: {resumo}")
+    with st.expander("Ver trechos encontrados"):
+        posicoes = linhas[:LIMITE_PREVIA_BUSCA]
+        previa = df.iloc[posicoes][["BASE"] + [col for col in encontradas if col != "BASE"]]
+        st.dataframe(destacar(previa, resultado, posicoes), use_container_width=True)
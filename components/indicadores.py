@@ -0,0 +1,170 @@
+# indicadores.py - favorabilidade, top-2-box e média por dimensão e segmento, e NPS da nota geral (sem Streamlit)
+
+import numpy as np
+import pandas as pd
+
+from components.catalogo import PERGUNTAS_POR_ID, dimensoes
+from components.cubo import indices_selecao
+
+NIVEIS = ["Geral", "BASE", "Superior"]
+SEM_SUPERIOR = "(sem superior)"
+DIMENSAO_NPS = "Nota geral (NPS)"
+
+METRICAS_DIMENSAO = ["Favorabilidade (%)", "Desfavorabilidade (%)", "Top-2-box (%)", "Média (0-100)"]
+METRICAS_NPS = ["Promotores (%)", "Neutros (%)", "Detratores (%)", "NPS", "Nota Média"]
+
+def _pesos_likert(cubo: dict) -> np.ndarray:
+    """Pesos (pergunta x resposta x medida) das perguntas com escala ordenada.
+
+    Medidas: respondidas, favoráveis (acima do ponto médio), desfavoráveis (abaixo),
+    top-2-box (duas melhores posições) e posição normalizada de 0 a 100.
+    """
+    n_resp = cubo["contagens"].shape[3]
+    pesos = np.zeros((len(cubo["ids"]), n_resp, 5))
+    for q, (id_pergunta, respostas) in enumerate(zip(cubo["ids"], cubo["respostas"])):
+        k = len(respostas)
+        if not cubo["ordenadas"][q] or PERGUNTAS_POR_ID[id_pergunta]["tipo"] != "likert" or k < 2:
+            continue
+        posicoes = np.arange(k)
+        meio = (k - 1) / 2
+        pesos[q, :k, 0] = 1
+        pesos[q, :k, 1] = posicoes > meio
+        pesos[q, :k, 2] = posicoes < meio
+        pesos[q, :k, 3] = posicoes >= k - 2
+        pesos[q, :k, 4] = posicoes / (k - 1) * 100
+    return pesos
+
+def _pesos_nps(cubo: dict, q: int) -> np.ndarray:
+    """Pesos (resposta x medida) da nota 0-10: respondidas, promotores (9-10), neutros (7-8), detratores (0-6) e soma das notas."""
+    n_resp = cubo["contagens"].shape[3]
+    pesos = np.zeros((n_resp, 5))
+    notas = np.asarray(cubo["respostas"][q], dtype=float)
+    k = len(notas)
+    pesos[:k, 0] = 1
+    pesos[:k, 1] = notas >= 9
+    pesos[:k, 2] = (notas >= 7) & (notas < 9)
+    pesos[:k, 3] = notas < 7
+    pesos[:k, 4] = notas
+    return pesos
+
+def _niveis(matriz: np.ndarray, cubo: dict, ib, i_sup):
+    """Agrega um array (bases x superiores x ...) nos três níveis e devolve (nível, BASE, Superior, valores) de cada um."""
+    nomes_sup = list(cubo["superiores"]) + [SEM_SUPERIOR]
+    bases = np.asarray([cubo["bases"][i] for i in ib], dtype=object)
+    superiores = np.asarray([nomes_sup[i] for i in i_sup], dtype=object)
+
+    resto = matriz.shape[2:]
+    yield "Geral", np.asarray([None], dtype=object), np.asarray([None], dtype=object), matriz.sum(axis=(0, 1)).reshape(1, *resto)
+    yield "BASE", bases, np.full(len(bases), None, dtype=object), matriz.sum(axis=1)
+    yield "Superior", np.repeat(bases, len(superiores)), np.tile(superiores, len(bases)), matriz.reshape(len(bases) * len(superiores), *resto)
+
+def _percentual(parte, total):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, parte / total * 100, np.nan)
+
+def calcular_indicadores(cubo: dict, selecoes: dict = None) -> pd.DataFrame:
+    """Tabela longa com os indicadores de cada dimensão (e o NPS da nota geral) em cada segmento.
+
+    Uma linha por (nível, BASE, superior, dimensão). Todos os segmentos são calculados de uma vez
+    sobre o cubo de contagens (einsum), sem laço por segmento.
+    """
+    ib, i_sup = indices_selecao(cubo, selecoes or {})
+    contagens = cubo["contagens"][np.ix_(ib, i_sup)].astype(np.int64)
+    respondentes = cubo["linhas"][np.ix_(ib, i_sup)].astype(np.int64)
+
+    nomes_dim = list(dimensoes)
+    membros = np.zeros((len(cubo["ids"]), len(nomes_dim)))
+    for q, id_pergunta in enumerate(cubo["ids"]):
+        dimensao = PERGUNTAS_POR_ID[id_pergunta]["dimensao"]
+        if dimensao in dimensoes:
+            membros[q, nomes_dim.index(dimensao)] = 1
+    # (bases x superiores x dimensões x medidas)
+    por_dimensao = np.einsum("bsqa,qam,qd->bsdm", contagens, _pesos_likert(cubo), membros)
+    com_dados = por_dimensao[..., 0].sum(axis=(0, 1)) > 0
+    nomes_dim = [d for d, ok in zip(nomes_dim, com_dados) if ok]
+    por_dimensao = por_dimensao[:, :, com_dados, :]
+
+    partes = []
+    for (nivel, bases, superiores, valores), (_, _, _, pessoas) in zip(
+        _niveis(por_dimensao, cubo, ib, i_sup), _niveis(respondentes, cubo, ib, i_sup)
+    ):
+        n_seg, n_dim, n_medidas = valores.shape
+        valores = valores.reshape(n_seg * n_dim, n_medidas)
+        respondidas = valores[:, 0]
+        partes.append(pd.DataFrame({
+            "Nível": nivel,
+            "BASE": np.repeat(bases, n_dim),
+            "Superior": np.repeat(superiores, n_dim),
+            "Dimensão": np.tile(nomes_dim, n_seg),
+            "Respondentes": np.repeat(pessoas, n_dim),
+            "Respostas": respondidas.astype(np.int64),
+            "Favorabilidade (%)": _percentual(valores[:, 1], respondidas),
+            "Desfavorabilidade (%)": _percentual(valores[:, 2], respondidas),
+            "Top-2-box (%)": _percentual(valores[:, 3], respondidas),
+            "Média (0-100)": _percentual(valores[:, 4], respondidas * 100)
+        }))
+
+    if "NOTA_GERAL" in cubo["ids"]:
+        q = cubo["ids"].index("NOTA_GERAL")
+        por_nota = np.einsum("bsa,am->bsm", contagens[:, :, q, :], _pesos_nps(cubo, q))
+        for (nivel, bases, superiores, valores), (_, _, _, pessoas) in zip(
+            _niveis(por_nota, cubo, ib, i_sup), _niveis(respondentes, cubo, ib, i_sup)
+        ):
+            respondidas = valores[:, 0]
+            promotores, neutros, detratores = (_percentual(valores[:, i], respondidas) for i in (1, 2, 3))
+            partes.append(pd.DataFrame({
+                "Nível": nivel,
+                "BASE": bases,
+                "Superior": superiores,
+                "Dimensão": DIMENSAO_NPS,
+                "Respondentes": pessoas,
+                "Respostas": respondidas.astype(np.int64),
+                "Promotores (%)": promotores,
+                "Neutros (%)": neutros,
+                "Detratores (%)": detratores,
+                "NPS": promotores - detratores,
+                "Nota Média": _percentual(valores[:, 4], respondidas * 100)
+            }))
+
+    tabela = pd.concat(partes, ignore_index=True)
+    # segmentos sem nenhuma resposta (combinações BASE x superior inexistentes) ficam de fora
+    return tabela[tabela["Respondentes"] > 0].reindex(
+        columns=["Nível", "BASE", "Superior", "Dimensão", "Respondentes", "Respostas"] + METRICAS_DIMENSAO + METRICAS_NPS
+    ).reset_index(drop=True)
+
+def favorabilidade_por_questao(cubo: dict, selecoes: dict = None, ids=None) -> pd.DataFrame:
+    """Favorabilidade de cada pergunta Likert em cada BASE (tabela longa), base do mapa de calor.
+
+    `ids` restringe às perguntas escolhidas (por exemplo, as de uma dimensão), na ordem do catálogo.
+    """
+    ib, i_sup = indices_selecao(cubo, selecoes or {})
+    pesos = _pesos_likert(cubo)
+    com_escala = pesos[:, :, 0].any(axis=1)
+    escolhidas = com_escala if ids is None else com_escala & np.isin(cubo["ids"], list(ids))
+    qs = np.flatnonzero(escolhidas)
+
+    contagens = cubo["contagens"][np.ix_(ib, i_sup)][:, :, qs, :].sum(axis=1, dtype=np.int64)
+    # (bases x perguntas x medidas): respondidas e favoráveis
+    medidas = np.einsum("bqa,qam->bqm", contagens, pesos[qs][:, :, :2])
+    respondidas = medidas[..., 0].ravel()
+    colunas = list(cubo["perguntas"])
+    ids_q = [cubo["ids"][q] for q in qs]
+    tabela = pd.DataFrame({
+        "BASE": np.repeat(np.asarray([cubo["bases"][i] for i in ib], dtype=object), len(qs)),
+        "ID": np.tile(ids_q, len(ib)),
+        "Dimensão": np.tile([PERGUNTAS_POR_ID[i]["dimensao"] for i in ids_q], len(ib)),
+        "Pergunta": np.tile([colunas[q] for q in qs], len(ib)),
+        "Respostas": respondidas.astype(np.int64),
+        "Favorabilidade (%)": _percentual(medidas[..., 1].ravel(), respondidas)
+    })
+    return tabela[tabela["Respostas"] > 0].reset_index(drop=True)
+
+def quadro_indicadores(tabela: pd.DataFrame, nivel: str, metrica: str) -> pd.DataFrame:
+    """Scorecard: um segmento por linha, uma dimensão por coluna (mais o NPS), com a métrica escolhida."""
+    dados = tabela[tabela["Nível"] == nivel]
+    segmento = {"Geral": [], "BASE": ["BASE"], "Superior": ["BASE", "Superior"]}[nivel]
+    chave = segmento or ["Nível"]
+    quadro = dados[dados["Dimensão"] != DIMENSAO_NPS].pivot_table(index=chave, columns="Dimensão", values=metrica, sort=False)
+    quadro = quadro.reindex(columns=[d for d in dimensoes if d in quadro.columns])
+    nps = dados[dados["Dimensão"] == DIMENSAO_NPS].set_index(chave)[["NPS", "Respondentes"]]
+    return quadro.join(nps, how="left").reset_index()
@@ -0,0 +1,184 @@
+# ingestao.py - leitura e unificação das planilhas de pesquisa, sem dependência do Streamlit
+
+import logging
+import os
+import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from components import cache_planilhas
+from components.catalogo import ROTULOS, padronizar_colunas, perguntas_encontradas, resolver_colunas
+from components.esquema import tipar_dataset
+
+log = logging.getLogger(__name__)
+
+PADRAO_BASE = r'PESQUISA DE CLIMA (.*?)\s*-\s*2025'
+
+IDS_ESSENCIAIS = ["SUPERIOR", "NOTA_GERAL"]
+colunas_essenciais = [ROTULOS[id_pergunta] for id_pergunta in IDS_ESSENCIAIS]
+
+def extrair_base(nome_arquivo: str) -> str:
+    match = re.search(PADRAO_BASE, nome_arquivo)
+    return match.group(1).strip() if match else "Desconhecido"
+
+def colunas_faltantes(colunas) -> list:
+    # a correspondência é feita pelo catálogo, então cabeçalhos de outras edições também são aceitos
+    mapa = resolver_colunas(colunas)
+    return [ROTULOS[id_pergunta] for id_pergunta in IDS_ESSENCIAIS if id_pergunta not in mapa]
+
+def ler_cabecalho(conteudo: bytes) -> list:
+    """Lê apenas a primeira linha da primeira planilha (openpyxl em modo somente leitura)."""
+    wb = load_workbook(BytesIO(conteudo), read_only=True, data_only=True)
+    try:
+        linha = next(wb.worksheets[0].iter_rows(min_row=1, max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    return [str(valor) for valor in linha if valor is not None]
+
+def pre_validar(nome_arquivo: str, conteudo: bytes):
+    """Confere o cabeçalho antes da leitura completa. Devolve o resultado de rejeição, ou None se o arquivo pode ser lido."""
+    resultado = _novo_resultado(nome_arquivo)
+    try:
+        cabecalho = ler_cabecalho(conteudo)
+    except Exception as e:
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+        return resultado
+
+    resultado["faltantes"] = colunas_faltantes(cabecalho)
+    resultado["perguntas"] = len(perguntas_encontradas(cabecalho))
+    if resultado["faltantes"] or not resultado["perguntas"]:
+        return resultado
+    return None
+
+def motivo_rejeicao(resultado: dict):
+    """Por que o arquivo fica fora da unificação (mesma regra do uploader), ou None se pode entrar.
+
+    Vale também para acertos de cache: `_finalizar` recalcula faltantes e perguntas a partir das colunas salvas.
+    """
+    if resultado["faltantes"]:
+        return "colunas ausentes: " + ", ".join(resultado["faltantes"])
+    if not resultado["perguntas"]:
+        return "nenhuma pergunta do questionário"
+    return None
+
+def normalizar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """Deixa o frame gravável em Parquet: nomes de coluna em texto e colunas com tipos misturados convertidas para texto."""
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ("string", "empty"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def _novo_resultado(nome_arquivo: str) -> dict:
+    return {"arquivo": nome_arquivo, "base": extrair_base(nome_arquivo), "df": None, "erro": None, "faltantes": [], "perguntas": 0, "cache": False}
+
+def _finalizar(resultado: dict, df: pd.DataFrame) -> dict:
+    df = padronizar_colunas(df)
+    df["BASE"] = resultado["base"]
+    resultado["faltantes"] = colunas_faltantes(df.columns)
+    resultado["perguntas"] = len(perguntas_encontradas(df.columns))
+    resultado["df"] = df
+    return resultado
+
+def ler_planilha_do_cache(nome_arquivo: str, conteudo: bytes):
+    """Devolve o resultado a partir do cache em Parquet, ou None se o conteúdo ainda não foi lido."""
+    df = cache_planilhas.obter(cache_planilhas.hash_conteudo(conteudo))
+    if df is None:
+        return None
+    resultado = _novo_resultado(nome_arquivo)
+    resultado["cache"] = True
+    return _finalizar(resultado, df)
+
+def ler_planilha(nome_arquivo: str, conteudo: bytes, usar_cache: bool = True) -> dict:
+    """Lê uma planilha e devolve um resultado serializável (usado também pelos processos do pool).
+
+    Com `usar_cache`, arquivos com o mesmo conteúdo (SHA-256) são lidos do cache em Parquet, sem passar pelo openpyxl.
+    """
+    if usar_cache:
+        resultado = ler_planilha_do_cache(nome_arquivo, conteudo)
+        if resultado is not None:
+            return resultado
+
+    resultado = _novo_resultado(nome_arquivo)
+    try:
+        df = normalizar_tipos(pd.read_excel(BytesIO(conteudo), sheet_name=0, engine="openpyxl"))
+    except Exception as e:
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+        return resultado
+
+    if usar_cache:
+        cache_planilhas.salvar(cache_planilhas.hash_conteudo(conteudo), df)
+    return _finalizar(resultado, df)
+
+def _ler_planilha_args(args):
+    return ler_planilha(*args)
+
+def workers_padrao(n_arquivos: int) -> int:
+    configurado = os.environ.get("CLIMA_WORKERS_LEITURA")
+    if configurado:
+        try:
+            return max(1, int(configurado))
+        except ValueError:
+            log.warning("CLIMA_WORKERS_LEITURA=%r não é um número inteiro; usando o padrão", configurado)
+    return max(1, min(n_arquivos, os.cpu_count() or 1))
+
+def ler_planilhas(arquivos, max_workers=None, usar_cache: bool = True, validar_cabecalho: bool = False) -> list:
+    """Lê uma lista de (nome, bytes), em série ou em um pool de processos.
+
+    A ordem dos resultados é sempre a ordem de entrada, para que a unificação
+    seja idêntica nos dois modos. Com `validar_cabecalho`, arquivos com modelo
+    errado são rejeitados só pelo cabeçalho, antes da leitura completa.
+    """
+    arquivos = list(arquivos)
+    if max_workers is None:
+        max_workers = workers_padrao(len(arquivos))
+
+    # acertos de cache e rejeições de cabeçalho são resolvidos aqui; só o restante é lido por inteiro
+    resultados = [ler_planilha_do_cache(nome, conteudo) if usar_cache else None for nome, conteudo in arquivos]
+    if validar_cabecalho:
+        for i, (nome, conteudo) in enumerate(arquivos):
+            if resultados[i] is None:
+                resultados[i] = pre_validar(nome, conteudo)
+    pendentes = [i for i, resultado in enumerate(resultados) if resultado is None]
+    max_workers = min(max_workers, len(pendentes))
+
+    if max_workers <= 1:
+        for i in pendentes:
+            resultados[i] = ler_planilha(*arquivos[i], usar_cache)
+    else:
+        # "spawn" evita fork de um processo com threads (servidor do Streamlit)
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto) as executor:
+            lidos = executor.map(_ler_planilha_args, [(*arquivos[i], usar_cache) for i in pendentes])
+            for i, resultado in zip(pendentes, lidos):
+                resultados[i] = resultado
+
+    if usar_cache:
+        cache_planilhas.aplicar_limite()
+    return resultados
+
+def hashes_linhas(df: pd.DataFrame) -> np.ndarray:
+    """Hash de 64 bits por linha, estável entre leituras (NaN/None e int/float dão o mesmo hash)."""
+    normalizado = {}
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            serie = serie.astype("float64")
+        normalizado[col] = serie
+    return pd.util.hash_pandas_object(pd.DataFrame(normalizado, copy=False), index=False).to_numpy()
+
+def deduplicar(df: pd.DataFrame) -> pd.DataFrame:
+    # equivalente ao drop_duplicates, mas compara um inteiro por linha em vez de todas as colunas de texto
+    return df[~pd.Series(hashes_linhas(df)).duplicated().to_numpy()]
+
+def unificar(dfs) -> pd.DataFrame:
+    df_unificado = deduplicar(pd.concat(dfs, ignore_index=True))
+    colunas = list(df_unificado.columns)
+    if "BASE" in colunas:
+        colunas.insert(0, colunas.pop(colunas.index("BASE")))
+    return tipar_dataset(df_unificado[colunas])
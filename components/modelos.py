@@ -0,0 +1,152 @@
+# modelos.py - registro dos modelos de embedding: um carregamento por processo, compartilhado entre sessões e threads
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+
+from components.codificacao import configurar_modelo
+from components.configuracao import AQUECER_MODELOS, INFERENCIA_EMBEDDINGS, MODELO_EMBEDDINGS, OCIOSIDADE_MODELOS_MIN
+
+log = logging.getLogger(__name__)
+
+# nome -> {"modelo", "segundos_carga", "memoria_mb", "parametros_mb", "carregado_em", "ultimo_uso", "usos"}
+_registro = {}
+_trava = threading.Lock()
+# uma trava por modelo: dois pedidos simultâneos do mesmo modelo esperam um único carregamento
+_travas_carga = {}
+_monitor = None
+_aquecido = False
+
+def _memoria_residente_mb() -> float:
+    """Memória residente do processo (Linux: /proc; nos demais, o pico informado pelo sistema)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return 0.0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+def _tamanho_pesos_mb(modelo) -> float:
+    """Pelo state_dict: as camadas quantizadas guardam os pesos int8 fora de `parameters()`."""
+    def tamanho(valor):
+        if isinstance(valor, (tuple, list)):
+            return sum(tamanho(v) for v in valor)
+        return valor.numel() * valor.element_size() if hasattr(valor, "element_size") else 0
+    return sum(tamanho(v) for v in modelo.state_dict().values()) / 1024 ** 2
+
+def _carregar(nome: str):
+    # import tardio: o app abre (e o lote roda com --sem-comentarios) sem carregar o torch
+    from sentence_transformers import SentenceTransformer
+    return configurar_modelo(SentenceTransformer(nome))
+
+def obter_modelo(nome: str = MODELO_EMBEDDINGS):
+    """Modelo carregado (e mantido) para todo o processo; a primeira chamada paga o carregamento."""
+    with _trava:
+        item = _registro.get(nome)
+        if item is None:
+            trava_carga = _travas_carga.setdefault(nome, threading.Lock())
+    if item is None:
+        with trava_carga:
+            item = _registro.get(nome)
+            if item is None:
+                memoria_antes = _memoria_residente_mb()
+                inicio = time.perf_counter()
+                modelo = _carregar(nome)
+                item = {
+                    "modelo": modelo,
+                    "segundos_carga": time.perf_counter() - inicio,
+                    "memoria_mb": max(_memoria_residente_mb() - memoria_antes, 0.0),
+                    "parametros_mb": _tamanho_pesos_mb(modelo),
+                    "carregado_em": time.time(),
+                    "ultimo_uso": time.time(),
+                    "usos": 0
+                }
+                with _trava:
+                    _registro[nome] = item
+                log.info("Modelo %s carregado em %.1fs (+%.0f MB)", nome, item["segundos_carga"], item["memoria_mb"])
+                _iniciar_monitor()
+    with _trava:
+        item["ultimo_uso"] = time.time()
+        item["usos"] += 1
+    return item["modelo"]
+
+def descarregar(nome: str = MODELO_EMBEDDINGS) -> bool:
+    """Libera o modelo; o próximo `obter_modelo` carrega de novo. Quem ainda tem a referência continua usando-a."""
+    with _trava:
+        item = _registro.pop(nome, None)
+    if item is None:
+        return False
+    del item
+    gc.collect()
+    log.info("Modelo %s descarregado", nome)
+    return True
+
+def descarregar_ociosos(minutos: float = OCIOSIDADE_MODELOS_MIN) -> list:
+    """Descarrega os modelos sem uso há mais de `minutos`. Devolve os nomes descarregados."""
+    limite = time.time() - minutos * 60
+    with _trava:
+        ociosos = [nome for nome, item in _registro.items() if item["ultimo_uso"] < limite]
+    return [nome for nome in ociosos if descarregar(nome)]
+
+def _vigiar_ociosidade():
+    intervalo = min(60.0, OCIOSIDADE_MODELOS_MIN * 60 / 4)
+    while True:
+        time.sleep(intervalo)
+        descarregar_ociosos()
+
+def _iniciar_monitor():
+    global _monitor
+    if OCIOSIDADE_MODELOS_MIN <= 0:
+        return
+    with _trava:
+        if _monitor is None:
+            _monitor = threading.Thread(target=_vigiar_ociosidade, name="ociosidade-modelos", daemon=True)
+            _monitor.start()
+
+def aquecer(nomes=None, em_segundo_plano: bool = True):
+    """Carrega os modelos e faz uma inferência curta (a primeira chamada ao encode também tem custo fixo)."""
+    def tarefa():
+        for nome in nomes or [MODELO_EMBEDDINGS]:
+            try:
+                obter_modelo(nome).encode(["aquecimento"], show_progress_bar=False)
+            except Exception as e:
+                log.warning("Aquecimento de %s falhou: %s", nome, e)
+    if em_segundo_plano:
+        threading.Thread(target=tarefa, name="aquecimento-modelos", daemon=True).start()
+    else:
+        tarefa()
+
+def aquecer_na_inicializacao():
+    """Chamado a cada execução do app, mas só aquece uma vez por processo e só se configurado."""
+    global _aquecido
+    with _trava:
+        if _aquecido or not AQUECER_MODELOS:
+            return
+        _aquecido = True
+    aquecer()
+
+def estatisticas() -> list:
+    """Um dicionário por modelo carregado: tempo de carga, memória, usos e minutos ocioso."""
+    agora = time.time()
+    with _trava:
+        return [
+            {
+                "modelo": nome,
+                "inferencia": INFERENCIA_EMBEDDINGS,
+                "segundos_carga": item["segundos_carga"],
+                "memoria_mb": item["memoria_mb"],
+                "parametros_mb": item["parametros_mb"],
+                "usos": item["usos"],
+                "minutos_ocioso": (agora - item["ultimo_uso"]) / 60
+            }
+            for nome, item in _registro.items()
+        ]
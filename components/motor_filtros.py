@@ -0,0 +1,113 @@
+# motor_filtros.py - bitmaps pré-calculados por valor de segmento e índice de linhas memoizado por estado de filtro
+
+import numpy as np
+import pandas as pd
+
+from components.cache_memoria import CacheLRU
+from components.catalogo import coluna_por_id
+
+_motores = CacheLRU(limite_bytes=256 * 1024 ** 2, max_itens=4, tamanho=lambda motor: motor["bytes"])
+# estados de filtro memoizados por dataset (cada entrada é só um vetor de posições)
+MAX_ESTADOS = 128
+
+def colunas_segmento(df: pd.DataFrame) -> list:
+    """Colunas usadas como filtro: BASE e o superior imediato."""
+    return ["BASE"] + [col for col in [coluna_por_id(df.columns, "SUPERIOR")] if col]
+
+def _categorias(serie: pd.Series):
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype("category")
+    return serie.cat.codes.to_numpy(), list(serie.cat.categories)
+
+def _bitmaps(codigos: np.ndarray, valores: list) -> dict:
+    """{valor: bits da coluna (np.packbits, 1 bit por linha)} para cada valor não vazio."""
+    return {valor: np.packbits(codigos == codigo) for codigo, valor in enumerate(valores)}
+
+def _cruzamento(codigos_base, n_bases, codigos, n_valores) -> np.ndarray:
+    """Matriz (bases x valores) com o número de linhas de cada combinação."""
+    validos = (codigos_base >= 0) & (codigos >= 0)
+    pares = codigos_base[validos].astype(np.int64) * n_valores + codigos[validos]
+    return np.bincount(pares, minlength=n_bases * n_valores).reshape(n_bases, n_valores)
+
+def construir_motor(df: pd.DataFrame, colunas=None) -> dict:
+    """Bitmaps de cada valor das colunas de segmento e o índice de segmentos (contagens por BASE).
+
+    O índice guarda, para cada coluna além da BASE, a matriz BASE x valor com o número de
+    respostas: as opções em cascata saem dela sem percorrer as linhas.
+    """
+    colunas = colunas or colunas_segmento(df)
+    categorias = {col: _categorias(df[col]) for col in colunas}
+    bitmaps = {col: _bitmaps(*categorias[col]) for col in colunas}
+
+    codigos_base, bases = categorias["BASE"]
+    segmentos = {"BASE": {"valores": bases, "contagens": np.bincount(codigos_base[codigos_base >= 0], minlength=len(bases))}}
+    for col in colunas:
+        if col == "BASE":
+            continue
+        codigos, valores = categorias[col]
+        segmentos[col] = {"valores": valores, "por_base": _cruzamento(codigos_base, len(bases), codigos, len(valores))}
+
+    return {
+        "linhas": len(df),
+        "bitmaps": bitmaps,
+        "segmentos": segmentos,
+        "estados": CacheLRU(limite_bytes=64 * 1024 ** 2, max_itens=MAX_ESTADOS),
+        "bytes": sum(b.nbytes for mapa in bitmaps.values() for b in mapa.values())
+    }
+
+def opcoes_base(motor: dict) -> dict:
+    """{BASE: número de respostas}."""
+    segmento = motor["segmentos"]["BASE"]
+    return {valor: int(n) for valor, n in zip(segmento["valores"], segmento["contagens"]) if n}
+
+def opcoes_cascata(motor: dict, coluna: str, bases) -> dict:
+    """{valor: número de respostas} da coluna dentro das bases escolhidas (custo independe do número de linhas)."""
+    segmento = motor["segmentos"][coluna]
+    escolhidas = set(bases)
+    posicoes = [i for i, base in enumerate(motor["segmentos"]["BASE"]["valores"]) if base in escolhidas]
+    contagens = segmento["por_base"][posicoes].sum(axis=0)
+    return {valor: int(n) for valor, n in zip(segmento["valores"], contagens) if n}
+
+def motor_filtros(df: pd.DataFrame, impressao: str) -> dict:
+    """Motor do dataset, construído uma vez e reaproveitado enquanto o conteúdo não muda."""
+    motor = _motores.obter(impressao)
+    if motor is None:
+        motor = construir_motor(df)
+        _motores.guardar(impressao, motor)
+    return motor
+
+def chave_estado(selecoes: dict) -> tuple:
+    """Forma canônica do estado: a ordem das colunas e dos valores escolhidos não importa."""
+    return tuple(sorted(
+        (col, tuple(sorted(str(v) for v in valores)))
+        for col, valores in selecoes.items()
+        if valores is not None
+    ))
+
+def linhas_filtradas(motor: dict, selecoes: dict) -> np.ndarray:
+    """Posições (ordenadas) das linhas que passam em todos os filtros.
+
+    `selecoes` é {coluna: valores escolhidos}; valores None desativam o filtro da coluna.
+    Dentro de uma coluna os valores são combinados com OU, entre colunas com E.
+    """
+    chave = chave_estado(selecoes)
+    linhas = motor["estados"].obter(chave)
+    if linhas is not None:
+        return linhas
+
+    total = motor["linhas"]
+    bits = np.full((total + 7) // 8, 0xFF, dtype=np.uint8)
+    for col, valores in selecoes.items():
+        if valores is None:
+            continue
+        mapa = motor["bitmaps"][col]
+        coluna = np.zeros_like(bits)
+        for valor in valores:
+            if valor in mapa:
+                np.bitwise_or(coluna, mapa[valor], out=coluna)
+        np.bitwise_and(bits, coluna, out=bits)
+
+    linhas = np.flatnonzero(np.unpackbits(bits, count=total)).astype(np.int32)
+    linhas.flags.writeable = False
+    motor["estados"].guardar(chave, linhas)
+    return linhas
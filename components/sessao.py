@@ -0,0 +1,40 @@
+# sessao.py - dataset ativo da sessão e abertura de datasets salvos
+
+import streamlit as st
+from components import armazenamento
+from components.artefatos import impressao_digital
+from components.cubo import cubo_dataset
+
+def definir_df_unificado(df, origem=None):
+    st.session_state.df_unificado = df
+    st.session_state.origem_df_unificado = origem
+    st.session_state.impressao_df_unificado = impressao_digital(df)
+    # o cubo de contagens do dashboard é montado já na ingestão (e reaproveitado pelo conteúdo)
+    cubo_dataset(df, st.session_state.impressao_df_unificado)
+
+def impressao_df_unificado() -> str:
+    """Impressão digital do dataset ativo, usada como chave dos caches derivados dele."""
+    if st.session_state.get("impressao_df_unificado") is None:
+        st.session_state.impressao_df_unificado = impressao_digital(st.session_state.df_unificado)
+    return st.session_state.impressao_df_unificado
+
+def abrir_dataset_salvo(chave: str) -> bool:
+    """Mostra o seletor de datasets salvos e carrega na sessão as bases escolhidas."""
+    nomes = armazenamento.listar_datasets()
+    if not nomes:
+        return False
+
+    nome = st.selectbox("Dataset salvo", nomes, key=f"{chave}_dataset")
+    bases = armazenamento.bases_dataset(nome)
+    selecionadas = st.multiselect(
+        "Bases a carregar",
+        list(bases),
+        default=list(bases),
+        format_func=lambda b: f"{b} ({bases[b]})",
+        key=f"{chave}_bases_{nome}"
+    )
+    if st.button("📂 Abrir dataset", key=f"{chave}_abrir"):
+        df = armazenamento.carregar_dataset(nome, bases=selecionadas)
+        definir_df_unificado(df, origem=nome)
+        st.rerun()
+    return True
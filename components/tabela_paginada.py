@@ -0,0 +1,65 @@
+# tabela_paginada.py - tabela de dados com paginação, escolha de colunas e ordenação no servidor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.cache_memoria import CacheLRU
+from components.catalogo import colunas_por_ids, ids_por_tipo
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+SEM_ORDENACAO = "(ordem original)"
+
+# ordenações já calculadas por (dataset, estado do filtro, coluna, sentido): trocar de página não reordena
+_ordens = CacheLRU(limite_bytes=128 * 1024 ** 2, max_itens=32)
+
+def ordenar_linhas(df: pd.DataFrame, linhas: np.ndarray, coluna: str, decrescente: bool = False) -> np.ndarray:
+    """Posições `linhas` na ordem da coluna (estável; vazios no fim). Só a coluna é lida, não o DataFrame."""
+    valores = df[coluna].take(linhas).reset_index(drop=True)
+    ordem = valores.sort_values(ascending=not decrescente, na_position="last", kind="stable").index.to_numpy()
+    return np.asarray(linhas)[ordem]
+
+def linhas_ordenadas(df: pd.DataFrame, linhas: np.ndarray, coluna=None, decrescente: bool = False, contexto=None) -> np.ndarray:
+    if coluna is None:
+        return linhas
+    if contexto is None:
+        return ordenar_linhas(df, linhas, coluna, decrescente)
+    chave = (*contexto, coluna, decrescente)
+    ordenadas = _ordens.obter(chave)
+    if ordenadas is None:
+        ordenadas = ordenar_linhas(df, linhas, coluna, decrescente)
+        _ordens.guardar(chave, ordenadas)
+    return ordenadas
+
+def pagina(df: pd.DataFrame, linhas: np.ndarray, numero: int, tamanho: int, colunas=None) -> pd.DataFrame:
+    """Só as linhas da página `numero` (a partir de 1) e só as `colunas` escolhidas."""
+    inicio = (numero - 1) * tamanho
+    # primeiro as linhas, depois as colunas: nenhuma coluna inteira é copiada
+    parte = df.take(linhas[inicio:inicio + tamanho])
+    return parte if colunas is None else parte[colunas]
+
+def colunas_padrao(df: pd.DataFrame) -> list:
+    """Todas as colunas menos as de texto livre, que são as mais pesadas de enviar."""
+    texto = set(colunas_por_ids(df.columns, ids_por_tipo("texto")))
+    return [col for col in df.columns if col not in texto]
+
+def tabela_paginada(df: pd.DataFrame, linhas: np.ndarray, contexto=None, altura: int = 500):
+    """Mostra as linhas filtradas página a página; o navegador recebe só a página e as colunas escolhidas.
+
+    `contexto` = (impressão do dataset, estado do filtro) permite reaproveitar a ordenação entre reruns.
+    """
+    colunas = st.multiselect("Colunas exibidas", list(df.columns), default=colunas_padrao(df), placeholder="Todas as colunas") or list(df.columns)
+
+    col_ordem, col_sentido, col_tamanho, col_pagina = st.columns([3, 1, 1, 1])
+    ordenar_por = col_ordem.selectbox("Ordenar por", [SEM_ORDENACAO] + colunas)
+    decrescente = col_sentido.toggle("Decrescente", value=False)
+    tamanho = col_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1)
+    total = len(linhas)
+    paginas = max(1, -(-total // tamanho))
+    # sem `key`: o widget recomeça na página 1 quando o número de páginas muda (novo filtro ou tamanho)
+    numero = int(col_pagina.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1, step=1))
+
+    ordenadas = linhas_ordenadas(df, linhas, None if ordenar_por == SEM_ORDENACAO else ordenar_por, decrescente, contexto)
+    st.dataframe(pagina(df, ordenadas, numero, tamanho, colunas), use_container_width=True, height=altura)
+    inicio = (numero - 1) * tamanho
+    st.caption(f"Linhas {min(inicio + 1, total)}–{min(inicio + tamanho, total)} de {total} · {len(colunas)} de {len(df.columns)} colunas")
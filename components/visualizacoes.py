@@ -1,138 +1,261 @@
 # visualizacoes.py atualizado para exibir dados em % e contagem
+# (os gráficos aceitam `dados` já agregados, por exemplo lidos do cubo, no lugar do groupby sobre as linhas,
+#  e `contexto` = (impressão do dataset, estado do filtro) para reaproveitar a figura entre reruns)
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
+from components.agregacoes import (
+    amostra_outliers as _amostra_outliers,
+    formatar_porcentagem as _formatar_porcentagem,
+    notas as _notas,
+    quartis_por_base as _quartis_por_base,
+    selecionar as _selecionar
+)
+from components.cache_figuras import chave_figura, figura
+from components.configuracao import LIMITE_PONTOS_GRAFICO, LIMITE_TEXTO_HOVER, MAX_OUTLIERS_POR_BASE
 
-def _formatar_porcentagem(df, group_cols, value_col=None):
-    """Função auxiliar para calcular porcentagens"""
-    if value_col:
-        total = df.groupby(group_cols)[value_col].sum().reset_index()
-        contagem = df.groupby(group_cols + [value_col]).size().reset_index(name='Contagem')
-        merged = pd.merge(contagem, total, on=group_cols, suffixes=('', '_total'))
-        merged['Porcentagem'] = (merged['Contagem'] / merged['Contagem_total']) * 100
-        return merged
-    else:
-        contagem = df.groupby(group_cols).size().reset_index(name='Contagem')
-        total = contagem['Contagem'].sum()
-        contagem['Porcentagem'] = (contagem['Contagem'] / total) * 100
-        return contagem
+def _mostrar(contexto, grafico: str, construir, porcentagem=None, coluna=None):
+    """Desenha a figura, montando-a só se ainda não estiver no cache para este contexto e opções."""
+    chave = None if contexto is None else chave_figura(contexto, grafico, porcentagem, coluna)
+    st.plotly_chart(figura(chave, construir), use_container_width=True)
+
+def _resumir(textos: pd.Series, limite: int = LIMITE_TEXTO_HOVER) -> pd.Series:
+    """Corta textos longos para o hover (o texto completo não vai para o navegador)."""
+    textos = textos.astype(str)
+    return textos.where(textos.str.len() <= limite, textos.str.slice(0, limite - 1) + "…")
 
 # Gráfico 1: Contagem/porcentagem de respostas por base
-def grafico_respostas_por_base(df: pd.DataFrame, porcentagem: bool = True):
-    dados = _formatar_porcentagem(df, ['BASE'])
-    
-    fig = px.bar(
-        dados,
-        x="BASE",
-        y="Porcentagem" if porcentagem else "Contagem",
-        title=f"Respostas por Base ({'%' if porcentagem else 'Contagem'})",
-        color="BASE",
-        text_auto='.1f' if porcentagem else True,
-        color_discrete_sequence=px.colors.qualitative.Vivid,
-        labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
-    )
-    
-    if porcentagem:
-        fig.update_yaxes(title_text="Porcentagem (%)", range=[0, 100])
-    else:
-        fig.update_yaxes(title_text="Número de Respostas")
-    
-    st.plotly_chart(fig, use_container_width=True)
+def grafico_respostas_por_base(df: pd.DataFrame, porcentagem: bool = True, linhas=None, dados=None, contexto=None):
+    def construir():
+        tabela = dados
+        if tabela is None:
+            tabela = _formatar_porcentagem(_selecionar(df, ['BASE'], linhas), ['BASE'])
+
+        fig = px.bar(
+            tabela,
+            x="BASE",
+            y="Porcentagem" if porcentagem else "Contagem",
+            title=f"Respostas por Base ({'%' if porcentagem else 'Contagem'})",
+            color="BASE",
+            text_auto='.1f' if porcentagem else True,
+            color_discrete_sequence=px.colors.qualitative.Vivid,
+            labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
+        )
+
+        if porcentagem:
+            fig.update_yaxes(title_text="Porcentagem (%)", range=[0, 100])
+        else:
+            fig.update_yaxes(title_text="Número de Respostas")
+        return fig
+
+    _mostrar(contexto, "respostas_por_base", construir, porcentagem)
 
 # Gráfico 2: Nota média geral por base (mantido original)
-def grafico_nota_media_por_base(df: pd.DataFrame, coluna_nota: str):
-    df[coluna_nota] = pd.to_numeric(df[coluna_nota], errors='coerce')
-    media = df.groupby("BASE")[coluna_nota].mean().reset_index()
-    media.columns = ["BASE", "Nota Média"]
-    
-    fig = px.line(
-        media,
-        x="BASE",
-        y="Nota Média",
-        title="Nota Média por Base",
-        markers=True,
-        text="Nota Média",
-        color_discrete_sequence=px.colors.qualitative.Bold
-    )
-    fig.update_traces(texttemplate='%{y:.2f}', textposition='top center')
-    st.plotly_chart(fig, use_container_width=True)
+def grafico_nota_media_por_base(df: pd.DataFrame, coluna_nota: str, linhas=None, dados=None, contexto=None):
+    def construir():
+        media = dados
+        if media is None:
+            media = _notas(df, coluna_nota, linhas).groupby("BASE")[coluna_nota].mean().reset_index()
+            media.columns = ["BASE", "Nota Média"]
+
+        fig = px.line(
+            media,
+            x="BASE",
+            y="Nota Média",
+            title="Nota Média por Base",
+            markers=True,
+            text="Nota Média",
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        fig.update_traces(texttemplate='%{y:.2f}', textposition='top center')
+        return fig
+
+    _mostrar(contexto, "nota_media_por_base", construir, coluna=coluna_nota)
 
 # Gráfico 3: Distribuição por questão de uma categoria específica
-def grafico_distribuicao_por_questao(df: pd.DataFrame, coluna: str, porcentagem: bool = True):
-    dados = _formatar_porcentagem(df, ['BASE', coluna])
-    
-    fig = px.bar(
-        dados,
-        x="BASE",
-        y="Porcentagem" if porcentagem else "Contagem",
-        color=coluna,
-        barmode="group",
-        title=f"Distribuição das Respostas - {coluna} ({'%' if porcentagem else 'Contagem'})",
-        text_auto='.1f' if porcentagem else True,
-        color_discrete_sequence=px.colors.qualitative.Set2,
-        labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
-    )
-    
-    if porcentagem:
-        fig.update_yaxes(title_text="Porcentagem (%)", range=[0, 100])
-    else:
-        fig.update_yaxes(title_text="Número de Respostas")
-    
-    st.plotly_chart(fig, use_container_width=True)
+def grafico_distribuicao_por_questao(df: pd.DataFrame, coluna: str, porcentagem: bool = True, linhas=None, dados=None, contexto=None):
+    def construir():
+        tabela = dados
+        if tabela is None:
+            tabela = _formatar_porcentagem(_selecionar(df, ['BASE', coluna], linhas), ['BASE', coluna])
+
+        fig = px.bar(
+            tabela,
+            x="BASE",
+            y="Porcentagem" if porcentagem else "Contagem",
+            color=coluna,
+            barmode="group",
+            title=f"Distribuição das Respostas - {coluna} ({'%' if porcentagem else 'Contagem'})",
+            text_auto='.1f' if porcentagem else True,
+            color_discrete_sequence=px.colors.qualitative.Set2,
+            labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
+        )
+
+        if porcentagem:
+            fig.update_yaxes(title_text="Porcentagem (%)", range=[0, 100])
+        else:
+            fig.update_yaxes(title_text="Número de Respostas")
+        return fig
+
+    _mostrar(contexto, "distribuicao_por_questao", construir, porcentagem, coluna)
 
 # Gráfico 4: Comparação das notas por base (Boxplot)
-def grafico_boxplot_notas(df: pd.DataFrame, coluna_nota: str):
-    df[coluna_nota] = pd.to_numeric(df[coluna_nota], errors='coerce')
-    
-    fig = px.box(
-        df,
-        x="BASE",
-        y=coluna_nota,
-        title="Distribuição de Notas por Base",
-        color="BASE",
-        points="all",
-        color_discrete_sequence=px.colors.qualitative.Prism,
-        hover_data=["BASE", coluna_nota]
-    )
+def grafico_boxplot_notas(df: pd.DataFrame, coluna_nota: str, linhas=None, contexto=None):
+    def construir():
+        dados = _notas(df, coluna_nota, linhas)
+        if len(dados) > LIMITE_PONTOS_GRAFICO:
+            return _boxplot_quartis(dados, coluna_nota)
+
+        fig = px.box(
+            dados,
+            x="BASE",
+            y=coluna_nota,
+            title="Distribuição de Notas por Base",
+            color="BASE",
+            points="all",
+            color_discrete_sequence=px.colors.qualitative.Prism,
+            hover_data=["BASE", coluna_nota]
+        )
+        fig.update_yaxes(title_text="Nota (0-10)", range=[0, 10])
+        return fig
+
+    _mostrar(contexto, "boxplot_notas", construir, coluna=coluna_nota)
+
+def _boxplot_quartis(dados: pd.DataFrame, coluna_nota: str):
+    """Boxplot de grandes volumes: só os quartis (calculados aqui) e uma amostra dos outliers vão para o navegador."""
+    quartis = _quartis_por_base(dados, coluna_nota)
+    outliers = _amostra_outliers(dados, coluna_nota, quartis, MAX_OUTLIERS_POR_BASE)
+    cores = px.colors.qualitative.Prism
+    fig = go.Figure()
+    for i, q in enumerate(quartis.itertuples(index=False)):
+        cor = cores[i % len(cores)]
+        fig.add_trace(go.Box(
+            name=q.BASE, x=[q.BASE], q1=[q.q1], median=[q.mediana], q3=[q.q3],
+            lowerfence=[q.cerca_inferior], upperfence=[q.cerca_superior],
+            marker_color=cor, boxpoints=False, hovertext=f"{q.n} respostas"
+        ))
+        pontos = outliers[outliers["BASE"] == q.BASE]
+        fig.add_trace(go.Scatter(
+            x=pontos["BASE"], y=pontos[coluna_nota], mode="markers", marker={"color": cor, "size": 4},
+            name=q.BASE, showlegend=False, hovertemplate="%{x}: %{y}<extra>outlier</extra>"
+        ))
+    fig.update_layout(title=f"Distribuição de Notas por Base (quartis; até {MAX_OUTLIERS_POR_BASE} outliers por base)")
     fig.update_yaxes(title_text="Nota (0-10)", range=[0, 10])
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 # Gráfico 5: Pizza com proporção de respostas por base
-def grafico_pizza_respostas(df: pd.DataFrame, porcentagem: bool = True):
-    dados = _formatar_porcentagem(df, ['BASE'])
-    
-    fig = px.pie(
-        dados,
-        names="BASE",
-        values="Porcentagem" if porcentagem else "Contagem",
-        title=f"Proporção de Respostas por Base ({'%' if porcentagem else 'Contagem'})",
-        hole=0.3,
-        color_discrete_sequence=px.colors.qualitative.Dark2,
-        labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
-    )
-    fig.update_traces(textinfo='percent+label' if porcentagem else 'value+label')
-    st.plotly_chart(fig, use_container_width=True)
+def grafico_pizza_respostas(df: pd.DataFrame, porcentagem: bool = True, linhas=None, dados=None, contexto=None):
+    def construir():
+        tabela = dados
+        if tabela is None:
+            tabela = _formatar_porcentagem(_selecionar(df, ['BASE'], linhas), ['BASE'])
+
+        fig = px.pie(
+            tabela,
+            names="BASE",
+            values="Porcentagem" if porcentagem else "Contagem",
+            title=f"Proporção de Respostas por Base ({'%' if porcentagem else 'Contagem'})",
+            hole=0.3,
+            color_discrete_sequence=px.colors.qualitative.Dark2,
+            labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
+        )
+        fig.update_traces(textinfo='percent+label' if porcentagem else 'value+label')
+        return fig
+
+    _mostrar(contexto, "pizza_respostas", construir, porcentagem)
 
 # Gráfico 6: Barras agrupadas por alternativa de uma pergunta específica
-def grafico_respostas_por_fator(df: pd.DataFrame, coluna: str, porcentagem: bool = True):
-    dados = _formatar_porcentagem(df, ['BASE', coluna])
-    
-    fig = px.bar(
+def grafico_respostas_por_fator(df: pd.DataFrame, coluna: str, porcentagem: bool = True, linhas=None, dados=None, contexto=None):
+    def construir():
+        tabela = dados
+        if tabela is None:
+            tabela = _formatar_porcentagem(_selecionar(df, ['BASE', coluna], linhas), ['BASE', coluna])
+
+        fig = px.bar(
+            tabela,
+            x="BASE",
+            y="Porcentagem" if porcentagem else "Contagem",
+            color=coluna,
+            barmode="group",
+            title=f"Distribuição das Respostas para '{coluna}' por Base ({'%' if porcentagem else 'Contagem'})",
+            text_auto='.1f' if porcentagem else True,
+            color_discrete_sequence=px.colors.qualitative.Set3,
+            labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
+        )
+
+        if porcentagem:
+            fig.update_yaxes(title_text="Porcentagem (%)", range=[0, 100])
+        else:
+            fig.update_yaxes(title_text="Número de Respostas")
+        return fig
+
+    _mostrar(contexto, "respostas_por_fator", construir, porcentagem, coluna)
+
+# Gráfico 7: Mapa de calor da favorabilidade (pergunta x base) em uma única figura
+def grafico_mapa_calor_favorabilidade(dados: pd.DataFrame, max_caracteres: int = 60, contexto=None):
+    """`dados` no formato de `favorabilidade_por_questao`: uma figura leve no lugar de um gráfico por pergunta."""
+    if dados.empty:
+        st.info("Nenhuma resposta nas perguntas de escala para o filtro atual.")
+        return
+
+    def construir():
+        perguntas = dados.drop_duplicates("ID")
+        rotulos = [
+            f"{dim} · {texto if len(texto) <= max_caracteres else texto[:max_caracteres - 1] + '…'}"
+            for dim, texto in zip(perguntas["Dimensão"], perguntas["Pergunta"].str.strip())
+        ]
+        bases = list(dict.fromkeys(dados["BASE"]))
+        matriz = dados.pivot(index="ID", columns="BASE", values="Favorabilidade (%)").reindex(index=perguntas["ID"], columns=bases)
+        respostas = dados.pivot(index="ID", columns="BASE", values="Respostas").reindex(index=perguntas["ID"], columns=bases)
+
+        fig = px.imshow(
+            matriz.to_numpy(),
+            x=bases,
+            y=rotulos,
+            zmin=0,
+            zmax=100,
+            text_auto='.0f',
+            aspect="auto",
+            color_continuous_scale="RdYlGn",
+            labels={"color": "Favorabilidade (%)"},
+            title="Favorabilidade por Pergunta e Base (%)"
+        )
+        # texto completo da pergunta e número de respostas só no hover
+        textos = np.repeat(perguntas["Pergunta"].to_numpy()[:, None], len(bases), axis=1)
+        fig.update_traces(
+            customdata=np.dstack([textos, respostas.to_numpy(dtype=object)]),
+            hovertemplate="%{x}<br>%{customdata[0]}<br>Favorabilidade: %{z:.1f}%<br>Respostas: %{customdata[1]}<extra></extra>"
+        )
+        fig.update_layout(height=160 + 24 * len(rotulos))
+        return fig
+
+    # as perguntas presentes (dimensão escolhida) distinguem as figuras do mesmo contexto
+    _mostrar(contexto, "mapa_calor_favorabilidade", construir, coluna=tuple(dados["ID"].unique()))
+
+# Gráfico 8: Mapa semântico dos comentários (WebGL acima de LIMITE_PONTOS_GRAFICO pontos)
+def grafico_mapa_semantico(df_sent: pd.DataFrame):
+    """Hover com o comentário resumido e o número do ponto; o texto completo é buscado pelo número."""
+    dados = pd.DataFrame({
+        # 4 casas bastam para a posição na tela e encurtam o JSON
+        "x": df_sent["x"].to_numpy().round(4),
+        "y": df_sent["y"].to_numpy().round(4),
+        "Grupo": df_sent["Cluster"].astype(str).to_numpy(),
+        "Nº": np.arange(len(df_sent)),
+        "Comentário": _resumir(df_sent["comentario"]).to_numpy(),
+        "Sentimento": df_sent["Sentimento"].to_numpy()
+    })
+    fig = px.scatter(
         dados,
-        x="BASE",
-        y="Porcentagem" if porcentagem else "Contagem",
-        color=coluna,
-        barmode="group",
-        title=f"Distribuição das Respostas para '{coluna}' por Base ({'%' if porcentagem else 'Contagem'})",
-        text_auto='.1f' if porcentagem else True,
-        color_discrete_sequence=px.colors.qualitative.Set3,
-        labels={'Porcentagem': 'Porcentagem (%)', 'Contagem': 'Número de Respostas'}
+        x="x",
+        y="y",
+        color="Grupo",
+        hover_data={"x": False, "y": False, "Nº": True, "Comentário": True, "Sentimento": True},
+        render_mode="webgl" if len(dados) > LIMITE_PONTOS_GRAFICO else "svg",
+        title="<b>Mapa Semântico dos Comentários</b><br>Pontos próximos = Temas similares",
+        width=1000,
+        height=600
     )
-    
-    if porcentagem:
-        fig.update_yaxes(title_text="Porcentagem (%)", range=[0, 100])
-    else:
-        fig.update_yaxes(title_text="Número de Respostas")
-    
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import datetime
 from modulos import uploader, dashboard, comentarios
+from components.modelos import aquecer_na_inicializacao
 
 st.set_page_config(
     page_title="MB Consultoria - Clima Organizacional",
@@ -9,6 +10,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# carrega o modelo de embeddings em segundo plano uma vez por processo (CLIMA_AQUECER_MODELOS=1)
+aquecer_na_inicializacao()
+
 # 🔒 [Seção Ocultada do Front-End]
 # Esta parte do código permite comparar resultados por questão específica.
 # Está comentada temporariamente — pode ser reativada se necessário no futuro.
@@ -1,106 +1,17 @@
 import streamlit as st
-import pandas as pd
-import unicodedata
-import re
-from collections import Counter
-from io import BytesIO
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import DBSCAN
-import umap.umap_ as umap
 import plotly.express as px
-from textblob import TextBlob
-import numpy as np
-from wordcloud import WordCloud, STOPWORDS
-import matplotlib.pyplot as plt
-from typing import List, Tuple, Dict
-
-# Stopwords em português ampliadas
-STOPWORDS_PT = set(STOPWORDS).union({
-    'que', 'com', 'para', 'não', 'mais', 'muito', 'mesmo', 'assim',
-    'também', 'como', 'ainda', 'cada', 'ser', 'foi', 'isso', 'essa',
-    'está', 'estao', 'estavam', 'já', 'a', 'e', 'i', 'o', 'u',
-    'da', 'de', 'di', 'do', 'du', 'é', 'tem', 'pois', 'em', 'seu', 'sua', 'seus', 'suas',
-    'empresa', 'setor', 'trabalho', 'colaborador', 'colaboradores',
-    'gestor', 'gestora', 'área', 'pessoas', 'atividade', 'atividades',
-    'bom', 'boa', 'sim', 'não', 'pode', 'poderia', 'há', 'tudo', 'nada',
-    'todo', 'toda', 'todos', 'todas', 'mesma', 'mesmo', 'além', 'quando',
-    'onde', 'qual', 'quais', 'porque', 'pra', 'fazer', 'feito', 'faz', 'fez'
-})
-
-@st.cache_data(show_spinner=False)
-def ler_excel_seguro(uploaded_file):
-    try:
-        return pd.read_excel(uploaded_file, sheet_name=0, engine="openpyxl")
-    except Exception as e:
-        st.error(f"Erro ao ler o arquivo {uploaded_file.name}:")
-        st.exception(e)
-        return None
-
-def normalizar(texto):
-    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8')
-    return texto.lower().strip()
-
-def detectar_coluna_comentarios(df):
-    keywords = ["coment"]
-    comentarios_colunas = []
-    for col in df.columns:
-        nome_normalizado = normalizar(col)
-        if any(keyword in nome_normalizado for keyword in keywords):
-            comentarios_colunas.append(col)
-    return comentarios_colunas
-
-def analisar_sentimento(texto):
-    blob = TextBlob(texto)
-    polaridade = blob.sentiment.polarity
-    if polaridade > 0.2:
-        return ("Positivo", polaridade)
-    elif polaridade < -0.2:
-        return ("Negativo", polaridade)
-    else:
-        return ("Neutro", polaridade)
-
-def extrair_palavras_chave(textos: List[str], n_words=10) -> Dict[str, List[Tuple[str, int]]]:
-    palavras_chave = {}
-    for texto in textos:
-        palavras = re.findall(r'\b\w{4,}\b', texto.lower())
-        palavras_filtradas = [p for p in palavras if p not in STOPWORDS_PT]
-        contador = Counter(palavras_filtradas)
-        palavras_chave[texto] = contador.most_common(n_words)
-    return palavras_chave
-
-def clusterizar_comentarios(lista_textos):
-    modelo = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
-    embeddings = modelo.encode(lista_textos, show_progress_bar=True)
-    clusterizador = DBSCAN(eps=0.35, min_samples=3, metric='cosine', n_jobs=-1)
-    labels = clusterizador.fit_predict(embeddings)
-    reducer = umap.UMAP(n_neighbors=15, min_dist=0.1, metric='cosine', random_state=42)
-    reduzido = reducer.fit_transform(embeddings)
-    return labels, reduzido, embeddings
-
-def gerar_wordcloud(textos):
-    texto_completo = ' '.join(textos)
-    wordcloud = WordCloud(
-        width=800,
-        height=400,
-        background_color='white',
-        stopwords=STOPWORDS_PT,
-        max_words=50,
-        collocations=False
-    ).generate(texto_completo)
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation='bilinear')
-    ax.axis('off')
-    return fig
-
-def analisar_topicos_por_cluster(df):
-    topicos = {}
-    for cluster in df['Cluster'].unique():
-        textos_cluster = df[df['Cluster'] == cluster]['comentario']
-        palavras = ' '.join(textos_cluster).split()
-        palavras_filtradas = [p for p in palavras if len(p) > 3 and p not in STOPWORDS_PT]
-        contador = Counter(palavras_filtradas)
-        topicos[cluster] = contador.most_common(5)
-    return topicos
+from components.ingestao import ler_planilhas, unificar
+from components.armazenamento import listar_datasets, bases_dataset, colunas_dataset, carregar_dataset
+from components.sessao import definir_df_unificado
+from components.artefatos import chave_artefato, gerar_artefato, impressao_digital, obter_artefato
+from components.cache_embeddings import listar_lojas, loja as loja_embeddings, remover_versoes_antigas
+from components.codificacao import versao_embeddings
+from components.modelos import estatisticas as estatisticas_modelos
+from components.visualizacoes import grafico_mapa_semantico
+from components.analise_comentarios import (
+    detectar_coluna_comentarios, analisar_sentimentos, agrupar_comentarios, gerar_wordcloud, gerar_relatorio_markdown,
+    grupos_em_bytes, identidade_agrupamento, restaurar_grupos
+)
 
 def show():
     st.title("📊 Análise de Comentários com IA Semântica")
@@ -113,49 +24,66 @@ def show():
     </style>
     """, unsafe_allow_html=True)
 
+    dataset_sel = None
     with st.expander("📤 Carregar Dados", expanded=True):
         if st.session_state.get("df_unificado") is None:
-            uploaded_files = st.file_uploader("Selecione os arquivos Excel", type=["xlsx"], accept_multiple_files=True)
-            if uploaded_files:
-                dfs = []
-                for uploaded_file in uploaded_files:
-                    df_temp = ler_excel_seguro(uploaded_file)
-                    if df_temp is None:
-                        continue
-                    match = re.search(r'PESQUISA DE CLIMA (.*?)\s*-\s*2025', uploaded_file.name)
-                    base = match.group(1).strip() if match else "Desconhecido"
-                    df_temp["BASE"] = base
-                    dfs.append(df_temp)
-                if dfs:
-                    df = pd.concat(dfs, ignore_index=True).drop_duplicates()
-                    st.session_state.df_unificado = df
+            datasets = listar_datasets()
+            origem = st.radio("Origem dos dados:", ["Arquivos Excel", "Dataset salvo"], horizontal=True, key='origem_select') if datasets else "Arquivos Excel"
+            if origem == "Dataset salvo":
+                dataset_sel = st.selectbox("Dataset:", datasets, key='dataset_select')
+            else:
+                uploaded_files = st.file_uploader("Selecione os arquivos Excel", type=["xlsx"], accept_multiple_files=True)
+                if uploaded_files:
+                    dfs = []
+                    resultados = ler_planilhas([(f.name, f.getvalue()) for f in uploaded_files])
+                    for resultado in resultados:
+                        if resultado["erro"]:
+                            st.error(f"Erro ao ler o arquivo {resultado['arquivo']}: {resultado['erro']}")
+                            continue
+                        dfs.append(resultado["df"])
+                    if dfs:
+                        df = unificar(dfs)
+                        definir_df_unificado(df)
+                    else:
+                        st.warning("Nenhum dado carregado corretamente.")
+                        return
                 else:
-                    st.warning("Nenhum dado carregado corretamente.")
+                    st.info("Por favor, carregue arquivos na seção Upload ou aqui mesmo.")
                     return
-            else:
-                st.info("Por favor, carregue arquivos na seção Upload ou aqui mesmo.")
-                return
         else:
             df = st.session_state.df_unificado.copy()
 
+    # com dataset salvo, bases e colunas vêm dos metadados; os dados são lidos só depois da seleção
+    if dataset_sel:
+        bases = list(bases_dataset(dataset_sel))
+        colunas = colunas_dataset(dataset_sel)
+    else:
+        bases = df["BASE"].unique()
+        colunas = df.columns
+
     col1, col2 = st.columns(2)
     with col1:
-        base_sel = st.selectbox("Selecione a base:", df["BASE"].unique(), key='base_select')
+        base_sel = st.selectbox("Selecione a base:", bases, key='base_select')
     with col2:
-        col_comentarios = detectar_coluna_comentarios(df)
+        col_comentarios = detectar_coluna_comentarios(colunas)
         coluna_sel = st.selectbox("Coluna de Comentário:", col_comentarios if col_comentarios else [None], key='coluna_select')
 
     if not coluna_sel:
         st.warning("Nenhuma coluna de comentários foi detectada.")
         return
 
-    comentarios = df[df["BASE"] == base_sel][coluna_sel].dropna().astype(str)
+    if dataset_sel:
+        comentarios = carregar_dataset(dataset_sel, bases=[base_sel], colunas=[coluna_sel])[coluna_sel].dropna().astype(str)
+    else:
+        comentarios = df[df["BASE"] == base_sel][coluna_sel].dropna().astype(str)
     if comentarios.empty:
         st.info("Nenhum comentário preenchido nesta base.")
         return
 
-    df_sent = pd.DataFrame({"comentario": comentarios})
-    df_sent[["Sentimento", "Pontuacao"]] = df_sent["comentario"].apply(lambda x: pd.Series(analisar_sentimento(x)))
+    df_sent = analisar_sentimentos(comentarios)
+    # grupos e mapa dependem dos comentários e do modelo, da inferência e do algoritmo configurados:
+    # guardados em disco, não são recalculados a cada rerun nem depois de reiniciar o servidor
+    chave_grupos = chave_artefato("agrupamento_comentarios", impressao_digital(comentarios), **identidade_agrupamento())
 
     tab1, tab2, tab3 = st.tabs(["📈 Visão Geral", "🧩 Análise por Grupo", "📤 Exportar Relatório"])
 
@@ -175,16 +103,33 @@ def show():
 
     with tab2:
         st.subheader("🧠 Análise Semântica Avançada")
-        with st.spinner("Processando agrupamentos semânticos e tópicos..."):
-            labels, coords, embeddings = clusterizar_comentarios(df_sent["comentario"].tolist())
-            df_sent["Cluster"] = labels
-            df_sent["x"] = coords[:, 0]
-            df_sent["y"] = coords[:, 1]
-            topicos_por_cluster = analisar_topicos_por_cluster(df_sent)
-        st.plotly_chart(px.scatter(df_sent, x="x", y="y", color=df_sent["Cluster"].astype(str),
-                                   hover_data=["comentario", "Sentimento"],
-                                   title="<b>Mapa Semântico dos Comentários</b><br>Pontos próximos = Temas similares",
-                                   width=1000, height=600), use_container_width=True)
+        grupos = obter_artefato(chave_grupos)
+        if grupos is not None:
+            df_sent, topicos_por_cluster = restaurar_grupos(df_sent, grupos)
+        else:
+            with st.spinner("Processando agrupamentos semânticos e tópicos..."):
+                barra = st.progress(0.0)
+                # só os comentários ainda fora do cache de embeddings passam pela barra
+                progresso = lambda feitos, total: barra.progress(feitos / total, text=f"Codificando comentários novos: {feitos}/{total}")
+                df_sent, topicos_por_cluster = agrupar_comentarios(df_sent, progresso=progresso)
+                barra.empty()
+            gerar_artefato(chave_grupos, lambda: grupos_em_bytes(df_sent))
+        for modelo in estatisticas_modelos():
+            st.caption(f"🧠 Modelo {modelo['modelo']} ({modelo['inferencia']}): carregado em {modelo['segundos_carga']:.1f}s, "
+                       f"{modelo['parametros_mb']:.0f} MB de pesos (+{modelo['memoria_mb']:.0f} MB no processo), {modelo['usos']} usos")
+        with st.expander("⚙️ Cache de embeddings"):
+            uso = loja_embeddings(versao=versao_embeddings()).estatisticas()
+            st.caption(f"{uso['vetores']} comentários guardados ({uso['tamanho_mb']:.1f} MB, versão {uso['versao']}); "
+                       f"desde o início do servidor: {uso['acertos']} reaproveitados, {uso['faltas']} codificados")
+            st.dataframe(listar_lojas(), use_container_width=True, hide_index=True)
+            col_compactar, col_versoes = st.columns(2)
+            if col_compactar.button("🗜️ Compactar"):
+                st.info(f"{loja_embeddings(versao=versao_embeddings()).compactar()} vetores em um único segmento.")
+            if col_versoes.button("🗑️ Remover versões antigas"):
+                st.info(f"{remover_versoes_antigas(manter=versao_embeddings())} versão(ões) removida(s).")
+        grafico_mapa_semantico(df_sent)
+        numero = st.number_input("Ver comentário completo (Nº do ponto no mapa)", min_value=0, max_value=len(df_sent) - 1, value=0, step=1)
+        st.markdown(f"> {df_sent['comentario'].iloc[int(numero)]}")
         for cluster_id in sorted(df_sent["Cluster"].unique()):
             cluster_data = df_sent[df_sent["Cluster"] == cluster_id]
             nome_cluster = "Comentários Únicos" if cluster_id == -1 else f"Grupo {cluster_id}"
@@ -212,33 +157,8 @@ def show():
 
     with tab3:
         st.subheader("📤 Exportar Relatório Completo")
-        report = f"""
-        # Relatório de Análise de Comentários - {base_sel}
-        ## Dados Gerais
-        - Total de comentários analisados: {len(df_sent)}
-        - Período de referência: 2025
-        - Tema analisado: {coluna_sel}
-        
-        ## Distribuição de Sentimentos
-        - Positivos: {len(df_sent[df_sent['Sentimento'] == 'Positivo'])} ({len(df_sent[df_sent['Sentimento'] == 'Positivo'])/len(df_sent):.1%})
-        - Neutros: {len(df_sent[df_sent['Sentimento'] == 'Neutro'])} ({len(df_sent[df_sent['Sentimento'] == 'Neutro'])/len(df_sent):.1%})
-        - Negativos: {len(df_sent[df_sent['Sentimento'] == 'Negativo'])} ({len(df_sent[df_sent['Sentimento'] == 'Negativo'])/len(df_sent):.1%})
-        
-        ## Principais Insights
-        """
-        for cluster_id in sorted(df_sent["Cluster"].unique()):
-            cluster_data = df_sent[df_sent["Cluster"] == cluster_id]
-            nome_cluster = "Comentários Únicos" if cluster_id == -1 else f"Grupo {cluster_id}"
-            report += f"""
-            ### {nome_cluster} ({len(cluster_data)} comentários)
-            **Tópicos principais:** {', '.join([t[0] for t in topicos_por_cluster.get(cluster_id, [])])}
-            **Sentimento predominante:** {cluster_data["Sentimento"].mode()[0]}
-            
-            **Exemplos representativos:**
-            """
-            for linha in cluster_data["comentario"].head(3):
-                report += f"- {linha}\n"
-            report += "\n"
+        chave_relatorio = chave_artefato("relatorio_comentarios", chave_grupos, base=str(base_sel), coluna=coluna_sel)
+        report = gerar_artefato(chave_relatorio, lambda: gerar_relatorio_markdown(df_sent, topicos_por_cluster, base_sel, coluna_sel))
         st.download_button(
             label="📥 Baixar Relatório Completo",
             data=report,
@@ -1,110 +1,129 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from components.filtros import aplicar_filtros_topbar
+from components.filtros import filtros_topbar
+from components.cubo import construir_cubo, cubo_dataset, contagens_por_base, contagens_pergunta, media_por_base
+from components.indicadores import METRICAS_DIMENSAO, NIVEIS, calcular_indicadores, favorabilidade_por_questao, quadro_indicadores
+from components.sessao import abrir_dataset_salvo, impressao_df_unificado
+from components.tabela_paginada import tabela_paginada
+from components.catalogo import dimensoes, coluna_por_id, colunas_por_ids, ids_da_dimensao
 from components.visualizacoes import (
     grafico_respostas_por_base,
     grafico_nota_media_por_base,
     grafico_distribuicao_por_questao,
     grafico_boxplot_notas,
     grafico_pizza_respostas,
-    grafico_respostas_por_fator
+    grafico_respostas_por_fator,
+    grafico_mapa_calor_favorabilidade
 )
 
-dimensoes = {
-    "Colaboração": [
-        "a) Existe o estímulo a colaboração em nossa empresa?",
-        "b) Há cooperação entre as pessoas do meu setor?",
-        "c)  A colaboração resulta no alcance das nossas metas/objetivos?",
-        "d)  A colaboração tem favorecido um clima de trabalho positivo no meu setor?",
-        "e) Sinto-me à vontade para pedir ajuda nas minhas atividades, sempre que preciso?"
-    ],
-    "Comunicação": [
-        "a) Os canais de comunicação interna contribuem para nos manter informados. (workplace, aplicativo do Colaborador, murais, email etc)?",
-        "b) As informações fluem bem entre as áreas da organização?",
-        "c) A comunicação na empresa, reflete confiança e respeito?",
-        "d) Costumo receber respostas (feedback) sempre que preciso?",
-        "e) Sou bem informado sobre as metas e resultados da minha área. (reuniões/divulgações do Mapa Estratégico - BSC)?"
-    ],
-    "Informações Essenciais": [
-        "a)  Recebo informações suficientes sobre os Valores e Princípios Organizacionais (integridade, respeito, econonia, energia  e melhoria contínua)?",
-        "b) Percebo ações, na prática, voltadas ao atendimento normativo e de segurança na empresa?",
-        "c) Recebo informações e direcionamentos suficientes  para a realização das minhas atividades?",
-        "d) A empresa incentiva a aprendizagem e inovação ?",
-        "e. A empresa possui um Código de Ética claro e amplamente divulgado?"
-    ],
-    "Liderança": [
-        "a) Tenho abertura para comunicar-me com meu gestor(a)?",
-        "b) Meu gestor(a) me possibilita assumir desafios e responsabilidades?",
-        "c) Meu gestor (a) estimula a colaboração e o trabalho em equipe?",
-        "d) Meu gestor(a) promove um ambiente de trabalho agradável e respeitoso?",
-        "e) Considero adequado o estilo de liderança do meu gestor (a)"
-    ],
-    "Motivação": [
-        "a) As ferramentas disponíveis contribuem para o meu desenvolvimento profissional (Internet / Ensino a distância,GUPY,  por exemplo)?",
-        "b)  Meu trabalho permite equilibrar vida pessoal e profissional?",
-        "c)  A minha remuneração e benefícios são justos em relação às minhas atividades/mercado de trabalho?",
-        "d) Sinto-me estimulado a dar o meu melhor no ambiente de trabalho?",
-        "e.  As refeições oferecidas na empresa são satisfatórias?"
-    ],
-    "Organização": [
-        "a) A empresa possui uma boa direção e gestão estratégica?",
-        "b)  A empresa tem uma cultura forte e positiva?",
-        "c)  A imagem e a marca da empresa são bem conceituadas?",
-        "d)  Percebo que a organização se preocupa com o bem estar dos colaboradores?",
-        "e) Compreendo como o meu trabalho contribui para a realização da estratégia da empresa?"
-    ],
-    "Trabalho": [
-        "a)  As condições físicas de trabalho no meu setor  são adequadas?",
-        "b)   Recebo treinamentos e instruções suficientes, para a realização do meu trabalho?",
-        "c)  Eu tenho acesso aos materiais, Epis e/ou equipamentos necessários para fazer bem o meu trabalho?",
-        "d) Sinto que posso contribuir com ideias e soluções no meu trabalho?",
-        "e) Sei o que é esperado do meu trabalho?"
-    ],
-    "Felicidade": [
-        "a) Sinto que sou valorizado e reconhecido no meu ambiente de trabalho?",
-        "b) Sinto orgulho de trabalhar nesta empresa?",
-        "c) Sinto que o meu trabalho é estimulante e gratificante?",
-        "d) Que sugestões você daria para tornar nossa empresa um lugar ainda melhor para se trabalhar?",
-        "e)   De um modo geral qual a nota (0 a 10) atribuiria a sua experiência na empresa?"
-    ]
-}
+
+def _secao(titulo: str, chave: str, aberta: bool = False) -> bool:
+    """Cabeçalho de uma seção: o conteúdo só é calculado (e enviado) enquanto a seção está aberta."""
+    return st.toggle(titulo, value=aberta, key=f"secao_{chave}")
+
+
+def _cubo_recorte(recorte: dict):
+    """Cubo e seleções dos indicadores. Com busca de texto o recorte não é um conjunto de segmentos,
+    então sai de um cubo só das linhas encontradas."""
+    if recorte["cubo"]:
+        return recorte["cubo"], recorte["selecoes"]
+    return construir_cubo(recorte["df"].iloc[recorte["linhas"]]), {}
+
+
+def _secao_dados(recorte: dict):
+    if not _secao("📊 Dados Filtrados", "dados", aberta=True):
+        return
+    with st.container(border=True):
+        tabela_paginada(recorte["df"], recorte["linhas"], recorte["contexto"])
+
+
+def _secao_dimensoes(recorte: dict):
+    if not _secao("🔹 Análise por Categoria (Dimensão)", "dimensoes", aberta=True):
+        return
+    df, linhas, cubo, selecoes, contexto = (recorte[k] for k in ("df", "linhas", "cubo", "selecoes", "contexto"))
+    with st.container(border=True):
+        selected_dimensao = st.selectbox("Categoria de Análise", ["Todas"] + list(dimensoes.keys()))
+        modo = st.radio("Visualização", ["Mapa de calor", "Gráfico por pergunta"], horizontal=True)
+        if modo == "Mapa de calor":
+            # uma figura só (pergunta x base); "Todas" mostra o questionário inteiro
+            ids = None if selected_dimensao == "Todas" else ids_da_dimensao(selected_dimensao)
+            grafico_mapa_calor_favorabilidade(favorabilidade_por_questao(*_cubo_recorte(recorte), ids), contexto=contexto)
+        elif selected_dimensao != "Todas":
+            mostrar_porcentagem = st.toggle('Mostrar dados em porcentagem (%)', value=True, key="porcentagem_dimensoes")
+            colunas = colunas_por_ids(df.columns, ids_da_dimensao(selected_dimensao))
+            for coluna in colunas:
+                dados = contagens_pergunta(cubo, coluna, selecoes) if cubo and coluna in cubo["perguntas"] else None
+                grafico_distribuicao_por_questao(df, coluna, porcentagem=mostrar_porcentagem, linhas=linhas, dados=dados, contexto=contexto)
+
+
+def _secao_scorecard(recorte: dict):
+    if not _secao("🔹 Scorecard por Dimensão", "scorecard"):
+        return
+    with st.container(border=True):
+        col_nivel, col_metrica = st.columns(2)
+        nivel = col_nivel.radio("Nível", NIVEIS, index=1, horizontal=True)
+        metrica = col_metrica.selectbox("Indicador", METRICAS_DIMENSAO)
+        indicadores = calcular_indicadores(*_cubo_recorte(recorte))
+        quadro = quadro_indicadores(indicadores, nivel, metrica)
+        config = {dim: st.column_config.ProgressColumn(dim, format="%.1f", min_value=0, max_value=100) for dim in dimensoes if dim in quadro.columns}
+        config["NPS"] = st.column_config.NumberColumn("NPS", format="%.1f")
+        st.dataframe(quadro, column_config=config, hide_index=True, use_container_width=True)
+        st.caption("Favorabilidade: respostas acima do ponto médio da escala. NPS: % de notas 9-10 menos % de notas 0-6.")
+        st.download_button(
+            "📥 Baixar indicadores (CSV)",
+            indicadores.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"),
+            file_name="indicadores_por_dimensao.csv",
+            mime="text/csv"
+        )
+
+
+def _secao_visao_base(recorte: dict):
+    if not _secao("🔹 Visão Geral por Base", "visao_base"):
+        return
+    df, linhas, cubo, selecoes, contexto = (recorte[k] for k in ("df", "linhas", "cubo", "selecoes", "contexto"))
+    rating_col = coluna_por_id(df.columns, "NOTA_GERAL")
+    if not rating_col:
+        return
+    with st.container(border=True):
+        mostrar_porcentagem = st.toggle('Mostrar dados em porcentagem (%)', value=True, key="porcentagem_visao_base")
+        por_base = contagens_por_base(cubo, selecoes) if cubo else None
+        grafico_pizza_respostas(df, porcentagem=mostrar_porcentagem, linhas=linhas, dados=por_base, contexto=contexto)
+        grafico_respostas_por_base(df, porcentagem=mostrar_porcentagem, linhas=linhas, dados=por_base, contexto=contexto)
+        grafico_nota_media_por_base(df, rating_col, linhas=linhas, dados=media_por_base(cubo, rating_col, selecoes) if cubo else None, contexto=contexto)
+        grafico_boxplot_notas(df, rating_col, linhas=linhas, contexto=contexto)
+
 
 def show():
     st.title("📈 Dashboard de Clima Organizacional")
 
     if st.session_state.get("df_unificado") is not None:
         df = st.session_state.df_unificado
+        if st.session_state.get("origem_df_unificado"):
+            st.caption(f"Dataset: {st.session_state.origem_df_unificado}")
 
         st.markdown("### 🔍 Filtros Gerais")
-        df_filtrado = aplicar_filtros_topbar(df)
+        # posições das linhas filtradas: os gráficos leem só as colunas de que precisam
+        impressao = impressao_df_unificado()
+        filtros = filtros_topbar(df, impressao)
+        recorte = {
+            "df": df,
+            "linhas": filtros["linhas"],
+            # sem busca de texto o filtro é só de segmentos, e as contagens saem prontas do cubo
+            "cubo": None if filtros["busca"] else cubo_dataset(df, impressao),
+            "selecoes": filtros["selecoes"],
+            # figuras reaproveitadas entre reruns enquanto dataset e filtro não mudam
+            "contexto": (impressao, filtros["estado"])
+        }
 
         st.markdown("---")
-        st.subheader("📊 Dados Filtrados")
-        st.dataframe(df_filtrado, use_container_width=True, height=500)
+        _secao_dados(recorte)
 
         st.markdown("---")
         st.subheader("📌 Análises e Indicadores")
-
-        rating_col = "e)   De um modo geral qual a nota (0 a 10) atribuiria a sua experiência na empresa?"
-
-        # Adicionando toggle para alternar entre contagem e porcentagem
-        mostrar_porcentagem = st.toggle('Mostrar dados em porcentagem (%)', value=True)
-
-        with st.expander("🔹 Análise por Categoria (Dimensão)", expanded=True):
-            selected_dimensao = st.selectbox("Categoria de Análise", ["Todas"] + list(dimensoes.keys()))
-            if selected_dimensao != "Todas":
-                colunas = [c for c in df_filtrado.columns if any(pergunta in c for pergunta in dimensoes[selected_dimensao])]
-                for coluna in colunas:
-                    grafico_distribuicao_por_questao(df_filtrado, coluna, porcentagem=mostrar_porcentagem)
-
-        with st.expander("🔹 Visão Geral por Base"):
-            if rating_col in df_filtrado.columns:
-                grafico_pizza_respostas(df_filtrado, porcentagem=mostrar_porcentagem)
-                grafico_respostas_por_base(df_filtrado, porcentagem=mostrar_porcentagem)
-                grafico_nota_media_por_base(df_filtrado, rating_col)
-                grafico_boxplot_notas(df_filtrado, rating_col)
-                
+        _secao_dimensoes(recorte)
+        _secao_scorecard(recorte)
+        _secao_visao_base(recorte)
 
 
 # 🔒 [Seção Ocultada do Front-End]
@@ -114,7 +133,7 @@ def show():
         # with st.expander("🔹 Comparação por Fator Específico"):
 #     prefixos = ['a)', 'b)', 'c)', 'd)', 'e)']
 #     fator_options = [
-#         col for col in df_filtrado.columns 
+#         col for col in df.columns 
 #         if any(col.startswith(prefix) for prefix in prefixos)
 #     ]
 #     if fator_options:
@@ -123,10 +142,13 @@ def show():
 #             options=fator_options
 #         )
 #         grafico_respostas_por_fator(
-#             df_filtrado, 
+#             df, 
 #             selected_fator, 
-#             porcentagem=mostrar_porcentagem
+#             porcentagem=mostrar_porcentagem,
+#             linhas=linhas
 #         )
 
     else:
-        st.warning("Nenhum dado unificado disponível. Por favor, faça o upload dos arquivos na seção 'Upload & Unificação'.")
\ No newline at end of file
+        st.warning("Nenhum dado unificado disponível. Por favor, faça o upload dos arquivos na seção 'Upload & Unificação'.")
+        with st.expander("📂 Ou abra um dataset salvo", expanded=True):
+            abrir_dataset_salvo("dashboard")
\ No newline at end of file
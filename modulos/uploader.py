@@ -1,27 +1,22 @@
 import streamlit as st
-import pandas as pd
-import re
-from io import BytesIO
-from components.excel_formatador import exportar_excel_formatado
+import os
+from components.excel_formatador import exportar_excel_streaming
+from components import cache_planilhas, armazenamento
+from components.esquema import memoria_mb
+from components.sessao import definir_df_unificado, abrir_dataset_salvo, impressao_df_unificado
+from components.artefatos import chave_artefato, obter_artefato, gerar_artefato, gerar_em_segundo_plano
+from components.ingestao import (
+    ler_planilhas,
+    unificar,
+    workers_padrao
+)
 
-colunas_essenciais = [
-    "Qual  o seu superior imediato?",
-    "e)   De um modo geral qual a nota (0 a 10) atribuiria a sua experiência na empresa?"
-]
-
-def ler_excel_seguro(uploaded_file):
-    try:
-        df = pd.read_excel(uploaded_file, sheet_name=0, engine="openpyxl")
-        return df
-    except Exception as e:
-        st.error(f"Erro ao ler o arquivo {uploaded_file.name}:")
-        st.exception(e)
-        return None
-
-def validar_colunas(df, nome_arquivo):
-    faltantes = [col for col in colunas_essenciais if col not in df.columns]
-    if faltantes:
-        st.warning(f"⚠️ Arquivo '{nome_arquivo}' está faltando colunas essenciais: {faltantes}")
+def validar_colunas(resultado):
+    if resultado["faltantes"]:
+        st.warning(f"⚠️ Arquivo '{resultado['arquivo']}' está faltando colunas essenciais: {resultado['faltantes']}")
+        return False
+    if not resultado["perguntas"]:
+        st.warning(f"⚠️ Arquivo '{resultado['arquivo']}' não contém nenhuma pergunta do questionário de clima.")
         return False
     return True
 
@@ -35,43 +30,91 @@ def show():
 
     uploaded_files = st.file_uploader("Selecione os arquivos Excel", type=["xlsx"], accept_multiple_files=True)
 
+    with st.expander("⚙️ Opções de leitura"):
+        max_cpu = os.cpu_count() or 1
+        n_workers = int(st.number_input(
+            "Processos em paralelo (1 = leitura em série)",
+            min_value=1,
+            max_value=max_cpu,
+            value=min(workers_padrao(len(uploaded_files or [])), max_cpu)
+        ))
+        usar_cache = st.checkbox("Reaproveitar leituras anteriores (cache em disco)", value=True)
+
+        df_cache = cache_planilhas.listar_cache()
+        st.caption(f"Cache: {len(df_cache)} arquivo(s), {df_cache['tamanho_mb'].sum():.1f} MB de {cache_planilhas.LIMITE_CACHE_PLANILHAS_MB:.0f} MB")
+        if not df_cache.empty:
+            st.dataframe(df_cache, use_container_width=True, height=200)
+        if st.button("🗑️ Limpar cache de leitura"):
+            st.info(f"{cache_planilhas.limpar_cache()} arquivo(s) removido(s) do cache.")
+
     if uploaded_files:
+        arquivos = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+        with st.spinner(f"Lendo {len(arquivos)} arquivo(s)..."):
+            resultados = ler_planilhas(arquivos, max_workers=n_workers, usar_cache=usar_cache, validar_cabecalho=True)
+
         dfs = []
         total_linhas = 0
-        for uploaded_file in uploaded_files:
-            df = ler_excel_seguro(uploaded_file)
-            if df is None:
+        for resultado in resultados:
+            if resultado["erro"]:
+                st.error(f"Erro ao ler o arquivo {resultado['arquivo']}: {resultado['erro']}")
                 continue
 
-            padrao = r'PESQUISA DE CLIMA (.*?)\s*-\s*2025'
-            match = re.search(padrao, uploaded_file.name)
-            base = match.group(1).strip() if match else "Desconhecido"
-            df["BASE"] = base
-
-            if not validar_colunas(df, uploaded_file.name):
+            if not validar_colunas(resultado):
                 continue
 
+            df = resultado["df"]
+
             total_linhas += len(df)
             dfs.append(df)
-            st.success(f"✅ {uploaded_file.name} carregado com sucesso. {len(df)} registros da base '{base}'")
+            origem = " (cache)" if resultado["cache"] else ""
+            st.success(f"✅ {resultado['arquivo']} carregado com sucesso{origem}. {len(df)} registros da base '{resultado['base']}'")
 
         if dfs:
-            df_unificado = pd.concat(dfs, ignore_index=True).drop_duplicates()
-            colunas = list(df_unificado.columns)
-            if "BASE" in colunas:
-                colunas.insert(0, colunas.pop(colunas.index("BASE")))
-            df_unificado = df_unificado[colunas]
-            st.session_state.df_unificado = df_unificado
+            df_unificado = unificar(dfs)
+            definir_df_unificado(df_unificado)
 
             st.markdown(f"### Dados Unificados ({total_linhas} respostas)")
+            st.caption(f"Memória em uso pelo dataset tipado: {memoria_mb(df_unificado):.1f} MB")
             st.dataframe(df_unificado.head(20), use_container_width=True, height=400)
 
-            excel_formatado = exportar_excel_formatado(df_unificado)
-            st.download_button(
-                "📥 Download Excel Personalizado",
-                data=excel_formatado,
-                file_name="dados_unificados_formatado.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            # o Excel é gerado uma vez por conteúdo (em segundo plano) e servido do cache nas próximas execuções
+            chave_excel = chave_artefato("excel_formatado", impressao_df_unificado())
+            excel_formatado = obter_artefato(chave_excel)
+            if excel_formatado is None:
+                gerar_em_segundo_plano(chave_excel, lambda: exportar_excel_streaming(df_unificado))
+                if st.button("📥 Preparar Excel Personalizado"):
+                    with st.spinner("Gerando o Excel..."):
+                        excel_formatado = gerar_artefato(chave_excel, lambda: exportar_excel_streaming(df_unificado))
+            if excel_formatado is not None:
+                st.download_button(
+                    "📥 Download Excel Personalizado",
+                    data=excel_formatado,
+                    file_name="dados_unificados_formatado.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+
+            with st.expander("💾 Salvar dataset no servidor"):
+                st.caption("O dataset salvo pode ser aberto no Dashboard e na Análise de Comentários sem novo upload.")
+                nome_dataset = st.text_input("Nome do dataset", value="clima_2025")
+                existe = armazenamento.nome_seguro(nome_dataset) in armazenamento.listar_datasets()
+                modo = st.radio(
+                    "Modo de gravação",
+                    ["Anexar (somente respostas novas)", "Substituir"],
+                    horizontal=True,
+                    disabled=not existe
+                )
+                if st.button("Salvar dataset"):
+                    if existe and modo.startswith("Anexar"):
+                        resumo = armazenamento.anexar_ao_dataset(df_unificado, nome_dataset)
+                        nome_salvo = armazenamento.nome_seguro(nome_dataset)
+                        st.success(f"✅ {resumo['novas']} respostas novas anexadas a '{nome_salvo}' ({resumo['duplicadas']} já existentes ignoradas).")
+                    else:
+                        nome_salvo = armazenamento.salvar_dataset(df_unificado, nome_dataset)
+                        st.success(f"✅ Dataset '{nome_salvo}' salvo com {len(df_unificado)} registros.")
+                        st.session_state.origem_df_unificado = nome_salvo
         else:
             st.warning("Nenhum dado foi unificado. Verifique se os arquivos possuem as colunas esperadas.")
+    else:
+        with st.expander("📂 Abrir dataset salvo"):
+            if not abrir_dataset_salvo("uploader"):
+                st.info("Nenhum dataset salvo ainda.")
@@ -0,0 +1,159 @@
+# processar_lote.py - processamento em lote (sem Streamlit) de uma pasta de pesquisas
+#
+# Exemplo (job noturno):
+#   python processar_lote.py /dados/pesquisas /dados/saida --dataset clima --anexar --workers 4
+
+import argparse
+import logging
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from components.agregacoes import agregados_por_base, distribuicao_por_questao
+from components.armazenamento import anexar_ao_dataset, carregar_dataset, nome_seguro, salvar_dataset
+from components.excel_formatador import exportar_excel_streaming
+from components.ingestao import ler_planilhas, motivo_rejeicao, unificar
+
+log = logging.getLogger("processar_lote")
+
+def listar_planilhas(entrada: Path) -> list:
+    # ignora os arquivos temporários "~$..." que o Excel deixa na pasta
+    return sorted(p for p in entrada.glob("*.xlsx") if not p.name.startswith("~$"))
+
+def ler_pasta(entrada: Path, workers=None, usar_cache=True):
+    arquivos = [(p.name, p.read_bytes()) for p in listar_planilhas(entrada)]
+    dfs = []
+    for resultado in ler_planilhas(arquivos, max_workers=workers, usar_cache=usar_cache, validar_cabecalho=True):
+        if resultado["erro"]:
+            log.error("%s: %s", resultado["arquivo"], resultado["erro"])
+            continue
+        # rejeitado pelo cabeçalho, pela leitura completa ou pelas colunas do cache: o uploader recusaria o mesmo arquivo
+        motivo = motivo_rejeicao(resultado)
+        if motivo:
+            log.warning("%s: ignorado (%s)", resultado["arquivo"], motivo)
+            continue
+        log.info("%s: %d linhas (BASE %s)%s", resultado["arquivo"], len(resultado["df"]), resultado["base"],
+                 " [cache]" if resultado["cache"] else "")
+        dfs.append(resultado["df"])
+    return dfs
+
+def gravar_dataset(df, nome, anexar=False, diretorio=None):
+    """Grava o lote no dataset e devolve o dataset completo (no modo anexar inclui o histórico)."""
+    if anexar:
+        resumo = anexar_ao_dataset(df, nome, diretorio)
+        log.info("Dataset '%s': %d linhas novas, %d duplicadas%s", nome, resumo["novas"], resumo["duplicadas"],
+                 " (reescrito)" if resumo["reescrito"] else "")
+        return carregar_dataset(nome, diretorio=diretorio)
+    salvar_dataset(df, nome, diretorio)
+    log.info("Dataset '%s': %d linhas gravadas", nome, len(df))
+    return df
+
+def gravar_agregados(df, saida: Path):
+    # ";" e vírgula decimal: abre direto no Excel em português
+    for nome, tabela in (("agregados_por_base", agregados_por_base(df)), ("distribuicao_por_questao", distribuicao_por_questao(df))):
+        tabela.to_csv(saida / f"{nome}.csv", index=False, sep=";", decimal=",", encoding="utf-8-sig")
+
+class _tentar:
+    """Envolve a tarefa para que a falha de um relatório não interrompa os demais (serializável no pool)."""
+    def __init__(self, funcao):
+        self.funcao = funcao
+
+    def __call__(self, args):
+        try:
+            return self.funcao(args)
+        except Exception as e:
+            return e
+
+def _relatorio_comentarios(args):
+    base, coluna, comentarios = args
+    from components.analise_comentarios import analisar_comentarios, gerar_relatorio_markdown
+    df_sent, topicos = analisar_comentarios(comentarios, mostrar_progresso=False)
+    return gerar_relatorio_markdown(df_sent, topicos, base, coluna)
+
+def gravar_relatorios_comentarios(df, saida: Path, workers=1) -> int:
+    """Um relatório Markdown por BASE e coluna de comentários. Devolve o número de falhas."""
+    from components.analise_comentarios import detectar_coluna_comentarios
+
+    colunas = detectar_coluna_comentarios(df)
+    if not colunas:
+        log.warning("Nenhuma coluna de comentários encontrada")
+        return 0
+    tarefas, destinos = [], []
+    for base in sorted(df["BASE"].astype(str).unique()):
+        for i, coluna in enumerate(colunas):
+            comentarios = df.loc[df["BASE"].astype(str) == base, coluna].dropna().astype(str).tolist()
+            if not comentarios:
+                continue
+            sufixo = f"_{i + 1}" if len(colunas) > 1 else ""
+            tarefas.append((base, coluna, comentarios))
+            destinos.append(saida / f"relatorio_comentarios_{nome_seguro(base)}{sufixo}.md")
+
+    saida.mkdir(parents=True, exist_ok=True)
+    falhas = 0
+    if workers <= 1:
+        relatorios = map(_tentar(_relatorio_comentarios), tarefas)
+        falhas = _gravar_relatorios(relatorios, tarefas, destinos)
+    else:
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+            relatorios = executor.map(_tentar(_relatorio_comentarios), tarefas)
+            falhas = _gravar_relatorios(relatorios, tarefas, destinos)
+    return falhas
+
+def _gravar_relatorios(relatorios, tarefas, destinos) -> int:
+    falhas = 0
+    for relatorio, (base, coluna, comentarios), destino in zip(relatorios, tarefas, destinos):
+        if isinstance(relatorio, Exception):
+            log.error("Comentários de %s (%s): %s", base, coluna, relatorio)
+            falhas += 1
+            continue
+        destino.write_text(relatorio, encoding="utf-8")
+        log.info("%s: %d comentários", destino.name, len(comentarios))
+    return falhas
+
+def processar(entrada: Path, saida: Path, dataset: str, workers=None, workers_comentarios=1, usar_cache=True,
+              anexar=False, comentarios=True, diretorio_datasets=None) -> int:
+    dfs = ler_pasta(entrada, workers, usar_cache)
+    if not dfs:
+        log.error("Nenhuma planilha válida em %s", entrada)
+        return 1
+
+    df = gravar_dataset(unificar(dfs), dataset, anexar, diretorio_datasets)
+    saida.mkdir(parents=True, exist_ok=True)
+
+    (saida / f"{nome_seguro(dataset)}.xlsx").write_bytes(exportar_excel_streaming(df).getvalue())
+    gravar_agregados(df, saida)
+    log.info("Excel e agregados gravados em %s", saida)
+
+    falhas = gravar_relatorios_comentarios(df, saida / "comentarios", workers_comentarios) if comentarios else 0
+    return 2 if falhas else 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Unifica uma pasta de pesquisas de clima e gera dataset, Excel, agregados e relatórios.")
+    parser.add_argument("entrada", type=Path, help="pasta com as planilhas .xlsx")
+    parser.add_argument("saida", type=Path, help="pasta onde os arquivos gerados são gravados")
+    parser.add_argument("--dataset", default="clima", help="nome do dataset Parquet (padrão: clima)")
+    parser.add_argument("--diretorio-datasets", type=Path, default=None, help="pasta dos datasets (padrão: configuração do app)")
+    parser.add_argument("--anexar", action="store_true", help="acrescenta só as linhas novas ao dataset em vez de substituí-lo")
+    parser.add_argument("--workers", type=int, default=None, help="processos para a leitura das planilhas")
+    parser.add_argument("--workers-comentarios", type=int, default=1, help="processos para a análise dos comentários")
+    parser.add_argument("--sem-cache", action="store_true", help="não usa o cache de planilhas já lidas")
+    parser.add_argument("--sem-comentarios", action="store_true", help="não gera os relatórios de comentários")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.entrada.is_dir():
+        parser.error(f"pasta de entrada não encontrada: {args.entrada}")
+    return processar(
+        args.entrada, args.saida, args.dataset,
+        workers=args.workers,
+        workers_comentarios=args.workers_comentarios,
+        usar_cache=not args.sem_cache,
+        anexar=args.anexar,
+        comentarios=not args.sem_comentarios,
+        diretorio_datasets=args.diretorio_datasets
+    )
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+# conftest.py - pesquisas sintéticas pequenas, no formato da planilha unificada
+
+import numpy as np
+import pytest
+
+from components.catalogo import ROTULOS
+from components.esquema import tipar_dataset
+from tests.pesquisa_sintetica import gerar_pesquisa
+
+SUPERIORES = ["Ana", "Bruno", "Carla"]
+
+@pytest.fixture
+def pesquisa():
+    """Fábrica de frames tipados: pesquisa(linhas, colunas=20, semente=42), com superior imediato (às vezes vazio)."""
+    def gerar(linhas: int, colunas: int = 20, semente: int = 42):
+        df = gerar_pesquisa(linhas, colunas, semente)
+        rng = np.random.default_rng(semente + 1)
+        superiores = rng.choice(SUPERIORES, linhas).astype(object)
+        superiores[rng.random(linhas) < 0.1] = None
+        df[ROTULOS["SUPERIOR"]] = superiores
+        return tipar_dataset(df)
+    return gerar
@@ -0,0 +1,26 @@
+# pesquisa_sintetica.py - gerador de pesquisas sintéticas usado pelos testes e pelos benchmarks
+
+import numpy as np
+import pandas as pd
+
+from components.catalogo import ROTULOS, ids_por_tipo
+from components.esquema import ESCALAS_LIKERT, tipar_dataset
+
+def gerar_pesquisa(linhas: int, colunas: int, semente: int = 42) -> pd.DataFrame:
+    """Frame sintético no formato da pesquisa unificada: BASE, perguntas Likert, nota e comentários."""
+    rng = np.random.default_rng(semente)
+    escala = [posicao[0] for posicao in ESCALAS_LIKERT[0]]
+    dados = {"BASE": rng.choice(["ALFA", "BETA", "GAMA", "DELTA"], linhas)}
+    perguntas = [ROTULOS[i] for i in ids_por_tipo("likert")]
+    extras = 0
+    while len(dados) < colunas - 2:
+        if perguntas:
+            nome = perguntas.pop(0)
+        else:
+            extras += 1
+            nome = f"e) Pergunta adicional {extras}"
+        respostas = pd.Series(rng.choice(escala, linhas)).where(rng.random(linhas) > 0.05)
+        dados[nome] = respostas
+    dados[ROTULOS["NOTA_GERAL"]] = rng.integers(0, 11, linhas)
+    dados["Comentários"] = pd.Series([f"a) comentário {i} " + "texto " * (i % 20) for i in range(linhas)]).where(rng.random(linhas) > 0.6)
+    return tipar_dataset(pd.DataFrame(dados))
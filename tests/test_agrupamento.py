@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import NearestNeighbors
+
+from components.agrupamento import EPS_AGRUPAMENTO, MIN_AMOSTRAS_AGRUPAMENTO, dbscan_no_grafo, usar_grafo, vetores_unicos
+from components.analise_comentarios import agrupar_unicos
+
+def pontos(quantidade=400, grupos=8, dimensao=16, semente=0):
+    rng = np.random.default_rng(semente)
+    centros = rng.normal(size=(grupos, dimensao))
+    rotulo = rng.integers(grupos, size=quantidade)
+    dispersao = np.where(rng.random(quantidade) < 0.15, 2.0, 0.12)  # parte vira ruído
+    vetores = centros[rotulo] + rng.normal(size=(quantidade, dimensao)) * dispersao[:, None]
+    return vetores / np.linalg.norm(vetores, axis=1, keepdims=True)
+
+def grafo_exato(vetores, k):
+    distancias, indices = NearestNeighbors(n_neighbors=k, metric="cosine").fit(vetores).kneighbors(vetores)
+    return indices, distancias
+
+def mesma_particao(a, b):
+    # rótulos podem ter outra numeração; o ruído tem de coincidir
+    np.testing.assert_array_equal(a == -1, b == -1)
+    pares = set(zip(a[a >= 0], b[b >= 0]))
+    assert len(pares) == len(set(a[a >= 0])) == len(set(b[b >= 0]))
+
+def referencia(vetores):
+    return DBSCAN(eps=EPS_AGRUPAMENTO, min_samples=MIN_AMOSTRAS_AGRUPAMENTO, metric="cosine").fit_predict(vetores)
+
+@pytest.mark.parametrize("semente", [0, 1, 2])
+def test_igual_ao_dbscan_com_grafo_completo(semente):
+    vetores = pontos(semente=semente)
+    # k = n: o grafo tem todas as arestas e o critério é exatamente o do DBSCAN (salvo empates de borda)
+    rotulos = dbscan_no_grafo(*grafo_exato(vetores, len(vetores)))
+    esperado = referencia(vetores)
+    nucleos = np.zeros(len(vetores), dtype=bool)
+    nucleos[DBSCAN(eps=EPS_AGRUPAMENTO, min_samples=MIN_AMOSTRAS_AGRUPAMENTO, metric="cosine").fit(vetores).core_sample_indices_] = True
+    mesma_particao(rotulos[nucleos], esperado[nucleos])
+    np.testing.assert_array_equal(rotulos == -1, esperado == -1)
+
+def test_igual_ao_dbscan_com_grafo_de_k_vizinhos():
+    vetores = pontos(quantidade=300, grupos=30, semente=5)
+    mesma_particao(dbscan_no_grafo(*grafo_exato(vetores, 15)), referencia(vetores))
+
+def test_sem_nucleo_tudo_e_ruido():
+    vetores = np.eye(5)
+    assert (dbscan_no_grafo(*grafo_exato(vetores, 5)) == -1).all()
+
+def test_usar_grafo():
+    assert not usar_grafo(10, "grafo")
+    assert usar_grafo(100, "grafo")
+    assert not usar_grafo(10 ** 6, "dbscan")
+    with pytest.raises(ValueError):
+        usar_grafo(100, "outro")
+
+def com_repeticoes(semente=3):
+    # respostas idênticas: um bloco isolado bem maior que os 15 vizinhos do grafo ("nada") e cópias dentro dos grupos
+    vetores = pontos(quantidade=300, grupos=6, semente=semente)
+    rng = np.random.default_rng(semente)
+    nada = rng.normal(size=(1, vetores.shape[1]))
+    repetidas = [np.repeat(nada / np.linalg.norm(nada), 200, axis=0)]
+    repetidas += [np.repeat(vetores[[i]], tamanho, axis=0) for i, tamanho in zip(rng.choice(300, 3, replace=False), (40, 3, 2))]
+    tudo = np.vstack([vetores, *repetidas])
+    return tudo[rng.permutation(len(tudo))]
+
+def test_repeticoes_com_peso_igual_ao_dbscan_com_todos():
+    vetores = com_repeticoes()
+    unicos, inverso, contagens = vetores_unicos(vetores)
+    np.testing.assert_array_equal(unicos[inverso], vetores)
+    assert contagens.sum() == len(vetores)
+
+    esperado = referencia(vetores)
+    mesma_particao(dbscan_no_grafo(*grafo_exato(unicos, 15), contagens=contagens)[inverso], esperado)
+    mesma_particao(agrupar_unicos(vetores, "dbscan")[0], esperado)
+
+def test_grafo_aproximado_nao_parte_bloco_de_repeticoes():
+    vetores = com_repeticoes(semente=8)
+    rotulos, unicos, inverso, grafo = agrupar_unicos(vetores, "grafo")
+    assert grafo is not None and len(grafo[0]) == len(unicos)
+    mesma_particao(rotulos, referencia(vetores))
+    # cada resposta repetida fica num grupo só
+    for i in np.flatnonzero(np.bincount(inverso) > 1):
+        assert len(set(rotulos[inverso == i])) == 1
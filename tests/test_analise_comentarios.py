@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from components import analise_comentarios
+from components.analise_comentarios import analisar_sentimentos, grupos_em_bytes, identidade_agrupamento, restaurar_grupos
+
+COMENTARIOS = pd.Series(["bom ambiente de trabalho", "salário abaixo do mercado", "comunicação ruim com o gestor"] * 3,
+                        name="Comentários")
+
+def test_grupos_guardados_voltam_na_mesma_ordem():
+    df_sent = analisar_sentimentos(COMENTARIOS)
+    df_sent["Cluster"] = [0, 1, -1] * 3
+    df_sent["x"] = np.arange(9.0)
+    df_sent["y"] = -np.arange(9.0)
+
+    restaurado, topicos = restaurar_grupos(analisar_sentimentos(COMENTARIOS), grupos_em_bytes(df_sent))
+
+    pd.testing.assert_frame_equal(restaurado[["Cluster", "x", "y"]], df_sent[["Cluster", "x", "y"]], check_dtype=False)
+    assert topicos[1][0] == ("salário", 3)
+
+def test_identidade_muda_com_o_algoritmo(monkeypatch):
+    antes = identidade_agrupamento()
+    monkeypatch.setattr(analise_comentarios, "AGRUPAMENTO_COMENTARIOS", "grafo")
+    assert identidade_agrupamento() != antes
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from components.armazenamento import anexar_ao_dataset, carregar_dataset, salvar_dataset
+
+def test_anexar_lote_sem_coluna_do_dataset(pesquisa, tmp_path):
+    # dataset num layout mais novo (coluna categórica a mais) recebe uma planilha do layout anterior
+    df = pesquisa(200)
+    df["Setor"] = pd.Series(["Adm", "Operação"] * 100).astype("category")
+    salvar_dataset(df, "clima", tmp_path)
+
+    resumo = anexar_ao_dataset(pesquisa(50, semente=7), "clima", tmp_path)
+
+    assert resumo == {"novas": 50, "duplicadas": 0, "reescrito": False}
+    salvo = carregar_dataset("clima", diretorio=tmp_path)
+    assert len(salvo) == 250
+    assert salvo["Setor"].isna().sum() == 50
+    assert isinstance(salvo["Setor"].dtype, pd.CategoricalDtype)
+
+def test_anexar_ignora_repetidas_no_lote_e_ja_gravadas(pesquisa, tmp_path):
+    df = pesquisa(200)
+    salvar_dataset(df.iloc[:150], "clima", tmp_path)
+
+    lote = pd.concat([df.iloc[100:], df.iloc[180:]], ignore_index=True)
+    resumo = anexar_ao_dataset(lote, "clima", tmp_path)
+
+    assert resumo == {"novas": 50, "duplicadas": 70, "reescrito": False}
+    salvo = carregar_dataset("clima", diretorio=tmp_path)
+    assert len(salvo) == 200
+    assert anexar_ao_dataset(df, "clima", tmp_path)["novas"] == 0
+
+def test_anexar_coluna_nova_reescreve_o_dataset(pesquisa, tmp_path):
+    df = pesquisa(100)
+    salvar_dataset(df.iloc[:60], "clima", tmp_path)
+
+    # as 20 linhas já gravadas voltam sem a coluna nova; as outras 40 chegam com ela
+    lote = pd.concat([df.iloc[40:60], df.iloc[60:].assign(Setor="Adm")], ignore_index=True)
+    resumo = anexar_ao_dataset(lote, "clima", tmp_path)
+
+    assert resumo == {"novas": 40, "duplicadas": 20, "reescrito": True}
+    salvo = carregar_dataset("clima", diretorio=tmp_path)
+    assert len(salvo) == 100
+    assert salvo["Setor"].notna().sum() == 40
+
+def test_anexar_tipo_incompativel_reescreve_o_dataset(pesquisa, tmp_path):
+    df = pesquisa(100)
+    coluna = df.select_dtypes("number").columns[0]
+    salvar_dataset(df.iloc[:50], "clima", tmp_path)
+
+    lote = df.iloc[50:].copy()
+    # notas inteiras no dataset, uma planilha nova com meia nota: não cabe no tipo salvo
+    lote[coluna] = lote[coluna].astype(float) + 0.5
+    resumo = anexar_ao_dataset(lote, "clima", tmp_path)
+
+    assert resumo == {"novas": 50, "duplicadas": 0, "reescrito": True}
+    salvo = carregar_dataset("clima", diretorio=tmp_path)
+    assert len(salvo) == 100
+    assert (salvo[coluna] % 1 == 0.5).sum() == 50
@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+
+from components.cache_embeddings import chave_texto, codificar_com_cache, listar_lojas, loja, normalizar_texto
+
+def codificador():
+    """Codificador falso e determinístico: vetor derivado do texto, registrando o que recebeu."""
+    chamadas = []
+    def codificar(textos):
+        chamadas.append(list(textos))
+        return np.stack([np.random.default_rng(sum(t.encode())).normal(size=8) for t in textos])
+    return codificar, chamadas
+
+def test_acertos_faltas_e_ordem(tmp_path):
+    codificar, chamadas = codificador()
+    primeira, contagem = codificar_com_cache(["bom", "ruim", "bom"], codificar, "falso", "1", tmp_path)
+    assert contagem == {"acertos": 0, "faltas": 2}
+    assert chamadas == [["bom", "ruim"]]
+    np.testing.assert_array_equal(primeira[0], primeira[2])
+
+    # espaços extras caem na mesma chave; só o texto inédito vai ao modelo
+    segunda, contagem = codificar_com_cache(["ótimo", " ruim ", "bom"], codificar, "falso", "1", tmp_path)
+    assert contagem == {"acertos": 2, "faltas": 1}
+    assert chamadas[-1] == ["ótimo"]
+    np.testing.assert_array_equal(segunda[1], primeira[1])
+    np.testing.assert_array_equal(segunda[2], primeira[0])
+    assert segunda.dtype == np.float32
+
+def test_resultado_igual_com_e_sem_acerto(tmp_path):
+    codificar, _ = codificador()
+    frio, _ = codificar_com_cache(["a", "b", "c"], codificar, "falso", "1", tmp_path)
+    quente, contagem = codificar_com_cache(["c", "a", "b"], codificar, "falso", "1", tmp_path)
+    assert contagem["faltas"] == 0
+    np.testing.assert_array_equal(quente, frio[[2, 0, 1]])
+
+def test_versao_nova_nao_reaproveita_vetores(tmp_path):
+    codificar, chamadas = codificador()
+    codificar_com_cache(["bom"], codificar, "falso", "1", tmp_path)
+    _, contagem = codificar_com_cache(["bom"], codificar, "falso", "2", tmp_path)
+    assert contagem == {"acertos": 0, "faltas": 1}
+    assert sorted(listar_lojas(tmp_path)["versao"]) == ["1", "2"]
+
+def test_compactar_preserva_vetores(tmp_path):
+    codificar, _ = codificador()
+    textos = [f"comentário {i}" for i in range(6)]
+    for texto in textos:
+        codificar_com_cache([texto], codificar, "falso", "1", tmp_path)
+    antes, _ = codificar_com_cache(textos, codificar, "falso", "1", tmp_path)
+
+    armazem = loja("falso", "1", tmp_path)
+    assert armazem.compactar() == 6
+    assert armazem.estatisticas()["segmentos"] == 1
+    depois, contagem = codificar_com_cache(textos, codificar, "falso", "1", tmp_path)
+    assert contagem["faltas"] == 0
+    np.testing.assert_array_equal(depois, antes)
+
+def test_busca_concorrente_com_compactacao(tmp_path):
+    codificar, _ = codificador()
+    textos = [f"comentário {i}" for i in range(40)]
+    for inicio in range(0, len(textos), 4):
+        codificar_com_cache(textos[inicio:inicio + 4], codificar, "falso", "1", tmp_path)
+    esperado, _ = codificar_com_cache(textos, codificar, "falso", "1", tmp_path)
+
+    armazem = loja("falso", "1", tmp_path)
+    chaves = [chave_texto(normalizar_texto(t)) for t in textos]
+    erros = []
+
+    def buscar():
+        for _ in range(200):
+            try:
+                encontradas, vetores = armazem.buscar(chaves)
+                assert encontradas.all()
+                np.testing.assert_array_equal(vetores, esperado)
+            except Exception as erro:
+                erros.append(erro)
+                return
+
+    def compactar():
+        for i in range(20):
+            armazem.adicionar([chave_texto(f"extra {i}")], np.ones((1, 8)))
+            armazem.compactar()
+            listar_lojas(tmp_path)
+
+    threads = [threading.Thread(target=buscar), threading.Thread(target=compactar)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erros
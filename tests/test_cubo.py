@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from components.agregacoes import formatar_porcentagem
+from components.catalogo import ROTULOS, ids_por_tipo
+from components.cubo import construir_cubo, contagens_pergunta, contagens_por_base, media_por_base
+from components.esquema import tipar_dataset
+from components.motor_filtros import construir_motor, linhas_filtradas
+
+SUPERIOR = ROTULOS["SUPERIOR"]
+NOTA = ROTULOS["NOTA_GERAL"]
+SELECOES = [
+    {},
+    {"BASE": ["ALFA", "GAMA"]},
+    {"BASE": ["BETA"], SUPERIOR: ["Ana", "Carla"]},
+    {"BASE": None, SUPERIOR: ["Bruno"]},
+    {"BASE": []},
+]
+
+@pytest.fixture
+def df(pesquisa):
+    return pesquisa(600, semente=3)
+
+def ordenado(tabela, colunas):
+    tabela = tabela.copy()
+    for coluna in colunas:
+        tabela[coluna] = tabela[coluna].astype(str)
+    return tabela.sort_values(colunas).reset_index(drop=True)
+
+@pytest.mark.parametrize("selecoes", SELECOES)
+def test_fatias_do_cubo_iguais_ao_groupby(df, selecoes):
+    cubo = construir_cubo(df)
+    # o mesmo recorte que o caminho por linhas agrega
+    filtrado = df.iloc[linhas_filtradas(construir_motor(df), selecoes)]
+
+    esperado = formatar_porcentagem(filtrado, ["BASE"])
+    obtido = contagens_por_base(cubo, selecoes)
+    pd.testing.assert_frame_equal(ordenado(obtido, ["BASE"]), ordenado(esperado, ["BASE"]), check_dtype=False)
+
+    for coluna in cubo["perguntas"]:
+        esperado = formatar_porcentagem(filtrado, ["BASE", coluna])
+        obtido = contagens_pergunta(cubo, coluna, selecoes)
+        pd.testing.assert_frame_equal(ordenado(obtido, ["BASE", coluna]), ordenado(esperado, ["BASE", coluna]),
+                                      check_dtype=False)
+
+    notas = pd.to_numeric(filtrado[NOTA], errors="coerce").astype(float)
+    esperado = notas.groupby(filtrado["BASE"].astype(str)).mean().dropna()
+    obtido = media_por_base(cubo, NOTA, selecoes)
+    obtido = obtido.set_index(obtido["BASE"].astype(str))["Nota Média"].astype(float)
+    pd.testing.assert_series_equal(obtido.sort_index(), esperado.sort_index(), check_names=False)
+
+def test_pergunta_likert_em_texto_livre_entra_no_cubo(df):
+    # mais de 12 grafias e mais de 5% de valores distintos: `tipar_dataset` deixa a coluna como texto
+    coluna = ROTULOS[ids_por_tipo("likert")[0]]
+    grafias = df[coluna].astype(object) + pd.Series([f" ({i % 40})" for i in range(len(df))], index=df.index)
+    df = tipar_dataset(df.assign(**{coluna: grafias.astype(object)}))
+    assert df[coluna].dtype == "string[pyarrow]"
+
+    cubo = construir_cubo(df)
+    obtido = contagens_pergunta(cubo, coluna, {})
+    esperado = formatar_porcentagem(df, ["BASE", coluna])
+    assert len(obtido) == len(esperado) > 0
+    pd.testing.assert_frame_equal(ordenado(obtido, ["BASE", coluna]), ordenado(esperado, ["BASE", coluna]), check_dtype=False)
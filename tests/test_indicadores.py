@@ -0,0 +1,44 @@
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from components.catalogo import PERGUNTAS_POR_ID, ROTULOS, dimensoes
+from components.cubo import construir_cubo
+from components.indicadores import DIMENSAO_NPS, calcular_indicadores
+
+NOTA = ROTULOS["NOTA_GERAL"]
+
+def test_nps_por_base_igual_ao_calculo_direto(pesquisa):
+    df = pesquisa(600, semente=3)
+    tabela = calcular_indicadores(construir_cubo(df))
+    nps = tabela[(tabela["Nível"] == "BASE") & (tabela["Dimensão"] == DIMENSAO_NPS)].set_index("BASE")
+    for base, grupo in df.groupby("BASE", observed=True):
+        notas = pd.to_numeric(grupo[NOTA], errors="coerce").dropna()
+        esperado = ((notas >= 9).mean() - (notas <= 6).mean()) * 100
+        assert nps.loc[base, "NPS"] == pytest.approx(esperado)
+        assert nps.loc[base, "Respondentes"] == len(grupo)
+
+def test_favorabilidade_por_dimensao_igual_ao_calculo_direto(pesquisa):
+    df = pesquisa(600, semente=3)
+    cubo = construir_cubo(df)
+    tabela = calcular_indicadores(cubo)
+    por_base = tabela[(tabela["Nível"] == "BASE") & (tabela["Dimensão"] != DIMENSAO_NPS)].set_index(["BASE", "Dimensão"])
+
+    favoraveis, respondidas = Counter(), Counter()
+    for coluna, q in cubo["perguntas"].items():
+        pergunta = PERGUNTAS_POR_ID[cubo["ids"][q]]
+        respostas = list(cubo["respostas"][q])
+        if pergunta["tipo"] != "likert" or not cubo["ordenadas"][q] or pergunta["dimensao"] not in dimensoes or len(respostas) < 2:
+            continue
+        # posição na escala; acima do ponto médio é favorável
+        posicao = df[coluna].astype(object).map({resposta: i for i, resposta in enumerate(respostas)})
+        for base, valores in posicao.groupby(df["BASE"], observed=True):
+            valores = valores.dropna()
+            respondidas[base, pergunta["dimensao"]] += len(valores)
+            favoraveis[base, pergunta["dimensao"]] += int((valores > (len(respostas) - 1) / 2).sum())
+
+    assert respondidas
+    for chave, total in respondidas.items():
+        assert por_base.loc[chave, "Respostas"] == total
+        assert por_base.loc[chave, "Favorabilidade (%)"] == pytest.approx(favoraveis[chave] / total * 100)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.catalogo import ROTULOS
+from components.motor_filtros import construir_motor, linhas_filtradas
+
+SUPERIOR = ROTULOS["SUPERIOR"]
+SELECOES = [
+    {},
+    {"BASE": ["ALFA", "GAMA"]},
+    {"BASE": ["BETA"], SUPERIOR: ["Ana", "Carla"]},
+    {"BASE": None, SUPERIOR: ["Bruno"]},
+    {"BASE": []},
+]
+
+@pytest.fixture
+def df(pesquisa):
+    return pesquisa(600, semente=3)
+
+def mascara(df, selecoes):
+    manter = pd.Series(True, index=df.index)
+    for coluna, valores in selecoes.items():
+        if valores is not None:
+            manter &= df[coluna].isin(valores)
+    return manter.to_numpy()
+
+@pytest.mark.parametrize("selecoes", SELECOES)
+def test_linhas_filtradas_igual_a_mascara_pandas(df, selecoes):
+    motor = construir_motor(df)
+    esperado = np.flatnonzero(mascara(df, selecoes))
+    np.testing.assert_array_equal(linhas_filtradas(motor, selecoes), esperado)
+    # segunda chamada vem do estado memoizado, em outra ordem de colunas
+    np.testing.assert_array_equal(linhas_filtradas(motor, dict(reversed(list(selecoes.items())))), esperado)
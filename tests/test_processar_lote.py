@@ -0,0 +1,36 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from components import cache_planilhas
+from components.catalogo import ROTULOS
+from components.ingestao import normalizar_tipos
+from processar_lote import ler_pasta
+
+ARQUIVO_VALIDO = "PESQUISA DE CLIMA ALFA - 2025 (respostas).xlsx"
+ARQUIVO_SEM_NOTA = "PESQUISA DE CLIMA BETA - 2025 (respostas).xlsx"
+
+@pytest.fixture
+def pasta(pesquisa, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_planilhas, "DIRETORIO_CACHE_PLANILHAS", tmp_path / "cache")
+    entrada = tmp_path / "entrada"
+    entrada.mkdir()
+    completa = pesquisa(30).drop(columns="BASE")
+    completa[ROTULOS["SUPERIOR"]] = "Ana"
+    completa.to_excel(entrada / ARQUIVO_VALIDO, index=False)
+    # sem a nota geral, coluna essencial: o uploader recusa
+    completa.drop(columns=ROTULOS["NOTA_GERAL"]).to_excel(entrada / ARQUIVO_SEM_NOTA, index=False)
+    return entrada
+
+def bases(dfs):
+    return [df["BASE"].iloc[0] for df in dfs]
+
+def test_ler_pasta_ignora_arquivo_sem_coluna_essencial(pasta):
+    assert bases(ler_pasta(pasta, workers=1)) == ["ALFA"]
+
+def test_ler_pasta_ignora_arquivo_invalido_vindo_do_cache(pasta):
+    # o arquivo inválido já foi lido uma vez sem validação e está no cache: continua fora
+    conteudo = (pasta / ARQUIVO_SEM_NOTA).read_bytes()
+    cache_planilhas.salvar(cache_planilhas.hash_conteudo(conteudo), normalizar_tipos(pd.read_excel(BytesIO(conteudo))))
+    assert bases(ler_pasta(pasta, workers=1)) == ["ALFA"]